@@ -0,0 +1,53 @@
+"""
+Utilities for pre-processing InstructLab knowledge contributions.
+
+Submodules are only imported when they are first used, so importing one stage
+does not pull in the heavy dependencies of the others:
+
+    conversion              Docling conversion of source documents          [conversion]
+    chunking                Docling chunking of converted documents         [conversion]
+    chunk_store             chunks.jsonl and chunks.parquet readers         [parquet]
+    streaming               Conversion overlapped with chunking             [conversion]
+    scheduler               Size-aware scheduling of conversions            [conversion]
+    reconversion            Reconversion of low-confidence pages            [conversion]
+    routing                 Per-page routing between pipelines              [conversion]
+    dedup                   Exact and near-duplicate chunk removal          [dedup]
+    document_io             Partial loading of Docling JSON conversions     [conversion]
+    illuminator             Post-conversion table checks                    [conversion]
+    qna_gen                 Seed chunk selection and Q&A generation         [qna]
+    subset_selection        CPU subset selection of chunks                  [subset]
+    create_seed_dataset     Seed dataset creation for SDG                   [dataset]
+    token_estimator         Calibrated token count estimates
+    pipeline                Headless runner for all of the above
+    manifest                Build manifest used by the pipeline runner
+    instrumentation         Timing and memory tracing
+
+The extra in brackets installs the dependencies a submodule needs.
+"""
+import importlib
+
+__all__ = [
+    "chunk_store",
+    "chunking",
+    "conversion",
+    "create_seed_dataset",
+    "dedup",
+    "document_io",
+    "illuminator",
+    "instrumentation",
+    "manifest",
+    "pipeline",
+    "qna_gen",
+    "reconversion",
+    "routing",
+    "scheduler",
+    "streaming",
+    "subset_selection",
+    "token_estimator",
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
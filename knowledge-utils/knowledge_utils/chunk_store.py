@@ -0,0 +1,533 @@
+"""
+Storage of chunk records.
+
+chunks.jsonl is the reference layout. For very large contributions the chunks can
+instead be written to size-bounded shards (chunks-00000.jsonl, ...) listed in
+chunks.manifest.json together with their chunk counts and the byte offset of every
+chunk, so readers can process the shards in parallel or seek straight to a chunk.
+chunks.parquet is an optional columnar copy of either layout.
+
+Every reader takes the path of chunks.jsonl and picks whichever layout is there.
+"""
+import bisect
+import json
+import os
+import shutil
+import tempfile
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from itertools import repeat
+from multiprocessing import get_context
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# type hints only, pyarrow is imported where Parquet is read or written
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+CHUNKS_JSONL = "chunks.jsonl"
+CHUNKS_PARQUET = "chunks.parquet"
+CHUNKS_MANIFEST = "chunks.manifest.json"
+SHARD_MANIFEST_VERSION = 1
+# small enough that reading a handful of chunks only decodes a few row groups
+ROW_GROUP_SIZE = 10_000
+
+METADATA_PREFIX = "metadata."
+# Parquet schema metadata listing the columns that hold JSON encoded lists of objects
+_JSON_COLUMNS_KEY = b"knowledge_utils.json_columns"
+
+
+def parquet_path(chunks_jsonl_path: Path) -> Path:
+    return chunks_jsonl_path.with_suffix(".parquet")
+
+
+def manifest_path(chunks_jsonl_path: Path) -> Path:
+    return chunks_jsonl_path.with_suffix(".manifest.json")
+
+
+def shard_path(chunks_jsonl_path: Path, index: int) -> Path:
+    return chunks_jsonl_path.with_name(f"{chunks_jsonl_path.stem}-{index:05d}.jsonl")
+
+
+def chunks_exist(chunks_jsonl_path: Path) -> bool:
+    return any(path.exists() for path in (chunks_jsonl_path, manifest_path(chunks_jsonl_path), parquet_path(chunks_jsonl_path)))
+
+
+def _chunk_source(chunks_jsonl_path: Path) -> str:
+    # chunks.jsonl or the shard manifest, whichever was written last, is the source of truth;
+    # chunks.parquet is only used while it is not older than that
+    written = {
+        layout: path.stat().st_mtime_ns
+        for layout, path in (("jsonl", chunks_jsonl_path), ("shards", manifest_path(chunks_jsonl_path)))
+        if path.exists()
+    }
+    source = max(written, key=written.get, default=None)
+    chunks_parquet_path = parquet_path(chunks_jsonl_path)
+    if chunks_parquet_path.exists() and (source is None or chunks_parquet_path.stat().st_mtime_ns >= written[source]):
+        return "parquet"
+    return source or "jsonl"
+
+
+@contextmanager
+def _atomic_output(path: Path) -> Iterator[str]:
+    # yields a temporary path in the same directory that replaces `path` once it was written
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def remove_chunk_shards(chunks_jsonl_path: Path) -> None:
+    """
+    Removes the shard manifest and every shard of a sharded chunks layout
+    """
+    manifest_path(chunks_jsonl_path).unlink(missing_ok=True)
+    for path in chunks_jsonl_path.parent.glob(f"{chunks_jsonl_path.stem}-[0-9][0-9][0-9][0-9][0-9].jsonl"):
+        path.unlink()
+
+
+class ChunkWriter:
+    """
+    Writes chunk records to chunks.jsonl, or to shards of at most `max_shard_bytes`
+    each plus a manifest when it is set.
+
+    Used as a context manager. Files of the other layout are removed on entry, and
+    chunks.jsonl or the shard manifest only replace the previous output on a clean
+    exit, so readers never see an unfinished chunks.jsonl or a manifest that lists
+    unfinished shards.
+    """
+    def __init__(self, chunks_jsonl_path: Path, max_shard_bytes: int | None = None):
+        self.chunks_jsonl_path = Path(chunks_jsonl_path)
+        self.max_shard_bytes = max_shard_bytes
+        self.count = 0
+        self.shards = []
+        self._file = None
+        self._output = None
+
+    def __enter__(self) -> "ChunkWriter":
+        remove_chunk_shards(self.chunks_jsonl_path)
+        if self.max_shard_bytes:
+            self.chunks_jsonl_path.unlink(missing_ok=True)
+        else:
+            self._output = _atomic_output(self.chunks_jsonl_path)
+            self._file = open(self._output.__enter__(), "wb")
+        return self
+
+    def write(self, chunk: dict) -> None:
+        line = (json.dumps(chunk) + "\n").encode("utf-8")
+        if self.max_shard_bytes:
+            # a chunk larger than the limit still goes into a shard, on its own
+            if not self.shards or (self.shards[-1]["count"] and self.shards[-1]["bytes"] + len(line) > self.max_shard_bytes):
+                self._start_shard()
+            shard = self.shards[-1]
+            shard["offsets"].append(shard["bytes"])
+            shard["count"] += 1
+            shard["bytes"] += len(line)
+        self._file.write(line)
+        self.count += 1
+
+    def _start_shard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        path = shard_path(self.chunks_jsonl_path, len(self.shards))
+        self.shards.append({"file": path.name, "start": self.count, "count": 0, "bytes": 0, "offsets": []})
+        self._file = open(path, "wb")
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self._file is not None:
+            self._file.close()
+        if self._output is not None:
+            self._output.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None and self.max_shard_bytes:
+            manifest = {
+                "version": SHARD_MANIFEST_VERSION,
+                "count": self.count,
+                "max_shard_bytes": self.max_shard_bytes,
+                "shards": self.shards,
+            }
+            with _atomic_output(manifest_path(self.chunks_jsonl_path)) as tmp_path:
+                with open(tmp_path, "w") as f:
+                    json.dump(manifest, f)
+
+
+def read_shard_manifest(chunks_jsonl_path: Path) -> dict:
+    """
+    Reads the manifest of a sharded chunks layout
+    Args:
+        chunks_jsonl_path (Path): Path chunks.jsonl would have; the manifest and shards are next to it
+    Returns:
+        manifest (dict): Total "count" and, per shard, its "file", the position of its first chunk
+            ("start"), its "count", its size in "bytes" and the byte "offsets" of its chunks
+    """
+    with open(manifest_path(chunks_jsonl_path), "r") as f:
+        return json.load(f)
+
+
+def flatten_chunk(chunk: dict) -> dict:
+    """
+    Flattens the nested metadata of a chunk record into dotted column names,
+    e.g. metadata["origin"]["filename"] becomes "metadata.origin.filename"
+    Args:
+        chunk (dict): Chunk record as written to chunks.jsonl
+    Returns:
+        row (dict): Flat row with the chunk, file and metadata.* columns
+    """
+    row = {key: value for key, value in chunk.items() if key != "metadata"}
+
+    def flatten(value: dict, prefix: str) -> None:
+        for key, item in value.items():
+            if isinstance(item, dict):
+                flatten(item, f"{prefix}{key}.")
+            else:
+                row[f"{prefix}{key}"] = item
+
+    flatten(chunk.get("metadata") or {}, METADATA_PREFIX)
+    return row
+
+
+def unflatten_chunk(row: dict, json_columns: Iterable[str] = ()) -> dict:
+    """
+    Rebuilds a chunk record from a row written by write_chunks_parquet()
+    Args:
+        row (dict):                 Flat row read from chunks.parquet
+        json_columns (Iterable):    Columns holding JSON encoded values
+    Returns:
+        chunk (dict): Chunk record as written to chunks.jsonl
+    """
+    chunk = {}
+    for column, value in row.items():
+        # a missing value means the record did not have the field
+        if value is None:
+            continue
+        if column in json_columns:
+            value = json.loads(value)
+        target = chunk
+        *parents, key = column.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[key] = value
+    return chunk
+
+
+def _column_array(values: list):
+    import pyarrow as pa
+
+    try:
+        return pa.array(values)
+    except OverflowError:
+        # document hashes are unsigned 64-bit integers
+        return pa.array(values, type=pa.uint64())
+
+
+def _chunk_table(rows: List[dict]) -> Tuple["pa.Table", List[str]]:
+    # a table of flattened rows, with the columns holding JSON encoded lists of objects
+    import pyarrow as pa
+
+    columns = {}
+    for row in rows:
+        for column in row:
+            columns.setdefault(column, None)
+
+    arrays = {}
+    json_columns = []
+    for column in columns:
+        values = [row.get(column) for row in rows]
+        # lists of objects like metadata.doc_items are stored as JSON, everything else natively
+        if any(isinstance(value, list) and any(isinstance(item, dict) for item in value) for value in values):
+            values = [json.dumps(value) if value is not None else None for value in values]
+            json_columns.append(column)
+        arrays[column] = _column_array(values)
+    return pa.Table.from_pydict(arrays), json_columns
+
+
+def _common_type(types: List["pa.DataType"]) -> "pa.DataType":
+    import pyarrow as pa
+
+    types = [column_type for column_type in types if column_type != pa.null()] or [pa.null()]
+    # document hashes are uint64 in the row groups where one does not fit int64
+    if pa.uint64() in types and all(pa.types.is_integer(column_type) for column_type in types):
+        return pa.uint64()
+    schemas = [pa.schema([("column", column_type)]) for column_type in types]
+    return pa.unify_schemas(schemas, promote_options="permissive").field("column").type
+
+
+class ParquetChunkWriter:
+    """
+    Writes chunk records to a Parquet file with chunk, file and flattened metadata
+    columns, one row group of ROW_GROUP_SIZE chunks at a time.
+
+    Used as a context manager. Records are not known ahead, so every row group is
+    spilled to its own part file as it fills and the parts are merged into one file
+    under the schema of all columns on a clean exit. Only one row group is held in
+    memory at a time, and the file only replaces an earlier one once it is complete.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.count = 0
+        self._rows = []
+        self._parts = []
+        self._parts_dir = None
+
+    def __enter__(self) -> "ParquetChunkWriter":
+        self._parts_dir = Path(tempfile.mkdtemp(dir=self.path.parent, prefix=f".{self.path.name}-", suffix=".parts"))
+        return self
+
+    def write(self, chunk: dict) -> None:
+        self._rows.append(flatten_chunk(chunk))
+        self.count += 1
+        if len(self._rows) >= ROW_GROUP_SIZE:
+            self._spill()
+
+    def _spill(self) -> None:
+        import pyarrow.parquet as pq
+
+        if not self._rows:
+            return
+        table, json_columns = _chunk_table(self._rows)
+        part_path = self._parts_dir / f"{len(self._parts):05d}.parquet"
+        pq.write_table(table, part_path)
+        self._parts.append({"path": part_path, "schema": table.schema, "json_columns": set(json_columns)})
+        self._rows = []
+
+    def _merge(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        json_columns = set().union(*(part["json_columns"] for part in self._parts))
+        types = {}
+        for part in self._parts:
+            for field in part["schema"]:
+                types.setdefault(field.name, []).append(pa.string() if field.name in json_columns else field.type)
+        schema = pa.schema([(column, _common_type(column_types)) for column, column_types in types.items()])
+        schema = schema.with_metadata({_JSON_COLUMNS_KEY: json.dumps([column for column in types if column in json_columns]).encode("utf-8")})
+
+        with _atomic_output(self.path) as tmp_path:
+            with pq.ParquetWriter(tmp_path, schema) as writer:
+                for part in self._parts:
+                    table = pq.read_table(part["path"])
+                    arrays = []
+                    for field in schema:
+                        if field.name not in table.column_names:
+                            # like a field missing from a JSON line, a column missing from a row group reads as None
+                            arrays.append(pa.nulls(table.num_rows, field.type))
+                            continue
+                        column = table[field.name]
+                        if field.name in json_columns and field.name not in part["json_columns"]:
+                            # a row group where the column only held empty lists or None stored it natively
+                            column = pa.array([json.dumps(value) if value is not None else None
+                                               for value in column.to_pylist()], pa.string())
+                        arrays.append(column.cast(field.type))
+                    writer.write_table(pa.Table.from_arrays(arrays, schema=schema), row_group_size=ROW_GROUP_SIZE)
+                    part["path"].unlink()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if exc_type is None:
+                self._spill()
+                self._merge()
+        finally:
+            shutil.rmtree(self._parts_dir, ignore_errors=True)
+
+
+def write_chunks_parquet(chunks: Iterable[dict], path: Path) -> Path:
+    """
+    Writes chunk records to a Parquet file with chunk, file and flattened metadata columns
+    Args:
+        chunks (Iterable[dict]):    Chunk records as written to chunks.jsonl, consumed as they are written
+        path (Path):                Output path
+    Returns:
+        path (pathlib.Path): The output path
+    """
+    with ParquetChunkWriter(path) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    return path
+
+
+def write_chunks(
+    chunks: Iterable[dict], chunks_jsonl_path: Path, parquet: bool = False, max_shard_bytes: int | None = None
+) -> int:
+    """
+    Writes chunk records to chunks.jsonl or shards, and optionally chunks.parquet
+    Args:
+        chunks (Iterable[dict]):    Chunk records, consumed as they are written
+        chunks_jsonl_path (Path):   Path to chunks.jsonl; shards and chunks.parquet are written next to it
+        parquet (bool):             Also write chunks.parquet with chunk, file and flattened metadata columns
+        max_shard_bytes (int):      Write shards of at most this size and a manifest instead of chunks.jsonl
+    Returns:
+        count (int): Number of chunks written
+    """
+    with ExitStack() as stack:
+        # entered first so it is completed last: readers only use chunks.parquet while it is not older than chunks.jsonl
+        parquet_writer = stack.enter_context(ParquetChunkWriter(parquet_path(chunks_jsonl_path))) if parquet else None
+        writer = stack.enter_context(ChunkWriter(chunks_jsonl_path, max_shard_bytes))
+        for chunk in chunks:
+            writer.write(chunk)
+            if parquet_writer is not None:
+                parquet_writer.write(chunk)
+
+    if not parquet:
+        # readers prefer chunks.parquet, so never leave one from an earlier run behind
+        parquet_path(chunks_jsonl_path).unlink(missing_ok=True)
+    return writer.count
+
+
+def iter_chunk_records(chunks_jsonl_path: Path) -> Iterator[dict]:
+    """
+    Yields every chunk record in order without loading them all at once
+    Args:
+        chunks_jsonl_path (Path): Path to chunks.jsonl. Shards or chunks.parquet next to it are used when present
+    Returns:
+        chunks (Iterator[dict]): Chunk records
+    """
+    source = _chunk_source(chunks_jsonl_path)
+    if source == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(parquet_path(chunks_jsonl_path))
+        json_columns = set(json.loads(parquet_file.schema_arrow.metadata.get(_JSON_COLUMNS_KEY, b"[]")))
+        for batch in parquet_file.iter_batches(batch_size=ROW_GROUP_SIZE):
+            for row in batch.to_pylist():
+                yield unflatten_chunk(row, json_columns)
+        return
+
+    if source == "shards":
+        paths = [chunks_jsonl_path.with_name(shard["file"]) for shard in read_shard_manifest(chunks_jsonl_path)["shards"]]
+    else:
+        paths = [chunks_jsonl_path]
+    for path in paths:
+        with open(path, "r") as file:
+            for line in file:
+                yield json.loads(line)
+
+
+def count_chunks(chunks_jsonl_path: Path) -> int:
+    """
+    Returns the number of chunks without decoding them
+    Args:
+        chunks_jsonl_path (Path): Path to chunks.jsonl. Shards or chunks.parquet next to it are used when present
+    Returns:
+        count (int): Number of chunks
+    """
+    source = _chunk_source(chunks_jsonl_path)
+    if source == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(parquet_path(chunks_jsonl_path)).metadata.num_rows
+    if source == "shards":
+        return read_shard_manifest(chunks_jsonl_path)["count"]
+
+    with open(chunks_jsonl_path, "rb") as file:
+        return sum(1 for _ in file)
+
+
+def _read_jsonl_columns(path: Path, columns: Sequence[str]) -> Dict[str, list]:
+    result = {column: [] for column in columns}
+    # flattening the metadata is only worth it when a metadata column is requested
+    flatten = flatten_chunk if any(column.startswith(METADATA_PREFIX) for column in columns) else dict
+    with open(path, "r") as file:
+        for line in file:
+            row = flatten(json.loads(line))
+            for column in columns:
+                result[column].append(row.get(column))
+    return result
+
+
+def read_chunk_columns(
+    chunks_jsonl_path: Path, columns: Sequence[str] = ("chunk", "file"), workers: int | None = None
+) -> Dict[str, list]:
+    """
+    Reads some columns of every chunk. From chunks.parquet only those columns are decoded
+    Args:
+        chunks_jsonl_path (Path):   Path to chunks.jsonl. Shards or chunks.parquet next to it are used when present
+        columns (Sequence[str]):    Top-level fields or flattened metadata.* columns to read
+        workers (int):              Processes reading shards in parallel. Defaults to one per shard, up to the CPU count
+    Returns:
+        columns (Dict[str, list]): Values of each column in chunk order
+    """
+    source = _chunk_source(chunks_jsonl_path)
+    if source == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(parquet_path(chunks_jsonl_path))
+        # like a field missing from a JSON line, a column missing from an older file reads as None
+        present = [column for column in columns if column in parquet_file.schema_arrow.names]
+        result = parquet_file.read(columns=present).to_pydict()
+        return {column: result.get(column, [None] * parquet_file.metadata.num_rows) for column in columns}
+    if source == "jsonl":
+        return _read_jsonl_columns(chunks_jsonl_path, columns)
+
+    shard_paths = [chunks_jsonl_path.with_name(shard["file"]) for shard in read_shard_manifest(chunks_jsonl_path)["shards"]]
+    workers = workers or min(len(shard_paths), os.cpu_count() or 1)
+    if workers <= 1:
+        parts = [_read_jsonl_columns(path, columns) for path in shard_paths]
+    else:
+        # decoding JSON holds the GIL, so shards are read in processes
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+            parts = list(executor.map(_read_jsonl_columns, shard_paths, repeat(columns)))
+
+    result = {column: [] for column in columns}
+    for part in parts:
+        for column in columns:
+            result[column].extend(part[column])
+    return result
+
+
+def read_chunk_records(chunks_jsonl_path: Path, indices: List[int]) -> List[dict]:
+    """
+    Reads the full records of some chunks without decoding the others
+    Args:
+        chunks_jsonl_path (Path):   Path to chunks.jsonl. Shards or chunks.parquet next to it are used when present
+        indices (List[int]):        Positions of the chunks to read
+    Returns:
+        chunks (List[dict]): Chunk records in the order of `indices`
+    """
+    source = _chunk_source(chunks_jsonl_path)
+    records = {}
+    if source == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(parquet_path(chunks_jsonl_path))
+        json_columns = set(json.loads(parquet_file.schema_arrow.metadata.get(_JSON_COLUMNS_KEY, b"[]")))
+
+        # only the row groups holding a requested chunk are read
+        start = 0
+        for group in range(parquet_file.num_row_groups):
+            end = start + parquet_file.metadata.row_group(group).num_rows
+            wanted = sorted({index for index in indices if start <= index < end})
+            if wanted:
+                rows = parquet_file.read_row_group(group).take([index - start for index in wanted]).to_pylist()
+                records.update({index: unflatten_chunk(row, json_columns) for index, row in zip(wanted, rows)})
+            start = end
+    elif source == "shards":
+        manifest = read_shard_manifest(chunks_jsonl_path)
+        shards = manifest["shards"]
+        starts = [shard["start"] for shard in shards]
+
+        # only the shards holding a requested chunk are opened, and each chunk is read at its offset
+        wanted = {}
+        for index in set(indices):
+            if 0 <= index < manifest["count"]:
+                wanted.setdefault(bisect.bisect_right(starts, index) - 1, []).append(index)
+        for shard_index, shard_indices in wanted.items():
+            shard = shards[shard_index]
+            with open(chunks_jsonl_path.with_name(shard["file"]), "rb") as file:
+                for index in sorted(shard_indices):
+                    file.seek(shard["offsets"][index - shard["start"]])
+                    records[index] = json.loads(file.readline())
+    else:
+        wanted = set(indices)
+        with open(chunks_jsonl_path, "r") as file:
+            for index, line in enumerate(file):
+                if index in wanted:
+                    records[index] = json.loads(line)
+
+    missing = [index for index in indices if index not in records]
+    if missing:
+        raise IndexError(f"{chunks_jsonl_path} has no chunks at positions {missing}")
+    return [records[index] for index in indices]
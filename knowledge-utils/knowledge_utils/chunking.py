@@ -0,0 +1,109 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, List
+
+from .chunk_store import CHUNKS_JSONL, write_chunks
+from .document_io import CHUNKING_PARTS, find_docling_documents, load_docling_document
+from .instrumentation import trace
+
+# type hints only, see create_chunker()
+if TYPE_CHECKING:
+    from docling.chunking import HybridChunker
+    from docling_core.types.doc import DoclingDocument
+
+
+def tokenizer_name(chunker: "HybridChunker") -> str | None:
+    """
+    Returns the name of the tokenizer a chunker counts tokens with, e.g. the Hugging Face model id
+    """
+    tokenizer = getattr(chunker.tokenizer, "tokenizer", None)
+    return getattr(tokenizer, "name_or_path", None) or getattr(tokenizer, "name", None)
+
+
+def create_chunker(tokenizer: str | None = None, max_tokens: int | None = None) -> "HybridChunker":
+    """
+    Creates a HybridChunker
+    Args:
+        tokenizer (str):    Hugging Face tokenizer to count tokens with. Defaults to the HybridChunker default
+        max_tokens (int):   Maximum number of tokens per chunk. Defaults to the limit of the tokenizer
+    Returns:
+        chunker (HybridChunker): The chunker
+    """
+    from docling.chunking import HybridChunker
+
+    options = {key: value for key, value in (("tokenizer", tokenizer), ("max_tokens", max_tokens)) if value is not None}
+    return HybridChunker(**options)
+
+
+def chunk_docling_document(doc: "DoclingDocument", chunker: "HybridChunker | None" = None) -> List[dict]:
+    """
+    Chunks a Docling document
+    Args:
+        doc (DoclingDocument):      Document to chunk, as converted or loaded from Docling JSON
+        chunker (HybridChunker):    Chunker to use. Defaults to a HybridChunker with default settings
+    Returns:
+        chunks (List[dict]): Chunks with the `chunk`, `file`, `num_tokens`, `tokenizer` and `metadata` fields written
+            to chunks.jsonl. `num_tokens` is the length of `chunk` counted with the chunker's tokenizer
+    """
+    if chunker is None:
+        chunker = create_chunker()
+    name = tokenizer_name(chunker)
+
+    chunks = []
+    for chunk in chunker.chunk(dl_doc=doc):
+        text = chunker.contextualize(chunk=chunk)
+        # the tokenizer is already loaded, so the count is cheap here and saves retokenizing later
+        chunks.append(dict(
+            chunk=text,
+            file=doc.name,
+            num_tokens=chunker.tokenizer.count_tokens(text=text),
+            tokenizer=name,
+            metadata=chunk.meta.export_json_dict(),
+        ))
+    return chunks
+
+
+def chunk_document(json_file: Path, chunker: "HybridChunker | None" = None) -> List[dict]:
+    """
+    Chunks a Docling JSON document
+    Args:
+        json_file (Path):           Path to the Docling JSON produced by conversion, plain or compact
+        chunker (HybridChunker):    Chunker to use. Defaults to a HybridChunker with default settings
+    Returns:
+        chunks (List[dict]): Chunks as returned by chunk_docling_document()
+    """
+    with trace("chunk_document", file=str(json_file)) as span:
+        doc = load_docling_document(json_file, CHUNKING_PARTS)
+        chunks = chunk_docling_document(doc, chunker)
+        span["items"] += len(chunks)
+
+    return chunks
+
+
+def chunk_documents(
+    conversion_dir: Path,
+    output_dir: Path,
+    chunker: "HybridChunker | None" = None,
+    parquet: bool = False,
+    max_shard_bytes: int | None = None,
+) -> Path:
+    """
+    Chunks every Docling JSON document in a directory into a single chunks.jsonl
+    Args:
+        conversion_dir (Path):      Directory containing Docling JSON files, plain or compact
+        output_dir (Path):          Directory chunks.jsonl is written to
+        chunker (HybridChunker):    Chunker to use. Defaults to a HybridChunker with default settings
+        parquet (bool):             Also write chunks.parquet with chunk, file and flattened metadata columns
+        max_shard_bytes (int):      Write shards of at most this size and chunks.manifest.json instead of chunks.jsonl
+    Returns:
+        chunks_file_path (pathlib.Path): Path to chunks.jsonl, which the chunk_store readers resolve to the shards
+            when sharded
+    """
+    if chunker is None:
+        chunker = create_chunker()
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    chunks_file_path = output_dir / CHUNKS_JSONL
+    chunks = (chunk for json_file in find_docling_documents(conversion_dir) for chunk in chunk_document(json_file, chunker))
+    write_chunks(chunks, chunks_file_path, parquet, max_shard_bytes)
+
+    return chunks_file_path
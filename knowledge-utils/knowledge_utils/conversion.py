@@ -0,0 +1,553 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache, partial
+from multiprocessing import get_context
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from .document_io import COMPACT_SUFFIX, load_docling_document, save_docling_document
+from .instrumentation import trace
+
+# type hints only, docling itself is imported by create_document_converter()
+if TYPE_CHECKING:
+    from docling.document_converter import DocumentConverter
+    from docling_core.types.doc import DoclingDocument
+
+# pages converted by one job when a PDF is split across processes or checkpointed
+PAGES_PER_JOB = 50
+# .<file stem>.checkpoint/ next to the Docling JSON holds the page ranges converted so far
+CHECKPOINT_SUFFIX = ".checkpoint"
+CHECKPOINT_FILE = "checkpoint.json"
+HASH_BLOCK_SIZE = 1024 * 1024
+# conversion pipelines of the conversion notebook, cheapest first
+PIPELINES = ("text", "standard", "ocr", "vlm")
+# <file stem>.pages.jsonl next to the Docling JSON records the pipeline of every page when pages are reconverted
+# or routed
+PAGE_REPORT_SUFFIX = ".pages.jsonl"
+
+
+def create_document_converter(pipeline: str = "standard") -> "DocumentConverter":
+    """
+    Creates a Docling converter with one of the PDF pipelines of the conversion notebook
+    Args:
+        pipeline (str): "standard" for the standard pipeline options, "text" for the standard pipeline without
+                        OCR, "ocr" to force OCR on every page or "vlm" for the SmolDocling VLM pipeline
+    Returns:
+        doc_converter (DocumentConverter): Converter for PDF documents
+    """
+    from docling.datamodel.base_models import InputFormat
+    from docling.document_converter import DocumentConverter, PdfFormatOption
+
+    if pipeline in ("standard", "text"):
+        from docling.datamodel.pipeline_options import PdfPipelineOptions
+
+        # without OCR, all text comes from the PDF's text layer
+        format_option = PdfFormatOption(pipeline_options=PdfPipelineOptions(do_ocr=pipeline == "standard"))
+    elif pipeline == "ocr":
+        from docling.backend.docling_parse_v4_backend import DoclingParseV4DocumentBackend
+        from docling.datamodel.pipeline_options import EasyOcrOptions, PdfPipelineOptions
+
+        pipeline_options = PdfPipelineOptions(do_ocr=True, ocr_options=EasyOcrOptions(force_full_page_ocr=True))
+        format_option = PdfFormatOption(pipeline_options=pipeline_options, backend=DoclingParseV4DocumentBackend)
+    elif pipeline == "vlm":
+        from docling.datamodel.pipeline_options import VlmPipelineOptions, smoldocling_vlm_conversion_options
+        from docling.pipeline.vlm_pipeline import VlmPipeline
+
+        pipeline_options = VlmPipelineOptions(vlm_options=smoldocling_vlm_conversion_options)
+        format_option = PdfFormatOption(pipeline_options=pipeline_options, pipeline_cls=VlmPipeline)
+    else:
+        raise ValueError(f"Unknown pipeline {pipeline!r}, expected one of {', '.join(PIPELINES)}")
+
+    return DocumentConverter(format_options={InputFormat.PDF: format_option})
+
+
+@lru_cache(maxsize=None)
+def get_pipeline_converter(pipeline: str = "standard") -> "DocumentConverter":
+    """
+    Returns the converter of a pipeline, created once per process so its models are loaded once
+    """
+    return create_document_converter(pipeline)
+
+
+def count_pdf_pages(file: Path) -> int:
+    """
+    Returns the number of pages of a PDF without converting it
+    """
+    # pypdfium2 is the PDF backend docling installs
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(str(file))
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def page_ranges(first: int, last: int, pages_per_job: int = PAGES_PER_JOB) -> List[Tuple[int, int]]:
+    """
+    Splits the pages first to last, 1-based and inclusive, into ranges of at most pages_per_job pages
+    """
+    return [(start, min(start + pages_per_job - 1, last)) for start in range(first, last + 1, pages_per_job)]
+
+
+def renumber_pages(doc: "DoclingDocument", page_numbers: Dict[int, int]) -> "DoclingDocument":
+    """
+    Moves the pages of a document, and the provenance of its items, to other page numbers in place
+    Args:
+        doc (DoclingDocument):          Document to renumber
+        page_numbers (Dict[int, int]):  New number by current number. Pages missing from it keep their number
+    Returns:
+        doc (DoclingDocument): The renumbered document
+    """
+    from docling_core.types.doc import ContentLayer
+
+    doc.pages = {page_numbers.get(page_no, page_no): page for page_no, page in doc.pages.items()}
+    for page_no, page in doc.pages.items():
+        page.page_no = page_no
+    for item, _ in doc.iterate_items(with_groups=False, traverse_pictures=True, included_content_layers=set(ContentLayer)):
+        for prov in getattr(item, "prov", []):
+            prov.page_no = page_numbers.get(prov.page_no, prov.page_no)
+    for item in [*doc.key_value_items, *doc.form_items]:
+        for cell in item.graph.cells:
+            if cell.prov is not None:
+                cell.prov.page_no = page_numbers.get(cell.prov.page_no, cell.prov.page_no)
+    return doc
+
+
+def merge_page_documents(parts: Sequence["DoclingDocument"]) -> "DoclingDocument":
+    """
+    Merges the conversions of consecutive page ranges of one source document
+    Args:
+        parts (Sequence[DoclingDocument]):  Conversions of the page ranges, in page order
+    Returns:
+        doc (DoclingDocument): One document with the pages, items and provenance of all parts. Page numbers
+            are those of the source document, as in a conversion of all pages at once
+    """
+    from docling_core.types.doc import DoclingDocument
+
+    doc = DoclingDocument.concatenate(parts)
+    doc.name = parts[0].name
+    doc.origin = parts[0].origin
+
+    # concatenate() numbers the pages of every part on from the last page of the previous one, which
+    # shifts them when a page failed to convert or the first part does not start at page 1. Replay its
+    # numbering to map them back
+    renumbered: Dict[int, int] = {}
+    last_page = 0
+    for part in parts:
+        if part.pages:
+            shift = last_page - min(part.pages) + 1
+            renumbered.update({page_no + shift: page_no for page_no in part.pages})
+            last_page = max(part.pages) + shift
+    if any(new != old for new, old in renumbered.items()):
+        renumber_pages(doc, renumbered)
+    return doc
+
+
+def checkpoint_path(file: Path, output_dir: Path) -> Path:
+    """
+    Returns the directory the page range checkpoints of a source document are written to
+    """
+    return output_dir / f".{file.stem}{CHECKPOINT_SUFFIX}"
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def converter_fingerprint(doc_converter: "DocumentConverter") -> str:
+    """
+    Returns a hash of the pipelines, pipeline options and backends of a converter, which tells apart e.g. forced
+    OCR from the standard pipeline or table structure on from off
+    """
+    def class_name(cls) -> str:
+        return f"{cls.__module__}.{cls.__qualname__}"
+
+    # format_to_options only exists on Docling converters, other converters are told apart by their type
+    description = [class_name(type(doc_converter))]
+    for input_format, option in sorted(getattr(doc_converter, "format_to_options", {}).items(), key=lambda i: str(i[0])):
+        description += [str(input_format), class_name(option.pipeline_cls), class_name(option.backend)]
+        if option.pipeline_options is not None:
+            description.append(option.pipeline_options.model_dump_json())
+    return hashlib.sha256("\n".join(description).encode()).hexdigest()
+
+
+def _range_checkpoint(checkpoint_dir: Path, page_range: Tuple[int, int]) -> Path:
+    return checkpoint_dir / f"pages-{page_range[0]:05d}-{page_range[1]:05d}.json"
+
+
+def load_page_checkpoints(
+    checkpoint_dir: Path, file: Path, jobs: List[Tuple[int, int]], converter: str = ""
+) -> Dict[Tuple[int, int], "DoclingDocument"]:
+    """
+    Loads the page ranges of a source document converted by an earlier, interrupted run
+    Args:
+        checkpoint_dir (Path):              Checkpoint directory of the source document
+        file (Path):                        Path to the source document
+        jobs (List[Tuple[int, int]]):       Page ranges of the conversion
+        converter (str):                    converter_fingerprint() of the converter of the conversion
+    Returns:
+        parts (Dict[Tuple[int, int], DoclingDocument]): Converted page ranges by range. Checkpoints of another
+            version of the source document, or of another converter, are removed and none are returned
+    """
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_file = checkpoint_dir / CHECKPOINT_FILE
+    source = {"file": file.name, "sha256": _file_sha256(file), "converter": converter}
+    if checkpoint_file.exists() and json.loads(checkpoint_file.read_text()) == source:
+        return {job: load_docling_document(_range_checkpoint(checkpoint_dir, job))
+                for job in jobs if _range_checkpoint(checkpoint_dir, job).exists()}
+
+    for path in checkpoint_dir.iterdir():
+        path.unlink()
+    checkpoint_file.write_text(json.dumps(source))
+    return {}
+
+
+# converter of a page conversion worker process, created once by _init_page_worker()
+_page_converter = None
+
+
+def _init_page_worker(converter_factory: Callable[[], "DocumentConverter"]) -> None:
+    global _page_converter
+    _page_converter = converter_factory()
+
+
+def _convert_page_range(file: Path, page_range: Tuple[int, int]) -> "DoclingDocument":
+    return _page_converter.convert(source=file, page_range=page_range).document
+
+
+def _unpickled_converter(doc_converter: "DocumentConverter") -> "DocumentConverter":
+    # a converter factory of worker processes, which each unpickle their own copy of doc_converter
+    return doc_converter
+
+
+def page_worker_pool(converter_factory: Callable[[], "DocumentConverter"], workers: int) -> ProcessPoolExecutor:
+    """
+    Starts the worker processes of page range conversions, to pass to several convert_pdf_pages() calls
+    Args:
+        converter_factory (Callable):   Picklable function creating the converter of each worker process
+        workers (int):                  Worker processes
+    Returns:
+        executor (ProcessPoolExecutor): The pool, which the caller shuts down
+    """
+    # every worker loads the models once and converts the jobs it is given, in any order
+    return ProcessPoolExecutor(max_workers=workers,
+                               mp_context=get_context("spawn"),
+                               initializer=_init_page_worker,
+                               initargs=(converter_factory,))
+
+
+def _convert_page_jobs(
+    file: Path,
+    jobs: List[Tuple[int, int]],
+    converter_factory: Callable[[], "DocumentConverter"],
+    workers: int,
+    doc_converter: "DocumentConverter | None",
+    executor: ProcessPoolExecutor | None = None,
+) -> Iterator[Tuple[Tuple[int, int], "DoclingDocument"]]:
+    # yields every page range as soon as it is converted, so it can be checkpointed before the next one finishes
+    if executor is None and workers <= 1:
+        doc_converter = doc_converter or converter_factory()
+        for job in jobs:
+            yield job, doc_converter.convert(source=file, page_range=job).document
+        return
+
+    owned = executor is None
+    if owned:
+        executor = page_worker_pool(converter_factory, workers)
+    pending = {}
+    try:
+        pending = {executor.submit(_convert_page_range, file, job): job for job in jobs}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    finally:
+        if owned:
+            executor.shutdown(cancel_futures=True)
+        else:
+            # a pool shared with later calls only drops the jobs of this one
+            for future in pending:
+                future.cancel()
+
+
+def convert_pdf_pages(
+    file: Path,
+    converter_factory: Callable[[], "DocumentConverter"] = create_document_converter,
+    workers: int | None = None,
+    pages_per_job: int = PAGES_PER_JOB,
+    page_range: Tuple[int, int] | None = None,
+    checkpoint_dir: Path | None = None,
+    doc_converter: "DocumentConverter | None" = None,
+    executor: ProcessPoolExecutor | None = None,
+) -> "DoclingDocument":
+    """
+    Converts a PDF as page range jobs, in parallel processes, and merges them into one document
+    Args:
+        file (Path):                        Path to the source PDF
+        converter_factory (Callable):       Picklable function creating the converter of each worker process.
+                                            Defaults to the standard pipeline
+        workers (int):                      Worker processes. Defaults to one per job, up to the CPU count.
+                                            1 converts the jobs one by one in this process
+        pages_per_job (int):                Pages converted by one job
+        page_range (Tuple[int, int]):       Only convert the pages first to last, 1-based and inclusive
+        checkpoint_dir (Path):              Write every converted page range to this directory, and only convert
+                                            the ranges missing from it. Ranges of another version of the source or
+                                            another converter are discarded. Not checkpointed by default
+        doc_converter (DocumentConverter):  Converter of this process when workers is 1. Defaults to one
+                                            created by converter_factory
+        executor (ProcessPoolExecutor):     Convert the jobs in this page_worker_pool() instead of starting
+                                            workers processes. Its workers keep their own converter, so
+                                            converter_factory only fingerprints checkpoints
+    Returns:
+        doc (DoclingDocument): The converted document, with the page numbers of the source PDF. Resuming from
+            checkpoints gives the same document as converting all page ranges in one run
+    """
+    num_pages = count_pdf_pages(file)
+    first, last = page_range or (1, num_pages)
+    jobs = page_ranges(first, min(last, num_pages), pages_per_job)
+
+    parts = {}
+    if checkpoint_dir is not None:
+        # ranges converted with another pipeline or other options would be merged into one document. Creating a
+        # converter does not load its models, which happens on its first conversion
+        doc_converter = doc_converter or converter_factory()
+        parts = load_page_checkpoints(checkpoint_dir, file, jobs, converter_fingerprint(doc_converter))
+    pending = [job for job in jobs if job not in parts]
+    if not pending:
+        return merge_page_documents([parts[job] for job in jobs])
+
+    workers = workers or min(len(pending), os.cpu_count() or 1)
+    for job, part in _convert_page_jobs(file, pending, converter_factory, workers, doc_converter, executor):
+        if checkpoint_dir is not None:
+            with trace("save_page_checkpoint", file=str(file)) as span:
+                save_docling_document(part, _range_checkpoint(checkpoint_dir, job))
+                span["items"] += len(part.pages)
+        parts[job] = part
+    return merge_page_documents([parts[job] for job in jobs])
+
+
+def convert_source(
+    file: Path,
+    doc_converter: "DocumentConverter | None" = None,
+    page_workers: int = 1,
+    pages_per_job: int = PAGES_PER_JOB,
+    checkpoint_dir: Path | None = None,
+    converter_factory: Callable[[], "DocumentConverter"] | None = None,
+) -> "DoclingDocument":
+    """
+    Converts a source document, splitting a PDF of more than pages_per_job pages into page range jobs
+    Args:
+        file (Path):                        Path to the source document
+        doc_converter (DocumentConverter):  Converter to use in this process. Defaults to the standard pipeline
+        page_workers (int):                 Processes converting the page ranges of a long PDF, each with a
+                                            converter of converter_factory. 1, the default, converts it in this
+                                            process
+        pages_per_job (int):                Pages converted by one job
+        checkpoint_dir (Path):              Checkpoint the page ranges of a long PDF in this directory and resume
+                                            from the ranges already there. Not checkpointed by default
+        converter_factory (Callable):       Picklable function creating the same converter as doc_converter in the
+                                            page_workers processes. Defaults to the standard pipeline, and is
+                                            required with page_workers when doc_converter is given
+    Returns:
+        doc (DoclingDocument): The converted document
+    """
+    if ((page_workers > 1 or checkpoint_dir is not None)
+            and file.suffix.lower() == ".pdf" and count_pdf_pages(file) > pages_per_job):
+        # the worker processes cannot use doc_converter, and the standard pipeline would silently replace it
+        if page_workers > 1 and doc_converter is not None and converter_factory is None:
+            raise ValueError("page_workers needs the converter_factory creating doc_converter in every worker process")
+        return convert_pdf_pages(file,
+                                 converter_factory or create_document_converter,
+                                 workers=page_workers,
+                                 pages_per_job=pages_per_job,
+                                 checkpoint_dir=checkpoint_dir,
+                                 doc_converter=doc_converter)
+    if doc_converter is None:
+        doc_converter = create_document_converter()
+    return doc_converter.convert(source=file).document
+
+
+def save_conversion(doc: "DoclingDocument", file: Path, output_dir: Path, compact: bool = False) -> Path:
+    """
+    Writes the conversion of a source document to Docling JSON
+    Args:
+        doc (DoclingDocument):  Converted document
+        file (Path):            Path to the source document
+        output_dir (Path):      Directory the <file stem>.json output is written to
+        compact (bool):         Write zstd-compressed <file stem>.json.zst instead
+    Returns:
+        json_output_path (pathlib.Path): Path to the Docling JSON file
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    json_output_path = output_dir / f"{file.stem}{COMPACT_SUFFIX if compact else '.json'}"
+    # a conversion left in the other format would be chunked twice
+    stale_output_path = output_dir / f"{file.stem}{'.json' if compact else COMPACT_SUFFIX}"
+
+    save_docling_document(doc, json_output_path)
+    stale_output_path.unlink(missing_ok=True)
+    # a page report of an earlier conversion does not describe this one
+    (output_dir / f"{file.stem}{PAGE_REPORT_SUFFIX}").unlink(missing_ok=True)
+    # the page ranges of an interrupted run are not needed anymore
+    shutil.rmtree(checkpoint_path(file, output_dir), ignore_errors=True)
+    return json_output_path
+
+
+def convert_document(
+    file: Path,
+    output_dir: Path,
+    doc_converter: "DocumentConverter | None" = None,
+    compact: bool = False,
+    page_workers: int = 1,
+    pages_per_job: int = PAGES_PER_JOB,
+    checkpoint: bool = False,
+    reconvert_below: float | None = None,
+    fallback_pipeline: str = "ocr",
+    route_pages: bool = False,
+    converter_factory: Callable[[], "DocumentConverter"] | None = None,
+    compare_ocr: bool = False,
+) -> Path:
+    """
+    Converts a single source document to Docling JSON
+    Args:
+        file (Path):                        Path to the source document
+        output_dir (Path):                  Directory the <file stem>.json output is written to
+        doc_converter (DocumentConverter):  Converter to use. Defaults to the standard pipeline
+        compact (bool):                     Write zstd-compressed <file stem>.json.zst instead
+        page_workers (int):                 Processes converting the page ranges of a PDF of more than
+                                            pages_per_job pages. 1, the default, converts it in this process
+        pages_per_job (int):                Pages converted by one job
+        checkpoint (bool):                  Write the converted page ranges of a PDF of more than pages_per_job
+                                            pages to .<file stem>.checkpoint/ in output_dir, and resume from them
+                                            after an interrupted run. Removed once the Docling JSON is written
+        reconvert_below (float):            Reconvert the pages with a confidence score below this with
+                                            fallback_pipeline, and write the pipeline of every page to
+                                            <file stem>.pages.jsonl. Not combined with page_workers or checkpoint
+        fallback_pipeline (str):            Pipeline low-confidence pages are reconverted with, "ocr" or "vlm"
+        route_pages (bool):                 Convert every page of a PDF with the cheapest adequate pipeline instead
+                                            of doc_converter, and write the pipeline of every page to
+                                            <file stem>.pages.jsonl. Not combined with reconvert_below, page_workers
+                                            or checkpoint
+        converter_factory (Callable):       Picklable function creating doc_converter in the page_workers processes,
+                                            see convert_source()
+        compare_ocr (bool):                 With route_pages, also convert the whole PDF with forced OCR to measure
+                                            the time routing saved. The timing is recorded in the convert_document
+                                            trace span, without a time saved unless it was measured
+    Returns:
+        json_output_path (pathlib.Path): Path to the Docling JSON file
+    """
+    if reconvert_below is not None and (page_workers > 1 or checkpoint):
+        raise ValueError("Low-confidence pages are only reconverted in single conversions, "
+                         "without page_workers or checkpoint")
+    if route_pages and (reconvert_below is not None or page_workers > 1 or checkpoint):
+        raise ValueError("Pages are only routed in single conversions, "
+                         "without reconvert_below, page_workers or checkpoint")
+
+    with trace("convert_document", file=str(file)) as span:
+        if route_pages and file.suffix.lower() == ".pdf":
+            from .reconversion import save_page_report
+            from .routing import convert_with_routing
+
+            doc, page_report, timing = convert_with_routing(file, compare_ocr=compare_ocr)
+            span["attributes"]["routing"] = {
+                key: round(value, 4) if isinstance(value, float) else value for key, value in timing.items()
+            }
+            json_output_path = save_conversion(doc, file, output_dir, compact)
+            save_page_report(page_report, file, output_dir)
+        elif reconvert_below is not None:
+            from .reconversion import convert_with_reconversion, save_page_report
+
+            doc, page_report = convert_with_reconversion(file, doc_converter, reconvert_below, fallback_pipeline)
+            json_output_path = save_conversion(doc, file, output_dir, compact)
+            save_page_report(page_report, file, output_dir)
+        else:
+            checkpoint_dir = checkpoint_path(file, output_dir) if checkpoint else None
+            doc = convert_source(file, doc_converter, page_workers, pages_per_job, checkpoint_dir, converter_factory)
+            json_output_path = save_conversion(doc, file, output_dir, compact)
+        span["items"] += len(doc.pages)
+
+    return json_output_path
+
+
+def convert_documents(
+    source_dir: Path,
+    output_dir: Path,
+    doc_converter: "DocumentConverter | None" = None,
+    compact: bool = False,
+    page_workers: int = 1,
+    pages_per_job: int = PAGES_PER_JOB,
+    checkpoint: bool = False,
+    workers: int = 1,
+    reconvert_below: float | None = None,
+    fallback_pipeline: str = "ocr",
+    route_pages: bool = False,
+    converter_factory: Callable[[], "DocumentConverter"] | None = None,
+    compare_ocr: bool = False,
+) -> List[Path]:
+    """
+    Converts every PDF in a directory to Docling JSON
+    Args:
+        source_dir (Path):                  Directory containing the source PDFs
+        output_dir (Path):                  Directory the Docling JSON files are written to
+        doc_converter (DocumentConverter):  Converter to use. Defaults to the standard pipeline
+        compact (bool):                     Write zstd-compressed .json.zst files instead
+        page_workers (int):                 Processes converting the page ranges of a PDF of more than
+                                            pages_per_job pages. 1, the default, converts it in this process
+        pages_per_job (int):                Pages converted by one job
+        checkpoint (bool):                  Write the converted page ranges of a PDF of more than pages_per_job
+                                            pages to .<file stem>.checkpoint/ in output_dir, and resume from them
+                                            after an interrupted run. Removed once the Docling JSON is written
+        workers (int):                      Convert the PDFs in this many processes with schedule_conversions(),
+                                            the longest first, instead of one by one in this process. Every
+                                            process creates its converter with converter_factory, or unpickles a
+                                            copy of doc_converter, which must then be picklable
+        reconvert_below (float):            Reconvert the pages with a confidence score below this with
+                                            fallback_pipeline, see convert_document()
+        fallback_pipeline (str):            Pipeline low-confidence pages are reconverted with, "ocr" or "vlm"
+        route_pages (bool):                 Convert every page with the cheapest adequate pipeline, see
+                                            convert_document()
+        converter_factory (Callable):       Picklable function creating doc_converter in the page_workers and
+                                            workers processes, see convert_source()
+        compare_ocr (bool):                 With route_pages, also time a forced OCR conversion of every PDF, see
+                                            convert_document()
+    Returns:
+        json_files (List[pathlib.Path]): Paths to the Docling JSON files
+    Raises:
+        ValueError: When doc_converter cannot be pickled to the workers processes and there is no converter_factory
+    """
+    source_files = sorted(source_dir.glob("*.pdf"))
+    if workers > 1:
+        from .scheduler import schedule_conversions
+
+        if converter_factory is None and doc_converter is not None:
+            # the scheduler's default converter would silently replace doc_converter
+            try:
+                pickle.dumps(doc_converter)
+            except Exception as e:
+                raise ValueError("workers needs a picklable doc_converter or the converter_factory creating it "
+                                 "in every worker process") from e
+            converter_factory = partial(_unpickled_converter, doc_converter)
+        return schedule_conversions(source_files, output_dir, converter_factory or create_document_converter,
+                                    workers=workers, compact=compact, checkpoint=checkpoint,
+                                    reconvert_below=reconvert_below, fallback_pipeline=fallback_pipeline,
+                                    route_pages=route_pages, compare_ocr=compare_ocr,
+                                    page_workers=page_workers, pages_per_job=pages_per_job)
+
+    if doc_converter is None and not route_pages:
+        doc_converter = create_document_converter()
+        converter_factory = converter_factory or create_document_converter
+
+    return [
+        convert_document(file, output_dir, doc_converter, compact, page_workers, pages_per_job, checkpoint,
+                         reconvert_below, fallback_pipeline, route_pages, converter_factory, compare_ocr)
+        for file in source_files
+    ]
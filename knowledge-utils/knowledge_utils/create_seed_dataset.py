@@ -0,0 +1,498 @@
+# Standard
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+import json
+import logging
+import math
+import re
+import shutil
+from typing import TYPE_CHECKING, List, Dict, Tuple
+
+# Third Party
+import yaml
+
+# Local
+from .chunk_store import CHUNKS_JSONL, chunks_exist, read_chunk_columns
+from .instrumentation import instrumented
+from .token_estimator import TokenCountEstimator
+
+logger = logging.getLogger(__name__)
+
+# datasets and transformers are imported inside the functions that use them
+if TYPE_CHECKING:
+    from datasets import Dataset
+
+# tokenizer the chunk token bounds are counted with
+SEED_TOKENIZER = "instructlab/granite-7b-lab"
+MAX_TOKEN_COUNT = 1024
+MIN_TOKEN_COUNT = 100
+
+# text columns of the seed dataset that export_seed_dataset() stores the input_ids of
+TEXT_COLUMNS = [
+    "document",
+    "document_outline",
+    "domain",
+    "icl_document",
+    "icl_query_1",
+    "icl_response_1",
+    "icl_query_2",
+    "icl_response_2",
+    "icl_query_3",
+    "icl_response_3",
+]
+EXPORT_FORMATS = ["arrow", "parquet"]
+EXPORT_MANIFEST = "export.json"
+EXPORT_SHARD_BYTES = 500 * 1024 * 1024
+
+def get_seed_dataset(
+    chunks_path: Path,
+    seed_examples_path: Path,
+    icls_per_chunk: int | None = None,
+    tokenizer_name: str = SEED_TOKENIZER,
+    export_dir: Path | None = None,
+    export_format: str = "arrow",
+) -> "Dataset":
+    """
+    Creates a seed dataset from a path
+    Args:
+        path (str):   Path to directory of qna.yaml and chunks
+        icls_per_chunk (int): Pair every chunk with only this many of the most similar seed examples, see add_icls()
+        tokenizer_name (str): Tokenizer the chunk token bounds are counted with, and the exported input_ids
+        export_dir (Path): Also write the dataset with the input_ids of every text column to shards in this
+                           directory, see export_seed_dataset()
+        export_format (str): "arrow" or "parquet" shards
+    Returns:
+        ds (Dataset): Transformers Dataset to be used to create a jsonl
+                      of seed data for the knowledge generation pipeline in
+                      SDG.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Export format must be one of {', '.join(EXPORT_FORMATS)}, got {export_format}")
+    if not chunks_path.is_dir():
+        raise ValueError(f"Path to chunks {chunks_path} must be a directory")
+    if not seed_examples_path.is_dir():
+        raise ValueError(f"Path to seed examples {seed_examples_path} must be a directory")
+
+    files = list(seed_examples_path.iterdir())
+    has_qna = any(f.name == 'qna.yaml' for f in files)
+    has_chunks_jsonl = chunks_exist(chunks_path / CHUNKS_JSONL)
+
+    if not has_qna:
+        raise ValueError(f"Seed examples dir {seed_examples_path} does not contain a qna.yaml")
+
+    if not has_chunks_jsonl:
+        raise ValueError(f"Chunks dir {chunks_path} does not contain a chunks.jsonl")
+
+    ds = create_dataset_from_dir(chunks_path, seed_examples_path, icls_per_chunk, tokenizer_name)
+
+    if export_dir is not None and ds is not None:
+        export_seed_dataset(ds, export_dir, tokenizer_name, export_format)
+
+    return ds
+
+@instrumented("read_chunks", count=lambda chunk_table: sum(len(table["chunks"]) for table in chunk_table.values()))
+def read_chunk_table(
+    chunks_path: Path, workers: int | None = None, tokenizer_name: str = SEED_TOKENIZER
+) -> Dict[str, Dict[str, list]]:
+    """
+    Returns the chunks in a chunks.jsonl grouped by the file they originate from, with their recorded token counts
+    Args:
+        path (Path): Path to directory of chunks in a file called chunks.jsonl.
+                     Only the columns read here are decoded from chunks.parquet when present
+        workers (int): Processes reading chunk shards in parallel. Defaults to one per shard, up to the CPU count
+        tokenizer_name (str): Only token counts recorded with this tokenizer are returned
+    Returns:
+        chunk_table (Dict[str, Dict[str, list]]): Dictionary with key of the original file name and a dictionary
+                                                  with the "chunks" and their "token_counts" as the value. A token
+                                                  count is None when it was not recorded with tokenizer_name
+    """
+    columns = read_chunk_columns(chunks_path / CHUNKS_JSONL, ["chunk", "file", "num_tokens", "tokenizer"], workers)
+    chunk_table = {}
+
+    for chunk, orig_filename, num_tokens, tokenizer in zip(
+        columns["chunk"], columns["file"], columns["num_tokens"], columns["tokenizer"]
+    ):
+        if orig_filename not in chunk_table:
+            chunk_table[orig_filename] = {"chunks": [], "token_counts": []}
+
+        chunk_table[orig_filename]["chunks"].append(chunk)
+        chunk_table[orig_filename]["token_counts"].append(num_tokens if tokenizer == tokenizer_name else None)
+
+    return chunk_table
+
+def read_chunks(chunks_path: Path, workers: int | None = None) -> Dict[str, List[str]]:
+    """
+    Returns a dictionary with all of the chunks in a chunks.jsonl
+    The chunks may originate from one or more different files
+    Args:
+        path (Path): Path to directory of chunks in a file called chunks.jsonl.
+                     Only the chunk and file columns are read from chunks.parquet when present
+        workers (int): Processes reading chunk shards in parallel. Defaults to one per shard, up to the CPU count
+    Returns:
+        chunks_dict (Dict[str,str]: Dictionary with key of the original file name
+                                    and a list of chunks as the value
+    """
+    return {filename: table["chunks"] for filename, table in read_chunk_table(chunks_path, workers).items()}
+
+def create_dataset_from_dir(
+    chunks_path: Path, seed_examples_path: Path, icls_per_chunk: int | None = None, tokenizer_name: str = SEED_TOKENIZER
+) -> "Dataset":
+    """
+    Process a directory with chunks and a qna.yaml return a dataset.
+    Args:
+        path (Path): Path to directory of chunks and qna.yaml.
+        icls_per_chunk (int): Pair every chunk with only this many of the most similar seed examples, see add_icls()
+        tokenizer_name (str): Tokenizer the chunk token bounds are counted with. Token counts recorded
+                              at chunk time with the same tokenizer are used instead of tokenizing again
+    Returns:
+        Dataset: Dataset object.
+    """
+
+    qna_yaml_path = seed_examples_path / "qna.yaml"
+
+    with open(qna_yaml_path, 'r') as f:
+      qna_yaml = yaml.safe_load(f)
+
+    # Check for required fields
+    if not all(key in qna_yaml for key in ['document_outline', 'domain', 'seed_examples']):
+        raise ValueError("qna.yaml file is missing document_outline, domain, or seed_examples fields")
+
+    from datasets import Dataset
+
+    chunk_table = read_chunk_table(chunks_path, tokenizer_name=tokenizer_name)
+
+    # every chunk is checked before any dataset is built, so an oversized chunk fails fast
+    token_counts = {}
+    stats = Counter()
+    for filename, table in chunk_table.items():
+      token_counts[filename] = count_tokens(table["chunks"], table["token_counts"], tokenizer_name, stats=stats)
+      check_token_counts(table["chunks"], token_counts[filename])
+
+    total = sum(stats.values())
+    if total:
+      logger.info(f"Token counts of {total} chunks: {stats['recorded']} recorded at chunk time, {stats['estimated']} estimated, "
+                  f"{stats['tokenized']} tokenized ({1 - stats['tokenized'] / total:.0%} of tokenizer calls avoided)")
+
+    datasets = []
+    for filename in chunk_table.keys():
+      chunks = chunk_table[filename]["chunks"]
+      chunk_ds = Dataset.from_dict(
+          {
+              "document": chunks,
+              "document_outline": [qna_yaml["document_outline"]]
+              * len(chunks),
+              "document_title": [filename] * len(chunks), # TODO: is this really a necessary field?
+              "domain": [qna_yaml["domain"]] * len(chunks),
+          }
+      )
+      chunk_ds_with_icls = add_icls(qna_yaml, chunk_ds, icls_per_chunk=icls_per_chunk,
+                                    token_counts=token_counts[filename], tokenizer_name=tokenizer_name)
+      datasets.append(chunk_ds_with_icls)
+
+    return safe_concatenate_datasets(datasets)
+
+def safe_concatenate_datasets(datasets: list["Dataset"]) -> "Dataset":
+    """
+    Concatenate datasets safely, ignoring any datasets that are None or empty.
+    Args:
+        datasets (list[Dataset]): List of Dataset objects to concatenate.
+    Returns:
+        Dataset: Dataset object with concatenated datasets.
+    """
+    from datasets import concatenate_datasets
+
+    filtered_datasets = [ds for ds in datasets if ds is not None and ds.num_rows > 0]
+
+    if not filtered_datasets:
+        return None
+
+    return concatenate_datasets(filtered_datasets)
+
+def get_token_count(text, tokenizer):
+    return len(tokenizer.tokenize(text))
+
+@lru_cache(maxsize=None)
+def load_tokenizer(tokenizer_name: str = SEED_TOKENIZER):
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(tokenizer_name)
+
+@lru_cache(maxsize=None)
+def token_count_estimator(tokenizer_name: str = SEED_TOKENIZER) -> TokenCountEstimator:
+    # one per tokenizer, calibrated further by every chunk counted in this process
+    return TokenCountEstimator()
+
+def count_tokens(
+    chunks: List[str],
+    token_counts: List[int | None] | None = None,
+    tokenizer_name: str = SEED_TOKENIZER,
+    thresholds: Tuple[int, ...] | None = (MIN_TOKEN_COUNT, MAX_TOKEN_COUNT),
+    stats: Counter | None = None,
+) -> List[int]:
+    """
+    Counts the tokens of every chunk as far as the thresholds need it. Chunks without a recorded count are
+    tokenized only when a TokenCountEstimator cannot place them between the thresholds
+    Args:
+        chunks (List[str]): Chunk texts
+        token_counts (List[int]): Token counts recorded with tokenizer_name at chunk time, None where missing
+        tokenizer_name (str): Tokenizer to count the remaining chunks with
+        thresholds (Tuple[int]): Token counts the results are compared with. None tokenizes every remaining chunk
+        stats (Counter): Incremented by the number of "recorded", "estimated" and "tokenized" counts
+    Returns:
+        token_counts (List[int]): Token count of every chunk. An estimated count is the middle of the range the
+                                  estimator is certain of, which compares with every threshold like the exact count
+    """
+    token_counts = list(token_counts) if token_counts is not None else [None] * len(chunks)
+    missing = [i for i, count in enumerate(token_counts) if count is None]
+    if stats is not None:
+        stats["recorded"] += len(chunks) - len(missing)
+    if not missing:
+        return token_counts
+
+    tokenizer = None
+    def tokenize(i: int) -> int:
+        nonlocal tokenizer
+        tokenizer = tokenizer or load_tokenizer(tokenizer_name)
+        if stats is not None:
+            stats["tokenized"] += 1
+        return get_token_count(chunks[i], tokenizer)
+
+    if thresholds is None:
+        for i in missing:
+            token_counts[i] = tokenize(i)
+        return token_counts
+
+    thresholds = tuple(sorted(thresholds))
+    estimator = token_count_estimator(tokenizer_name)
+    # recorded counts calibrate the estimator for free
+    for chunk, count in zip(chunks, token_counts):
+        if count is not None:
+            estimator.add(chunk, count)
+    if not estimator.calibrated:
+        # chunks spread over the document, so the calibration sees its tables and prose alike
+        needed = max(1, estimator.calibration_size - estimator.samples)
+        for i in missing[::max(1, len(missing) // needed)][:needed]:
+            token_counts[i] = tokenize(i)
+            estimator.add(chunks[i], token_counts[i])
+
+    for i in missing:
+        if token_counts[i] is not None:
+            continue
+        # a chunk above every threshold fails the seed dataset, so that is never decided on an estimate
+        if estimator.classify(chunks[i], thresholds) in (None, len(thresholds)):
+            token_counts[i] = tokenize(i)
+            estimator.add(chunks[i], token_counts[i])
+        else:
+            token_counts[i] = math.ceil(sum(estimator.bounds(chunks[i])) / 2)
+            if stats is not None:
+                stats["estimated"] += 1
+    return token_counts
+
+def truncate_chunk(chunk: str) -> str:
+    words = chunk.split()
+    if len(words) > 7:
+        return " ".join(words[:3]) + " ... " + " ".join(words[-3:])
+    return chunk
+
+def check_token_counts(chunks: List[str], token_counts: List[int], max_token_count: int = MAX_TOKEN_COUNT) -> None:
+    """
+    Raises a ValueError for the first chunk longer than max_token_count tokens
+    """
+    for chunk, count in zip(chunks, token_counts):
+        if count > max_token_count:
+            raise ValueError(f"Chunk \"{truncate_chunk(chunk)}\" exceeds token count of {max_token_count}")
+
+def _tfidf_vectors(texts: List[str]) -> List[Dict[str, float]]:
+    """
+    Returns L2-normalized TF-IDF vectors of the texts, with the document frequencies taken over all of them
+    """
+    term_counts = [Counter(re.findall(r"\w+", text.lower())) for text in texts]
+    document_frequency = Counter(term for counts in term_counts for term in counts)
+    # smoothed so terms that occur in every text still count a little
+    idf = {term: math.log((1 + len(texts)) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+    vectors = []
+    for counts in term_counts:
+        vector = {term: count * idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in vector.items()})
+    return vectors
+
+def nearest_seed_examples(chunks: List[str], seed_contexts: List[str], k: int) -> List[List[int]]:
+    """
+    Finds the seed examples whose context is most similar to each chunk, by cosine similarity of TF-IDF vectors
+    Args:
+        chunks (List[str]): Chunk texts
+        seed_contexts (List[str]): The context of every seed example
+        k (int): Number of seed examples per chunk
+    Returns:
+        nearest (List[List[int]]): For every chunk, the positions of its k nearest seed examples, most similar first
+    """
+    vectors = _tfidf_vectors(seed_contexts + chunks)
+    seed_vectors, chunk_vectors = vectors[:len(seed_contexts)], vectors[len(seed_contexts):]
+
+    nearest = []
+    for chunk_vector in chunk_vectors:
+        similarities = [
+            sum(weight * seed_vector.get(term, 0.0) for term, weight in chunk_vector.items())
+            for seed_vector in seed_vectors
+        ]
+        # ties keep the order of the seed examples in qna.yaml
+        nearest.append(sorted(range(len(seed_vectors)), key=lambda i: -similarities[i])[:k])
+    return nearest
+
+@instrumented("add_icls", count=lambda ds: ds.num_rows if ds is not None else 0)
+def add_icls(
+    qna_yaml: Dict[str, str],
+    chunked_document: "Dataset",
+    max_token_count: int = MAX_TOKEN_COUNT,
+    icls_per_chunk: int | None = None,
+    token_counts: List[int | None] | None = None,
+    tokenizer_name: str = SEED_TOKENIZER,
+) -> "Dataset":
+    """
+    Add the ICLS label to the dataset.
+    Args:
+        qna_yaml (Dict): object representing qna.yaml file.
+        dataset (Dataset): Dataset object.
+        icls_per_chunk (int): Pair every chunk with only this many of the seed examples most similar to it,
+                              instead of every seed example. The dataset shrinks by a factor of
+                              len(seed_examples) / icls_per_chunk
+        token_counts (List[int]): Token count of every document counted with tokenizer_name, e.g. recorded at
+                                  chunk time. Documents without one are tokenized
+        tokenizer_name (str): Tokenizer the token bounds are counted with
+    Returns:
+        Dataset: Dataset object with ICLS label.
+    """
+    from datasets import Dataset
+
+    icl = qna_yaml["seed_examples"]
+    documents = list(chunked_document["document"])
+
+    # the bounds are checked once per chunk rather than once per chunk and seed example
+    token_counts = count_tokens(documents, token_counts, tokenizer_name, (MIN_TOKEN_COUNT, max_token_count))
+    check_token_counts(documents, token_counts, max_token_count)
+
+    # rows of every chunk paired with each seed example
+    rows_per_icl = [list(range(chunked_document.num_rows)) for _ in icl]
+    if icls_per_chunk is not None and icls_per_chunk < len(icl):
+        nearest = nearest_seed_examples(documents, [icl_["context"] for icl_ in icl], icls_per_chunk)
+        rows_per_icl = [[row for row, seeds in enumerate(nearest) if i in seeds] for i in range(len(icl))]
+
+    # Only keep document greater than 100 tokens
+    rows_per_icl = [[row for row in rows if token_counts[row] > MIN_TOKEN_COUNT] for rows in rows_per_icl]
+
+    chunked_document_all_icl = []
+    for icl_, rows in zip(icl, rows_per_icl):
+        chunked_document_all_icl.append(
+            chunked_document.select(rows).map(
+                lambda x: {
+                    "icl_document": icl_["context"],
+                    "icl_query_1": icl_["questions_and_answers"][0]["question"],
+                    "icl_response_1": icl_["questions_and_answers"][0]["answer"],
+                    "icl_query_2": icl_["questions_and_answers"][1]["question"],
+                    "icl_response_2": icl_["questions_and_answers"][1]["answer"],
+                    "icl_query_3": icl_["questions_and_answers"][2]["question"],
+                    "icl_response_3": icl_["questions_and_answers"][2]["answer"],
+                }
+            )
+        )
+    chunked_document_all_icl = safe_concatenate_datasets(chunked_document_all_icl)
+    if chunked_document_all_icl is None:
+        return None
+
+    df = chunked_document_all_icl.to_pandas()
+    new_ds = Dataset.from_pandas(df)
+    return new_ds
+
+@instrumented("tokenize_seed_dataset", count=lambda ds: ds.num_rows)
+def tokenize_seed_dataset(seed_data: "Dataset", tokenizer_name: str = SEED_TOKENIZER) -> "Dataset":
+    """
+    Adds the token ids of every text column of a seed dataset
+    Args:
+        seed_data (Dataset): Seed dataset as returned by get_seed_dataset()
+        tokenizer_name (str): Hugging Face tokenizer to tokenize with. No special tokens are added
+    Returns:
+        Dataset: The seed dataset with a <column>_input_ids column of int32 token ids after every text column
+    """
+    from datasets import Sequence, Value
+
+    tokenizer = load_tokenizer(tokenizer_name)
+    columns = [column for column in TEXT_COLUMNS if column in seed_data.column_names]
+
+    # the seed example and outline columns repeat on every row, so each distinct text is tokenized once
+    token_ids = {}
+    for column in columns:
+        texts = list(dict.fromkeys(seed_data[column]))
+        token_ids[column] = dict(zip(texts, tokenizer(texts, add_special_tokens=False)["input_ids"]))
+
+    features = seed_data.features.copy()
+    for column in columns:
+        features[f"{column}_input_ids"] = Sequence(Value("int32"))
+
+    tokenized = seed_data.map(
+        lambda batch: {f"{column}_input_ids": [token_ids[column][text] for text in batch[column]] for column in columns},
+        batched=True,
+        features=features,
+    )
+    order = []
+    for column in seed_data.column_names:
+        order.append(column)
+        if column in columns:
+            order.append(f"{column}_input_ids")
+    return tokenized.select_columns(order)
+
+def export_seed_dataset(
+    seed_data: "Dataset",
+    output_dir: Path,
+    tokenizer_name: str = SEED_TOKENIZER,
+    export_format: str = "arrow",
+    max_shard_bytes: int = EXPORT_SHARD_BYTES,
+) -> Path:
+    """
+    Writes a seed dataset with the input_ids of its text columns to shards trainers can read without tokenizing
+    Args:
+        seed_data (Dataset): Seed dataset as returned by get_seed_dataset()
+        output_dir (Path): Directory to write the shards and export.json to. An earlier export there is replaced
+        tokenizer_name (str): Hugging Face tokenizer to tokenize with, recorded in export.json
+        export_format (str): "arrow" writes Dataset.save_to_disk() shards that datasets.load_from_disk() memory-maps,
+                             "parquet" writes seed_data-00000.parquet, ... for datasets.load_dataset("parquet", ...)
+        max_shard_bytes (int): Maximum size of a shard
+    Returns:
+        output_dir (pathlib.Path): The output directory
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Export format must be one of {', '.join(EXPORT_FORMATS)}, got {export_format}")
+
+    tokenized = tokenize_seed_dataset(seed_data, tokenizer_name)
+    # the export is written next to output_dir and moved into place, so nothing of an earlier export, such as the
+    # state.json load_from_disk() reads after a switch to parquet, is left behind
+    staging_dir = output_dir.with_name(f".{output_dir.name}.tmp")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir(parents=True)
+
+    if export_format == "arrow":
+        tokenized.save_to_disk(str(staging_dir), max_shard_size=max_shard_bytes)
+        files = sorted(path.name for path in staging_dir.glob("data-*.arrow"))
+    else:
+        num_shards = max(1, math.ceil(tokenized.data.nbytes / max_shard_bytes))
+        files = []
+        for index in range(num_shards):
+            files.append(f"seed_data-{index:05d}.parquet")
+            tokenized.shard(num_shards, index, contiguous=True).to_parquet(str(staging_dir / files[-1]))
+
+    with open(staging_dir / EXPORT_MANIFEST, "w") as f:
+        json.dump({
+            "format": export_format,
+            "tokenizer": tokenizer_name,
+            "rows": tokenized.num_rows,
+            "input_ids": {column: f"{column}_input_ids" for column in TEXT_COLUMNS if column in seed_data.column_names},
+            "files": files,
+        }, f, indent=2)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    staging_dir.rename(output_dir)
+
+    logger.info(f"Exported {tokenized.num_rows} rows tokenized with {tokenizer_name} to {len(files)} {export_format} shards "
+                f"in {output_dir}")
+    return output_dir
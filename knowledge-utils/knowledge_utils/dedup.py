@@ -0,0 +1,166 @@
+"""
+Exact and near-duplicate removal of chunks.
+
+Every chunk is looked up in two indexes before it is kept:
+
+    exact   a hash of the chunk text with case and whitespace normalized
+    near    MinHash signatures of word shingles, banded for locality-sensitive hashing
+
+A chunk whose signature shares a band with a kept chunk, and whose estimated Jaccard
+similarity to it reaches the threshold, is a near duplicate. Each lookup costs a fixed
+number of hash operations, so deduplication runs in linear time in the number of chunks.
+"""
+import hashlib
+import json
+import logging
+import re
+import zlib
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Tuple
+
+from .chunk_store import CHUNKS_JSONL, iter_chunk_records, write_chunks
+from .instrumentation import instrumented
+
+logger = logging.getLogger(__name__)
+
+# numpy is imported inside DuplicateIndex
+if TYPE_CHECKING:
+    import numpy as np
+
+DEDUP_REPORT = "dedup-report.json"
+THRESHOLD = 0.8
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+# 8 bands of 8 rows make pairs above a similarity of about 0.77 likely to share a band
+BANDS = 8
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD = re.compile(r"\w+")
+
+
+class DuplicateIndex:
+    """
+    Index of exact and near-duplicate texts.
+
+    Texts are added in order and each one is compared with the texts kept before it.
+    Every LSH bucket keeps the first text that landed in it, so memory grows with the
+    number of kept texts only.
+    """
+    def __init__(
+        self,
+        threshold: float = THRESHOLD,
+        num_perm: int = NUM_PERM,
+        bands: int = BANDS,
+        shingle_size: int = SHINGLE_SIZE,
+        seed: int = 1,
+    ):
+        import numpy as np
+
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._exact: Dict[bytes, int] = {}
+        self._buckets: Dict[int, int] = {}
+        self._signatures: Dict[int, "np.ndarray"] = {}
+        self.count = 0
+
+    def signature(self, words: list) -> "np.ndarray":
+        """
+        Returns the MinHash signature of the word shingles of a text
+        """
+        import numpy as np
+
+        size = self.shingle_size
+        shingles = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+        hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+        # one universal hash per permutation, applied to every shingle at once
+        return ((np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME).min(axis=0).astype(np.uint32)
+
+    def add(self, text: str) -> Tuple[str, int] | None:
+        """
+        Looks up a text and indexes it when it is not a duplicate
+        Args:
+            text (str): Text to look up
+        Returns:
+            duplicate (Tuple[str, int]): ("exact" or "near", position of the earlier text) for a duplicate,
+                None when the text was kept
+        """
+        position = self.count
+        self.count += 1
+
+        words = _WORD.findall(text.casefold())
+        digest = hashlib.blake2b(" ".join(words).encode("utf-8"), digest_size=16).digest()
+        if digest in self._exact:
+            return "exact", self._exact[digest]
+
+        signature = self.signature(words)
+        keys = [hash((band, signature[band * self.rows:(band + 1) * self.rows].tobytes())) for band in range(self.bands)]
+        for key in keys:
+            candidate = self._buckets.get(key)
+            if candidate is not None and (signature == self._signatures[candidate]).mean() >= self.threshold:
+                return "near", candidate
+
+        self._exact[digest] = position
+        self._signatures[position] = signature
+        for key in keys:
+            self._buckets.setdefault(key, position)
+        return None
+
+
+@instrumented("dedupe_chunks", count=lambda report: report["chunks"])
+def dedupe_chunks(
+    chunks_jsonl_path: Path,
+    output_dir: Path,
+    threshold: float = THRESHOLD,
+    parquet: bool = False,
+    max_shard_bytes: int | None = None,
+) -> dict:
+    """
+    Writes the chunks of a chunks.jsonl without exact and near duplicates, keeping the first occurrence
+    Args:
+        chunks_jsonl_path (Path):   Path to chunks.jsonl. Shards or chunks.parquet next to it are used when present
+        output_dir (Path):          Directory the deduplicated chunks.jsonl and dedup-report.json are written to
+        threshold (float):          Estimated Jaccard similarity of word shingles from which chunks are near duplicates
+        parquet (bool):             Also write chunks.parquet
+        max_shard_bytes (int):      Write shards of at most this size and a manifest instead of chunks.jsonl
+    Returns:
+        report (dict): Number of chunks read, kept and removed, and the removed duplicates with the chunk they duplicate
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index = DuplicateIndex(threshold)
+    duplicates = []
+
+    def unique_chunks():
+        for position, chunk in enumerate(iter_chunk_records(chunks_jsonl_path)):
+            duplicate = index.add(chunk["chunk"])
+            if duplicate is None:
+                yield chunk
+            else:
+                kind, original = duplicate
+                duplicates.append({"position": position, "duplicate_of": original, "kind": kind, "file": chunk.get("file")})
+
+    kept = write_chunks(unique_chunks(), output_dir / CHUNKS_JSONL, parquet, max_shard_bytes)
+
+    exact = sum(duplicate["kind"] == "exact" for duplicate in duplicates)
+    report = {
+        "chunks": index.count,
+        "kept": kept,
+        "removed": len(duplicates),
+        "exact_duplicates": exact,
+        "near_duplicates": len(duplicates) - exact,
+        "threshold": threshold,
+        "duplicates": duplicates,
+    }
+    with open(output_dir / DEDUP_REPORT, "w") as f:
+        json.dump(report, f, indent=2)
+
+    logger.info(f"Removed {report['removed']} of {report['chunks']} chunks "
+                f"({report['exact_duplicates']} exact, {report['near_duplicates']} near duplicates)")
+    return report
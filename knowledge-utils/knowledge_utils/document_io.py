@@ -0,0 +1,170 @@
+import io
+import json
+import mmap
+import os
+import tempfile
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, List
+
+# type hints only, see load_docling_document()
+if TYPE_CHECKING:
+    from docling_core.types.doc import DoclingDocument
+
+COMPACT_SUFFIX = ".json.zst"
+# about 8x smaller than plain JSON on the sample conversions, decompression speed does not depend on the level
+ZSTD_LEVEL = 10
+
+HEADER_PARTS = ("schema_name", "version", "name", "origin")
+# what analyze_docling_tables() reads
+TABLE_PARTS = ("tables",)
+# everything the HybridChunker serializes; only the page sizes and images are left out
+CHUNKING_PARTS = ("furniture", "body", "groups", "texts", "pictures", "tables", "key_value_items", "form_items")
+
+# fields of a node that hold references to other items
+_REFERENCE_LISTS = ("children", "captions", "references", "footnotes")
+
+
+def is_compact(path: Path) -> bool:
+    return str(path).endswith(COMPACT_SUFFIX)
+
+
+def find_docling_documents(directory: Path) -> List[Path]:
+    """
+    Lists the Docling JSON files in a directory, plain or compact
+    Args:
+        directory (Path): Directory to search
+    Returns:
+        json_files (List[pathlib.Path]): Sorted paths of *.json and *.json.zst files
+    """
+    return sorted(path for path in directory.iterdir() if path.name.endswith((".json", COMPACT_SUFFIX)))
+
+
+def save_docling_document(doc: "DoclingDocument", path: Path) -> Path:
+    """
+    Writes a Docling document as JSON, zstd-compressed when the path ends in .json.zst
+    Args:
+        doc (DoclingDocument):  Document to write
+        path (Path):            Output path
+    Returns:
+        path (pathlib.Path): The output path
+    """
+    doc_dict = doc.export_to_dict()
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if is_compact(path):
+                import zstandard
+
+                with zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(f, closefd=False) as writer:
+                    with io.TextIOWrapper(writer, encoding="utf-8") as text:
+                        json.dump(doc_dict, text)
+            else:
+                with io.TextIOWrapper(f, encoding="utf-8") as text:
+                    json.dump(doc_dict, text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return path
+
+
+@contextmanager
+def _open_buffer(json_file: Path) -> Iterator[bytes | mmap.mmap]:
+    # plain files are memory-mapped, compact ones have to be decompressed in full
+    if is_compact(json_file):
+        import zstandard
+
+        with open(json_file, "rb") as f:
+            yield zstandard.ZstdDecompressor().decompressobj().decompress(f.read())
+    else:
+        with open(json_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _locate_parts(mm: bytes | mmap.mmap, keys: list) -> dict:
+    """
+    Finds the byte span of every top-level value in a Docling JSON document.
+
+    Docling writes the document fields in schema order and none of the
+    top-level field names is used as a key further down the tree, so the
+    first `"<key>":` after the previous field is the top-level one. Each span
+    runs up to the next field, and the caller checks it by decoding it.
+    """
+    positions = {}
+    offset = 0
+    for key in keys:
+        pattern = b'"%s":' % key.encode()
+        index = mm.find(pattern, offset)
+        if index >= 0:
+            positions[key] = index
+            offset = index
+        elif mm.find(pattern, 0, offset) >= 0:
+            raise ValueError(f"Field {key} is out of schema order")
+
+    spans = {}
+    ordered = sorted(positions, key=positions.get)
+    for i, key in enumerate(ordered):
+        start = positions[key] + len(key) + 3
+        end = positions[ordered[i + 1]] if i + 1 < len(ordered) else len(mm)
+        spans[key] = (start, end)
+    return spans
+
+
+def _decode_span(mm: bytes | mmap.mmap, start: int, end: int):
+    # the span ends with the separator before the next field, or the closing brace of the document
+    value = mm[start:end].rstrip()
+    return json.loads(value[:-1])
+
+
+def _drop_missing_refs(data: dict) -> None:
+    """
+    Removes references to items whose part was not loaded, so the partial
+    document passes DoclingDocument's tree validation.
+    """
+    def is_loaded(ref: dict) -> bool:
+        _, part, *index = ref["$ref"].split("/")
+        return part == "body" or (part in data and (not index or int(index[0]) < len(data[part])))
+
+    nodes = [data[part] for part in ("body", "furniture") if part in data]
+    for part in ("groups", "texts", "pictures", "tables", "key_value_items", "form_items"):
+        nodes.extend(data.get(part, []))
+    for node in nodes:
+        for field in _REFERENCE_LISTS:
+            if node.get(field):
+                node[field] = [ref for ref in node[field] if is_loaded(ref)]
+
+
+def load_docling_document(json_file: Path, parts: Iterable[str] | None = None) -> "DoclingDocument":
+    """
+    Loads a Docling JSON document, optionally building only some of its parts
+    Args:
+        json_file (Path): Docling JSON file written by conversion, plain or compact (.json.zst)
+        parts (Iterable[str]): Top-level fields to load, e.g. TABLE_PARTS or CHUNKING_PARTS. All when omitted
+    Returns:
+        document (DoclingDocument): Document with the requested parts; other parts are left empty and
+            references to their items are dropped
+    """
+    from docling_core.types.doc import DoclingDocument
+
+    if parts is None:
+        if is_compact(json_file):
+            with _open_buffer(json_file) as buffer:
+                return DoclingDocument.model_validate_json(buffer)
+        return DoclingDocument.load_from_json(json_file)
+
+    keys = [field.alias or name for name, field in DoclingDocument.model_fields.items()]
+    wanted = set(HEADER_PARTS) | set(parts)
+
+    # only the spans of the requested parts are copied and parsed
+    with _open_buffer(json_file) as mm:
+        try:
+            spans = _locate_parts(mm, keys)
+            data = {key: _decode_span(mm, *span) for key, span in spans.items() if key in wanted}
+        except ValueError:
+            # not laid out the way Docling writes it, parse the whole file instead
+            data = {key: value for key, value in json.loads(mm[:]).items() if key in wanted}
+
+    _drop_missing_refs(data)
+    return DoclingDocument.model_validate(data)
@@ -0,0 +1,3 @@
+"""
+Illuminator: post-conversion checks for merged table cells in Docling documents.
+"""
@@ -0,0 +1,3 @@
+from .illuminator import main
+
+main()
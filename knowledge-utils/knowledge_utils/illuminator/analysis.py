@@ -0,0 +1,261 @@
+from typing import TYPE_CHECKING, List, Tuple, Dict, Any, Union
+from .log_utils import logger
+from .utils import save_markdown
+from ..conversion import PAGES_PER_JOB, convert_pdf_pages, count_pdf_pages
+from ..document_io import COMPACT_SUFFIX, TABLE_PARTS, load_docling_document
+from ..instrumentation import instrumented
+from functools import partial
+import os
+import time
+
+# loading docling is most of illuminator's startup time, so it is imported where a PDF is converted
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    from docling.datamodel.document import DoclingDocument
+    from docling.document_converter import DocumentConverter
+
+def cell_is_merged(cell) -> bool:
+    """
+    Determines whether a table cell is merged based on its row or column span.
+
+    Args:
+        cell: A table cell object from the Docling document.
+
+    Returns:
+        True if the cell spans multiple rows or columns; False otherwise.
+    """
+    return (
+        cell.col_span > 1 or
+        cell.row_span > 1
+    )
+
+def summarize_tables(doc) -> Tuple[int, List[int]]:
+    """
+    Summarizes tables and extracts the page numbers they appear on.
+
+    Args:
+        doc: A DoclingDocument object.
+
+    Returns:
+        A tuple containing:
+            - The number of tables found.
+            - A list of page numbers on which the tables are located.
+    """
+    tables = doc.tables
+    num_tables = len(tables)
+    pages = []
+
+    for table in tables:
+        for prov in table.prov:
+            pages.append(prov.page_no)
+
+    return num_tables, pages
+
+_converters: Dict[bool, "DocumentConverter"] = {}
+
+def get_document_converter(tables_only: bool = False) -> "DocumentConverter":
+    """
+    Returns the process-wide Docling converter, creating it on first use.
+
+    Docling loads its layout and table models when the converter first sees a
+    PDF, so reusing one converter only pays that cost once per process.
+
+    Args:
+        tables_only: Return the table-focused converter, which skips OCR, enrichment
+                     and page image generation. Table structure recognition is kept.
+
+    Returns:
+        The shared DocumentConverter for the requested mode.
+    """
+    if tables_only not in _converters:
+        from docling.document_converter import DocumentConverter
+
+        if tables_only:
+            from docling.datamodel.base_models import InputFormat
+            from docling.datamodel.pipeline_options import PdfPipelineOptions
+            from docling.document_converter import PdfFormatOption
+
+            pipeline_options = PdfPipelineOptions(
+                do_ocr=False,
+                do_table_structure=True,
+                do_code_enrichment=False,
+                do_formula_enrichment=False,
+                do_picture_classification=False,
+                do_picture_description=False,
+                generate_page_images=False,
+                generate_picture_images=False,
+            )
+            _converters[tables_only] = DocumentConverter(
+                format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
+            )
+        else:
+            _converters[tables_only] = DocumentConverter()
+    return _converters[tables_only]
+
+def _num_pages(file_path: str, page_range: Tuple[int, int] | None) -> int:
+    num_pages = count_pdf_pages(file_path)
+    if page_range is None:
+        return num_pages
+    return min(page_range[1], num_pages) - page_range[0] + 1
+
+def is_docling_json(file_path: str) -> bool:
+    """
+    Returns whether a file is an already converted Docling JSON file, plain or compact.
+    """
+    return file_path.endswith((".json", COMPACT_SUFFIX))
+
+@instrumented("convert_to_docling_document", count=lambda doc: len(doc.pages))
+def convert_to_docling_document(
+    file_path: str,
+    markdown_dir: str | None = None,
+    tables_only: bool = False,
+    page_range: Tuple[int, int] | None = None,
+    page_workers: int = 1,
+    page_pool: "ProcessPoolExecutor | None" = None,
+) -> "DoclingDocument":
+    """
+    Converts a PDF using Docling and optionally saves a Markdown version of the document.
+    Docling JSON files, plain or compact, are loaded instead of converted.
+
+    Args:
+        file_path: Path to the input PDF or Docling JSON file.
+        markdown_dir: Directory to save <name>.md in. No Markdown is exported when omitted.
+        tables_only: Use the table-focused pipeline from get_document_converter().
+        page_range: Optional (first, last) page numbers to convert, 1-based and inclusive.
+        page_workers: Split a PDF of more than PAGES_PER_JOB pages into page range jobs converted
+                      in this many processes. The merged document keeps the page numbers of the PDF.
+        page_pool: Convert the page ranges in this page_worker_pool() of converters of the same mode
+                   instead of starting page_workers processes.
+
+    Returns:
+        The converted Docling Document object.
+    """
+    if is_docling_json(file_path):
+        # already converted, only build the tables unless the Markdown needs the whole document
+        doc = load_docling_document(file_path, None if markdown_dir else TABLE_PARTS)
+    elif page_workers > 1 and _num_pages(file_path, page_range) > PAGES_PER_JOB:
+        # every worker process creates its own converter of the same mode
+        doc = convert_pdf_pages(file_path, partial(get_document_converter, tables_only), page_workers,
+                                page_range=page_range, executor=page_pool)
+    else:
+        converter = get_document_converter(tables_only)
+        if page_range:
+            result = converter.convert(file_path, page_range=page_range)
+        else:
+            result = converter.convert(file_path)
+        doc = result.document
+
+    if markdown_dir is None:
+        return doc
+
+    # Save Markdown output
+    os.makedirs(markdown_dir, exist_ok=True)
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    md_output_path = os.path.join(markdown_dir, f"{base_name}.md")
+    save_markdown(doc, md_output_path)
+
+    logger.info(f"📝 Markdown saved to {md_output_path}")
+    return doc
+
+def time_full_conversion(file_path: str) -> float:
+    """
+    Times the default conversion path for a file without writing anything:
+    the full pipeline over all pages followed by the Markdown export.
+
+    Args:
+        file_path: Path to the input PDF file.
+
+    Returns:
+        Wall time in seconds.
+    """
+    start = time.perf_counter()
+    doc = get_document_converter().convert(file_path).document
+    doc.export_to_markdown()
+    return time.perf_counter() - start
+
+def analyze_file(
+    file_path: str,
+    markdown_dir: str | None = None,
+    tables_only: bool = False,
+    page_range: Tuple[int, int] | None = None,
+    compare: bool = False,
+    page_workers: int = 1,
+    page_pool: "ProcessPoolExecutor | None" = None,
+) -> Dict[str, Any]:
+    """
+    Converts a file and analyzes its tables.
+
+    Args:
+        file_path: Path to the input PDF or Docling JSON file.
+        markdown_dir: Optional directory to save the Markdown version in.
+        tables_only: Use the table-focused pipeline.
+        page_range: Optional (first, last) page numbers to convert.
+        compare: Also time the default path and add a "timing" entry with the time saved.
+                 Only PDFs can be compared, a Docling JSON file has no conversion to time.
+        page_workers: Processes converting the page ranges of a long PDF.
+        page_pool: Pool of page_workers processes to convert the page ranges in, as in convert_to_docling_document().
+
+    Returns:
+        The result of analyze_docling_tables(), plus "timing" when `compare` is set.
+
+    Raises:
+        ValueError: If `compare` is set for a Docling JSON file.
+    """
+    if compare and is_docling_json(file_path):
+        raise ValueError(f"--compare needs a PDF, {file_path} is already converted")
+    start = time.perf_counter()
+    doc = convert_to_docling_document(file_path, markdown_dir, tables_only, page_range, page_workers, page_pool)
+    elapsed = time.perf_counter() - start
+    result = analyze_docling_tables(doc)
+
+    if compare:
+        full = time_full_conversion(file_path)
+        result["timing"] = {
+            "conversion_s": round(elapsed, 3),
+            "full_conversion_s": round(full, 3),
+            "saved_s": round(full - elapsed, 3),
+        }
+        logger.info(f"⏱️  Conversion took {elapsed:.1f}s vs {full:.1f}s on the default path, saving {full - elapsed:.1f}s")
+    return result
+
+@instrumented("analyze_docling_tables", count=lambda issues: issues["table_count"])
+def analyze_docling_tables(doc_input: "DoclingDocument") -> Dict[str, Union[int, List[dict], List[int], str]]:
+    """
+    Analyzes a Docling document (object or path to PDF/JSON file) for merged table cells.
+    """
+
+    table_count, table_pages_list = summarize_tables(doc_input)
+    total_pages = len(set(table_pages_list)) or "Unknown"
+
+    issues = {
+        "merged_table_cells": [],
+        "table_count": table_count,
+        "merged_cell_pages": set(),
+        "page_count": total_pages
+    }
+
+    for i, table_item in enumerate(doc_input.tables):
+        try:
+            page_number = table_pages_list[i]
+        except IndexError:
+            page_number = "Unknown page"
+        table_data = table_item.data
+
+        for row_idx, row in enumerate(table_data.grid):
+            for col_idx, cell in enumerate(row):
+                if cell_is_merged(cell):
+                    issues["merged_table_cells"].append({
+                        "page": page_number,
+                        "row": row_idx,
+                        "column": col_idx,
+                        "colspan": cell.col_span,
+                        "rowspan": cell.row_span,
+                        "text": cell.text or "[empty]"
+                    })
+
+                    if isinstance(page_number, int):
+                        issues["merged_cell_pages"].add(page_number)
+
+    issues["merged_cell_pages"] = sorted(issues["merged_cell_pages"])
+    return issues
\ No newline at end of file
@@ -0,0 +1,206 @@
+import json
+import os
+import socket
+import socketserver
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Dict
+
+from .analysis import get_document_converter, analyze_file
+from .log_utils import logger
+from ..conversion import page_worker_pool
+
+SOCKET_ENV = "ILLUMINATOR_SOCKET"
+CONNECT_TIMEOUT = 0.5  # Seconds to wait for a running daemon before falling back to in-process analysis
+
+def default_socket_path() -> str:
+    """
+    Returns the Unix socket path the daemon listens on.
+
+    Uses $ILLUMINATOR_SOCKET when set, otherwise a per-user socket in
+    $XDG_RUNTIME_DIR or the system temp directory.
+    """
+    if os.getenv(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"illuminator-{os.getuid()}.sock")
+
+def send_request(request: Dict[str, Any], socket_path: str | None = None) -> Dict[str, Any]:
+    """
+    Sends one request to the daemon and waits for its response.
+
+    Requests and responses are single JSON documents terminated by a newline.
+
+    Args:
+        request: Request with an "action" of "ping", "analyze" or "shutdown".
+        socket_path: Socket of the daemon. Defaults to default_socket_path().
+
+    Returns:
+        The decoded response.
+
+    Raises:
+        OSError: If no daemon is listening on the socket.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(socket_path or default_socket_path())
+        # conversions take as long as they take once the daemon has the job
+        sock.settimeout(None)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as response:
+            line = response.readline()
+    if not line:
+        raise ConnectionError("Illuminator daemon closed the connection without a response")
+    return json.loads(line)
+
+def daemon_is_running(socket_path: str | None = None) -> bool:
+    """
+    Returns True if a daemon answers on the socket.
+    """
+    try:
+        return send_request({"action": "ping"}, socket_path).get("status") == "ok"
+    except (OSError, ValueError):
+        return False
+
+def analyze_with_daemon(path: str, socket_path: str | None = None, options: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """
+    Converts and analyzes one file in the running daemon.
+
+    Args:
+        path: Path to a PDF or Docling JSON file, resolved against the caller's working directory.
+        socket_path: Socket of the daemon. Defaults to default_socket_path().
+        options: Keyword arguments for analyze_file(), such as tables_only or page_range.
+
+    Returns:
+        The analysis result, as returned by analyze_file().
+
+    Raises:
+        OSError: If no daemon is listening on the socket.
+        RuntimeError: If the daemon failed to process the file.
+    """
+    options = dict(options or {})
+    if options.get("markdown_dir"):
+        # the daemon runs in its own working directory
+        options["markdown_dir"] = os.path.abspath(options["markdown_dir"])
+    response = send_request({"action": "analyze", "file": os.path.abspath(path), "options": options}, socket_path)
+    if response.get("status") != "ok":
+        raise RuntimeError(response.get("error", "unknown daemon error"))
+    return response["result"]
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            action = request.get("action")
+            if action == "ping":
+                response = {"status": "ok", "pid": os.getpid()}
+            elif action == "analyze":
+                logger.info(f"\n🔍 Converting and analyzing: {request['file']}\n")
+                options = request.get("options", {})
+                if options.get("page_range"):
+                    options["page_range"] = tuple(options["page_range"])
+                result = analyze_file(request["file"], **options, **self.server.page_options(options))
+                response = {"status": "ok", "result": result}
+            elif action == "shutdown":
+                response = {"status": "ok"}
+                self.server.shutdown_requested = True
+            else:
+                response = {"status": "error", "error": f"Unknown action: {action}"}
+        except BrokenProcessPool as e:
+            logger.error(f"❌ Failed to handle request, restarting the page workers: {e}")
+            self.server.restart_page_pool()
+            response = {"status": "error", "error": str(e)}
+        except Exception as e:
+            logger.error(f"❌ Failed to handle request: {e}")
+            response = {"status": "error", "error": str(e)}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+class _Server(socketserver.UnixStreamServer):
+    # requests are handled one at a time, which also keeps the shared converter single-threaded
+    shutdown_requested = False
+
+    def __init__(self, socket_path: str, tables_only: bool, page_workers: int) -> None:
+        super().__init__(socket_path, _RequestHandler)
+        self.tables_only = tables_only
+        self.page_workers = page_workers
+        self.page_pool = None
+
+    def restart_page_pool(self) -> None:
+        """
+        Starts the page workers of the daemon's pipeline, replacing any previous ones.
+        """
+        if self.page_pool is not None:
+            self.page_pool.shutdown(cancel_futures=True)
+            self.page_pool = None
+        if self.page_workers > 1:
+            self.page_pool = page_worker_pool(partial(get_document_converter, self.tables_only), self.page_workers)
+
+    def page_options(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns the page_workers and page_pool a request is converted with.
+
+        The page workers are set when the daemon starts, so a client cannot start
+        processes in it. The page_workers a client sends are ignored, and documents
+        of the other pipeline are converted in the daemon process.
+        """
+        page_workers = options.pop("page_workers", None)
+        if page_workers not in (None, 1, self.page_workers):
+            logger.info(f"ℹ️  Ignoring page_workers={page_workers}, the daemon converts with {self.page_workers}")
+        if self.page_pool is None or bool(options.get("tables_only")) != self.tables_only:
+            return {"page_workers": 1}
+        return {"page_workers": self.page_workers, "page_pool": self.page_pool}
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.page_pool is not None:
+            self.page_pool.shutdown(cancel_futures=True)
+
+def serve(socket_path: str | None = None, tables_only: bool = False, page_workers: int = 1) -> None:
+    """
+    Runs the Illuminator daemon in the foreground until it receives a shutdown request.
+
+    The Docling models are loaded once at startup, so every request only pays
+    for the conversion itself.
+
+    Args:
+        socket_path: Unix socket to listen on. Defaults to default_socket_path().
+        tables_only: Load the table-focused pipeline at startup instead of the default one.
+                     The other pipeline is still loaded on first use.
+        page_workers: Start this many processes converting the page ranges of PDFs of more than
+                      50 pages with the startup pipeline. The page workers of clients are ignored.
+    """
+    socket_path = socket_path or default_socket_path()
+    if os.path.exists(socket_path):
+        if daemon_is_running(socket_path):
+            logger.error(f"❌ An Illuminator daemon is already listening on {socket_path}")
+            return
+        # left behind by a daemon that did not shut down cleanly
+        os.unlink(socket_path)
+
+    logger.info("⏳ Loading Docling models...")
+    from docling.datamodel.base_models import InputFormat
+
+    get_document_converter(tables_only).initialize_pipeline(InputFormat.PDF)
+
+    old_umask = os.umask(0o177)  # the socket is only usable by the current user
+    try:
+        server = _Server(socket_path, tables_only, page_workers)
+    finally:
+        os.umask(old_umask)
+
+    logger.info(f"🚀 Illuminator daemon listening on {socket_path}")
+    try:
+        with server:
+            # started after the umask is restored, which the worker processes inherit
+            server.restart_page_pool()
+            while not server.shutdown_requested:
+                server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.unlink(socket_path)
+        logger.info("👋 Illuminator daemon stopped")
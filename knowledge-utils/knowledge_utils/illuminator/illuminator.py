@@ -0,0 +1,150 @@
+import argparse
+from .utils import get_supported_files, save_results, generate_summary, parse_page_range
+from .analysis import analyze_file, is_docling_json
+from .daemon import serve, send_request, daemon_is_running, analyze_with_daemon
+from .log_utils import logger
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses command-line arguments for the Illuminator tool.
+
+    Returns:
+        argparse.Namespace containing:
+            - file: Optional path to a single PDF.
+            - dir: Optional path to a directory of PDFs.
+            - output: Path to save results JSON file.
+            - tables_only: Use the table-focused pipeline.
+            - pages: Optional page range to convert.
+            - page_workers: Processes converting the page ranges of a long PDF.
+            - markdown_dir: Optional directory to save Markdown versions in.
+            - compare: Report the time saved against the default path.
+            - serve: Run as a daemon that keeps the Docling models loaded.
+            - stop: Stop a running daemon.
+            - no_daemon: Analyze in this process even if a daemon is running.
+            - socket: Unix socket of the daemon.
+    """
+    parser = argparse.ArgumentParser(description="Docling PDF Checker")
+    parser.add_argument(
+        "-f", "--file",
+        help="Path to a PDF file or directory of PDFs"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="Optional path to save JSON results",
+        default="results.json"
+    )
+    parser.add_argument(
+        "--tables-only",
+        action="store_true",
+        help="Only run the pipeline stages needed for table analysis: no OCR, enrichment or page images"
+    )
+    parser.add_argument(
+        "--pages",
+        type=parse_page_range,
+        help="Only convert this page range, e.g. 5-12"
+    )
+    parser.add_argument(
+        "--page-workers",
+        type=int,
+        default=1,
+        help="Convert PDFs of more than 50 pages as page ranges in this many processes. "
+             "With --serve, the daemon starts them once and ignores the page workers of its clients"
+    )
+    parser.add_argument(
+        "--markdown-dir",
+        help="Save a Markdown version of every converted document in this directory"
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Also time the default conversion path and report the time saved per document"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run a daemon that keeps the Docling models loaded and analyzes files sent by other illuminator runs"
+    )
+    parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="Stop the running daemon"
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Analyze in this process even if a daemon is running"
+    )
+    parser.add_argument(
+        "--socket",
+        help="Unix socket of the daemon. Defaults to $ILLUMINATOR_SOCKET or a per-user socket in the runtime directory"
+    )
+    args = parser.parse_args()
+    if not (args.file or args.serve or args.stop):
+        parser.error("one of the arguments -f/--file, --serve or --stop is required")
+    return args
+
+def main() -> None:
+    """
+    Main execution flow:
+    - Parses arguments
+    - Starts or stops the daemon when asked to
+    - Loads and analyzes PDFs or JSON files, in the daemon when one is running
+    - Generates and saves results
+    """
+    args = parse_args()
+    if args.serve:
+        serve(args.socket, args.tables_only, args.page_workers)
+        return
+    if args.stop:
+        try:
+            send_request({"action": "shutdown"}, args.socket)
+            logger.info("🛑 Illuminator daemon stopped.")
+        except OSError:
+            logger.error("❌ No Illuminator daemon is running.")
+        return
+
+    files = get_supported_files(args.file)
+    if not files:
+        logger.error("❌ No supported input files found to process.")
+        return
+    if args.compare:
+        # the default path of a Docling JSON file is loading it again, there is no conversion to compare against
+        converted = [path for path in files if is_docling_json(path)]
+        if converted:
+            logger.error(f"❌ --compare only times PDFs, these files are already converted: {', '.join(converted)}")
+            return
+
+    use_daemon = not args.no_daemon and daemon_is_running(args.socket)
+    if use_daemon:
+        logger.info("⚡ Sending files to the running Illuminator daemon.")
+
+    options = {
+        "tables_only": args.tables_only,
+        "page_range": args.pages,
+        "page_workers": args.page_workers,
+        "markdown_dir": args.markdown_dir,
+        "compare": args.compare,
+    }
+
+    all_results = {}
+    for path in files:
+        logger.info(f"\n🔍 Converting and analyzing: {path}\n")
+        try:
+            if use_daemon:
+                result = analyze_with_daemon(path, args.socket, options)
+            else:
+                # Use Docling to convert (PDF path)
+                result = analyze_file(path, **options)
+            all_results[path] = result
+        except Exception as e:
+            logger.error(f"❌ Failed to process {path}: {e}")
+
+    if args.compare and all_results:
+        saved = sum(result["timing"]["saved_s"] for result in all_results.values())
+        logger.info(f"⏱️  Saved {saved:.1f}s in total against the default conversion path.")
+
+    generate_summary(all_results)
+    save_results(all_results, args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,12 +1,13 @@
 # utils.py
 import json
 import os
+import tempfile
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
+from typing import List, Tuple
 from .log_utils import logger
 
 MAX_PREVIEW_LENGTH = 30  # Max characters shown from cell text in summary
-SUPPORTED_FILE_EXTENSIONS = [".pdf", ".json"]
+SUPPORTED_FILE_EXTENSIONS = [".pdf", ".json", ".json.zst"]
 
 def get_supported_files(path: str) -> List[str]:
     """
@@ -18,7 +19,7 @@ def get_supported_files(path: str) -> List[str]:
         if os.path.isfile(os.path.join(path, f)) and any(f.endswith(ext) for ext in SUPPORTED_FILE_EXTENSIONS)
     ]
 
-def get_supported_files(path: str, extensions: List[str] = [".pdf", ".json"]) -> List[str]:
+def get_supported_files(path: str, extensions: List[str] = SUPPORTED_FILE_EXTENSIONS) -> List[str]:
     """
     Returns a list containing one or more files that are in SUPPORTED_FILE_EXTENSIONS
 
@@ -39,6 +40,65 @@ def get_supported_files(path: str, extensions: List[str] = [".pdf", ".json"]) ->
         ]
     return []
 
+def parse_page_range(value: str) -> Tuple[int, int]:
+    """
+    Parses a page range such as "5-12" or "7" into a (first, last) tuple.
+
+    Args:
+        value: 1-based page number or inclusive range.
+
+    Returns:
+        Tuple of the first and last page.
+
+    Raises:
+        ValueError: If the range is malformed or empty.
+    """
+    first, _, last = value.partition("-")
+    first, last = int(first), int(last or first)
+    if first < 1 or last < first:
+        raise ValueError(f"Invalid page range: {value}")
+    return first, last
+
+def save_markdown(doc, output_path: str) -> None:
+    """
+    Writes the Markdown export of a Docling document to a file, one top-level item at a time.
+
+    The output matches doc.export_to_markdown() without holding the whole
+    Markdown string in memory. It is written to a temporary file in the same
+    directory and renamed into place, so parallel runs never see a partial file.
+
+    Args:
+        doc: A DoclingDocument object.
+        output_path: Path of the Markdown file.
+    """
+    from docling_core.transforms.serializer.markdown import MarkdownDocSerializer
+
+    serializer = MarkdownDocSerializer(doc=doc)
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".markdown-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            # same walk as the serializer does for the whole body: groups serialize
+            # their children and mark them visited, non-empty parts are separated by a blank line
+            visited = set()
+            separator = ""
+            for item, level in doc.iterate_items(
+                with_groups=True,
+                included_content_layers=serializer.params.layers,
+                traverse_pictures=serializer.params.traverse_pictures,
+            ):
+                if item.self_ref in visited:
+                    continue
+                visited.add(item.self_ref)
+                text = serializer.serialize(item=item, visited=visited, level=level).text
+                if text:
+                    f.write(separator + text)
+                    separator = "\n\n"
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
 def save_results(results, output_file: str) -> None:
     """
     Saves the results dictionary to a JSON file.
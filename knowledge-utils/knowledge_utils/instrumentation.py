@@ -0,0 +1,287 @@
+"""
+Lightweight timing and memory instrumentation for the pre-processing utilities.
+
+Instrumented code records wall time, CPU time, peak RSS and an item count per
+call. Nothing is recorded unless a sink is configured, either with configure()
+or through the environment:
+
+    INSTRUCTLAB_TRACE_FILE       JSONL file, one line appended per finished span
+    INSTRUCTLAB_PROMETHEUS_FILE  Prometheus text exposition file with aggregated
+                                 per-stage metrics, updated after every span
+
+Spawned worker processes inherit the environment and write to the same files. Every
+process adds its spans to the metrics already in the Prometheus file under a file
+lock, so the file aggregates all of them; delete it to start counting from zero.
+"""
+import contextvars
+import functools
+import json
+import os
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+TRACE_FILE_ENV = "INSTRUCTLAB_TRACE_FILE"
+PROMETHEUS_FILE_ENV = "INSTRUCTLAB_PROMETHEUS_FILE"
+PROMETHEUS_PREFIX = "instructlab_stage"
+RSS_SAMPLE_INTERVAL = 0.05  # seconds between RSS samples while a span is open
+
+_config = {
+    "trace_file": os.getenv(TRACE_FILE_ENV),
+    "prometheus_file": os.getenv(PROMETHEUS_FILE_ENV),
+}
+_metrics: Dict[str, Dict[str, float]] = {}
+_lock = threading.Lock()
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def configure(trace_file: Optional[str] = None, prometheus_file: Optional[str] = None) -> None:
+    """
+    Sets where finished spans are exported. Passing None for both disables instrumentation.
+
+    Args:
+        trace_file:         Path of a JSONL file spans are appended to
+        prometheus_file:    Path of a Prometheus text format file with aggregated metrics
+    """
+    with _lock:
+        _config["trace_file"] = trace_file
+        _config["prometheus_file"] = prometheus_file
+        _metrics.clear()
+
+
+def is_enabled() -> bool:
+    return bool(_config["trace_file"] or _config["prometheus_file"])
+
+
+def current_rss_bytes() -> int:
+    """
+    Returns the resident set size of this process in bytes.
+
+    Reads /proc/self/statm where available and falls back to the peak RSS
+    reported by getrusage() on other platforms.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class PeakRssSampler:
+    """
+    Samples the RSS of this process from a background thread and keeps the peak.
+    """
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = current_rss_bytes()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_bytes())
+
+
+def record_items(count: int) -> None:
+    """
+    Adds `count` processed items to the innermost open span. No-op when instrumentation is disabled.
+    """
+    span = _current_span.get()
+    if span is not None:
+        span["items"] += count
+
+
+@contextmanager
+def trace(name: str, **attributes: Any):
+    """
+    Context manager measuring the enclosed block as a span called `name`.
+
+    The yielded dict is the span record. Set or increment its "items" key, or call
+    record_items(), to report how many items the block processed.
+    """
+    if not is_enabled():
+        yield {"name": name, "items": 0, "attributes": attributes}
+        return
+
+    parent = _current_span.get()
+    span = {
+        "name": name,
+        "span_id": uuid.uuid4().hex[:16],
+        "parent_id": parent["span_id"] if parent else None,
+        "pid": os.getpid(),
+        "start": time.time(),
+        "items": 0,
+        "attributes": attributes,
+        "status": "ok",
+    }
+    token = _current_span.set(span)
+    sampler = PeakRssSampler()
+    sampler.__enter__()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield span
+    except BaseException as e:
+        span["status"] = "error"
+        span["error"] = repr(e)
+        raise
+    finally:
+        span["cpu_time_s"] = round(time.process_time() - cpu_start, 6)
+        span["wall_time_s"] = round(time.perf_counter() - wall_start, 6)
+        sampler.__exit__()
+        span["peak_rss_bytes"] = sampler.peak
+        _current_span.reset(token)
+        _export(span)
+
+
+def instrumented(name: Optional[str] = None, count: Optional[Callable[[Any], int]] = None):
+    """
+    Decorator that wraps every call of the function in a trace() span.
+
+    Args:
+        name:   Span name. Defaults to the function's qualified name
+        count:  Optional callable receiving the return value and returning the
+                number of items the call processed
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return func(*args, **kwargs)
+            with trace(span_name) as span:
+                result = func(*args, **kwargs)
+                if count is not None:
+                    span["items"] += count(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def _export(span: Dict[str, Any]) -> None:
+    with _lock:
+        if _config["trace_file"]:
+            with open(_config["trace_file"], "a", encoding="utf-8") as f:
+                f.write(json.dumps(span, default=str) + "\n")
+
+        if _config["prometheus_file"]:
+            span_metrics = {
+                "calls_total": 1,
+                "errors_total": int(span["status"] == "error"),
+                "wall_seconds_total": span["wall_time_s"],
+                "cpu_seconds_total": span["cpu_time_s"],
+                "items_total": span["items"],
+                "peak_rss_bytes": span["peak_rss_bytes"],
+            }
+            _add_metrics(_metrics, span["name"], span_metrics)
+            _write_prometheus(_config["prometheus_file"], span["name"], span_metrics)
+
+
+PROMETHEUS_METRICS = [
+    ("calls_total", "counter", "Number of calls of each instrumented stage."),
+    ("errors_total", "counter", "Number of calls of each instrumented stage that raised."),
+    ("wall_seconds_total", "counter", "Wall time spent in each instrumented stage."),
+    ("cpu_seconds_total", "counter", "Process CPU time spent in each instrumented stage."),
+    ("items_total", "counter", "Items processed by each instrumented stage."),
+    ("peak_rss_bytes", "gauge", "Highest process RSS observed while a stage was running."),
+]
+
+
+_PROMETHEUS_SAMPLE = re.compile(rf'^{PROMETHEUS_PREFIX}_(\w+)\{{stage="(.*)"\}} (\S+)$')
+
+
+def _add_metrics(metrics: Dict[str, Dict[str, float]], stage: str, added: Dict[str, float]) -> None:
+    stage_metrics = metrics.setdefault(stage, {})
+    for metric, metric_type, _ in PROMETHEUS_METRICS:
+        if metric_type == "gauge":
+            stage_metrics[metric] = max(stage_metrics.get(metric, 0), added.get(metric, 0))
+        else:
+            stage_metrics[metric] = stage_metrics.get(metric, 0) + added.get(metric, 0)
+
+
+def format_prometheus(metrics: Dict[str, Dict[str, float]] | None = None) -> str:
+    """
+    Returns per-stage metrics in Prometheus text exposition format.
+
+    Args:
+        metrics:    Metrics per stage. Defaults to those aggregated in this process
+    """
+    metrics = _metrics if metrics is None else metrics
+    lines = []
+    for metric, metric_type, help_text in PROMETHEUS_METRICS:
+        full_name = f"{PROMETHEUS_PREFIX}_{metric}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {metric_type}")
+        for stage, stage_metrics in sorted(metrics.items()):
+            lines.append(f'{full_name}{{stage="{stage}"}} {stage_metrics[metric]}')
+    return "\n".join(lines) + "\n"
+
+
+def parse_prometheus(text: str) -> Dict[str, Dict[str, float]]:
+    """
+    Reads the per-stage metrics back from the output of format_prometheus().
+    """
+    metrics = {}
+    for line in text.splitlines():
+        match = _PROMETHEUS_SAMPLE.match(line)
+        if match:
+            metric, stage, value = match.groups()
+            number = float(value)
+            metrics.setdefault(stage, {})[metric] = int(number) if number.is_integer() and "." not in value else number
+    return metrics
+
+
+@contextmanager
+def _locked(path: str):
+    with open(path, "w") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_prometheus(path: str, stage: str, span_metrics: Dict[str, float]) -> None:
+    # other processes add to the same file, so the span is merged into what is there under a lock
+    directory, name = os.path.split(os.path.abspath(path))
+    with _locked(os.path.join(directory, f".{name}.lock")):
+        metrics = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                metrics = parse_prometheus(f.read())
+        _add_metrics(metrics, stage, span_metrics)
+        # write then rename so a textfile collector never scrapes a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".prometheus-", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(format_prometheus(metrics))
+        os.replace(tmp_path, path)
@@ -0,0 +1,151 @@
+"""
+Build manifest for pipeline workspaces.
+
+The manifest lives in <workspace>/manifest.json and records, for every stage that
+ran, the content hash of each input, the paths of its outputs and the parameters it
+ran with. A stage is up to date while all of those still match, so only the stages
+downstream of a changed source PDF or qna.yaml are rebuilt.
+
+File hashes are cached by size and modification time, so unchanged files are not
+rehashed on every run.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class Manifest:
+    """
+    Records the inputs, outputs and parameters of each pipeline stage in a workspace.
+
+    Entries are keyed by a stage key such as "nfl/conversion/2022-nfl-rulebook.pdf".
+    Several processes may share one manifest; updates are merged under a file lock.
+    """
+    def __init__(self, workspace_dir: Path):
+        self.workspace_dir = Path(workspace_dir)
+        self.path = self.workspace_dir / MANIFEST_FILE
+        self.lock_path = self.workspace_dir / f".{MANIFEST_FILE}.lock"
+        self.data = self._read()
+
+    def _read(self) -> Dict[str, Any]:
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                return data
+        return {"version": MANIFEST_VERSION, "stages": {}, "files": {}}
+
+    @contextmanager
+    def _locked(self):
+        with open(self.lock_path, "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _relative(self, path: Path) -> str:
+        return Path(os.path.relpath(Path(path).resolve(), self.workspace_dir.resolve())).as_posix()
+
+    def file_hash(self, path: Path) -> str:
+        """
+        Returns the sha256 of a file, reusing the cached hash while its size and mtime are unchanged
+        """
+        stat = os.stat(path)
+        key = self._relative(path)
+        cached = self.data["files"].get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+        self.data["files"][key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+        return sha256
+
+    def _hashes(self, paths: List[Path]) -> Dict[str, str]:
+        return {self._relative(p): self.file_hash(p) for p in paths}
+
+    def is_up_to_date(self, key: str, inputs: List[Path], outputs: List[Path], params: Dict[str, Any] | None = None) -> bool:
+        """
+        Returns True when the stage last ran with the same input contents and parameters
+        and all of its outputs still exist
+        """
+        entry = self.data["stages"].get(key)
+        if entry is None or not all(Path(p).exists() for p in inputs + outputs):
+            return False
+        return (
+            entry["inputs"] == self._hashes(inputs)
+            and entry["outputs"] == [self._relative(p) for p in outputs]
+            and entry.get("params") == (params or {})
+        )
+
+    def record(self, key: str, inputs: List[Path], outputs: List[Path], params: Dict[str, Any] | None = None) -> None:
+        """
+        Records a successful run of a stage and saves the manifest
+        """
+        entry = {
+            "inputs": self._hashes(inputs),
+            "outputs": [self._relative(p) for p in outputs],
+            "output_hashes": self._hashes(outputs),
+            "params": params or {},
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self.data["stages"][key] = entry
+        self._save(updated_stages={key: entry})
+
+    def is_modified(self, key: str, output: Path) -> bool:
+        """
+        Returns True when an output exists but was not written by the recorded run of the
+        stage, e.g. a qna.yaml edited by hand after it was generated
+        """
+        if not Path(output).exists():
+            return False
+        entry = self.data["stages"].get(key)
+        if entry is None:
+            return True
+        return entry.get("output_hashes", {}).get(self._relative(output)) != self.file_hash(output)
+
+    def forget(self, key: str) -> Dict[str, Any] | None:
+        """
+        Removes a stage entry, returning it
+        """
+        entry = self.data["stages"].pop(key, None)
+        self._save(removed_stages=[key])
+        return entry
+
+    def stage_keys(self, prefix: str) -> List[str]:
+        return [key for key in self.data["stages"] if key.startswith(prefix)]
+
+    def _save(self, updated_stages: Dict[str, Any] | None = None, removed_stages: List[str] | None = None) -> None:
+        # merge into whatever other workers saved since we loaded, then replace the file atomically
+        with self._locked():
+            on_disk = self._read()
+            on_disk["files"].update(self.data["files"])
+            on_disk["stages"].update(updated_stages or {})
+            for key in removed_stages or []:
+                on_disk["stages"].pop(key, None)
+            fd, tmp_path = tempfile.mkstemp(dir=self.workspace_dir, prefix=f".{MANIFEST_FILE}-", suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(on_disk, f, indent=2)
+            os.replace(tmp_path, self.path)
+            self.data = on_disk
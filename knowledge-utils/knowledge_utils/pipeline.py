@@ -0,0 +1,502 @@
+"""
+Headless runner for the knowledge pre-processing pipeline of the quick-start notebook.
+
+    knowledge-pipeline workspaces/default
+
+A workspace holds one directory per contribution, laid out like the notebook does:
+
+    <workspace>/<contribution>/contribution.yaml    domain, summary and optional customization
+    <workspace>/<contribution>/source_documents/    source PDFs
+    <workspace>/<contribution>/conversion/          Docling JSON per source document (.json.zst with --compact),
+                                                    <stem>.pages.jsonl with --reconvert-below or
+                                                    --route-pages, and
+                                                    .<stem>.checkpoint/ while one is converted with --checkpoint
+    <workspace>/<contribution>/chunking/            chunks.jsonl, or shards and chunks.manifest.json with --shard-mb
+                                                    (and chunks.parquet with --parquet, without --dedup)
+    <workspace>/<contribution>/dedup/               with --dedup, the chunks without duplicates, laid out the same (and
+                                                    chunks.parquet with --parquet), and dedup-report.json
+    <workspace>/<contribution>/authoring/           selected_chunks.jsonl and qna.yaml
+    <workspace>/<contribution>/seed_data-<name>/    with --export-format, the seed data with the input_ids of its
+                                                    text columns, next to seed_data-<name>.jsonl
+
+Contributions are processed concurrently in worker processes. Every stage is recorded
+in the workspace manifest (see knowledge_utils.manifest) with the hashes of its inputs, and is
+skipped while those and its parameters are unchanged. Changing one source PDF only
+reconverts that PDF; editing a qna.yaml keeps the edits and only rebuilds the seed
+dataset from it.
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+
+from .chunk_store import CHUNKS_JSONL, CHUNKS_PARQUET, manifest_path
+from .conversion import PAGE_REPORT_SUFFIX, convert_document, create_document_converter
+from .document_io import COMPACT_SUFFIX
+from .manifest import Manifest
+
+SOURCE_DOCUMENT_DIR = "source_documents"
+CONVERSION_DIR = "conversion"
+CHUNKING_DIR = "chunking"
+DEDUP_DIR = "dedup"
+AUTHORING_DIR = "authoring"
+CONTRIBUTION_FILE = "contribution.yaml"
+
+STAGES = ["conversion", "chunking", "dedup", "selection", "generation", "dataset"]
+
+logger = logging.getLogger("pipeline")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s", datefmt="%H:%M:%S"))
+    logger.addHandler(handler)
+
+
+def load_contributions(workspace_dir: Path, names: List[str] | None = None) -> List[dict]:
+    """
+    Finds the contributions in a workspace
+    Args:
+        workspace_dir (Path):   Workspace directory
+        names (List[str]):      Optional names of the contributions to load. Defaults to all of them
+    Returns:
+        contributions (List[dict]): One dict per contribution with `name`, `dir`, `domain`, `summary`
+                                    and `customization` keys
+    """
+    if not workspace_dir.is_dir():
+        raise ValueError(f"Workspace {workspace_dir} must be a directory")
+
+    contributions = []
+    for contribution_dir in sorted(p for p in workspace_dir.iterdir() if (p / SOURCE_DOCUMENT_DIR).is_dir()):
+        if names and contribution_dir.name not in names:
+            continue
+        contribution = {"name": contribution_dir.name, "dir": contribution_dir}
+        contribution_file = contribution_dir / CONTRIBUTION_FILE
+        if contribution_file.exists():
+            with open(contribution_file, "r") as f:
+                contribution.update(yaml.safe_load(f) or {})
+        contributions.append(contribution)
+
+    missing = set(names or []) - {c["name"] for c in contributions}
+    if missing:
+        raise ValueError(f"Contributions {', '.join(sorted(missing))} not found in {workspace_dir}")
+    return contributions
+
+
+def run_contribution(contribution: dict, options: dict) -> Dict[str, str]:
+    """
+    Runs the pipeline stages for a single contribution
+    Args:
+        contribution (dict):    Contribution as returned by load_contributions()
+        options (dict):         Parsed command line options as a dict
+    Returns:
+        statuses (Dict[str, str]): "ran" or "skipped" per stage
+    """
+    name = contribution["name"]
+    contribution_dir = contribution["dir"]
+    source_dir = contribution_dir / SOURCE_DOCUMENT_DIR
+    conversion_dir = contribution_dir / CONVERSION_DIR
+    chunking_dir = contribution_dir / CHUNKING_DIR
+    dedup_dir = contribution_dir / DEDUP_DIR
+    authoring_dir = contribution_dir / AUTHORING_DIR
+    chunks_jsonl = chunking_dir / CHUNKS_JSONL
+    unique_chunks_jsonl = dedup_dir / CHUNKS_JSONL
+    max_shard_bytes = options["shard_mb"] * 1024 * 1024 if options.get("shard_mb") else None
+    # the shard manifest changes whenever a shard does, so it stands in for the shards
+    chunk_files = [manifest_path(chunks_jsonl) if max_shard_bytes else chunks_jsonl]
+    unique_chunk_files = [manifest_path(unique_chunks_jsonl) if max_shard_bytes else unique_chunks_jsonl]
+    # deduplication is opt-in, seed selection and dataset creation read its chunks with --dedup only
+    dedup = options.get("dedup", False)
+    # the seed readers prefer chunks.parquet when it is there, so it is an input of the later stages too, and
+    # it is written by the stage those read from
+    chunking_parquet = options.get("parquet", False) and not dedup
+    if chunking_parquet:
+        chunk_files.append(chunking_dir / CHUNKS_PARQUET)
+    if options.get("parquet") and dedup:
+        unique_chunk_files.append(dedup_dir / CHUNKS_PARQUET)
+    seed_chunks_dir = dedup_dir if dedup else chunking_dir
+    seed_chunks_jsonl = unique_chunks_jsonl if dedup else chunks_jsonl
+    seed_chunk_files = unique_chunk_files if dedup else chunk_files
+    selected_chunks_jsonl = authoring_dir / "selected_chunks.jsonl"
+    qna_yaml = authoring_dir / "qna.yaml"
+    seed_data_jsonl = contribution_dir / f"seed_data-{name}.jsonl"
+
+    manifest = Manifest(contribution_dir.parent)
+    stages = options["stages"]
+    force = options["force"]
+    statuses = {}
+
+    def should_run(stage: str, key: str, inputs: List[Path], outputs: List[Path], params: dict | None = None) -> bool:
+        if stage not in stages:
+            return False
+        if not force and manifest.is_up_to_date(key, inputs, outputs, params):
+            logger.info(f"[{name}] ⏭️  {key} is up to date")
+            statuses.setdefault(stage, "skipped")
+            return False
+        logger.info(f"[{name}] ▶️  running {key}")
+        statuses[stage] = "ran"
+        return True
+
+    source_files = sorted(source_dir.glob("*.pdf"))
+    if not source_files:
+        raise ValueError(f"No PDFs found in {source_dir}")
+    json_suffix = COMPACT_SUFFIX if options.get("compact") else ".json"
+    json_files = [conversion_dir / f"{file.stem}{json_suffix}" for file in source_files]
+
+    chunking_key = f"{name}/chunking"
+    chunking_params = {"max_shard_bytes": max_shard_bytes} if max_shard_bytes else {}
+    if options.get("chunk_tokenizer"):
+        chunking_params["tokenizer"] = options["chunk_tokenizer"]
+    chunking_params = chunking_params or None
+
+    def create_stage_chunker():
+        from .chunking import create_chunker
+        from .create_seed_dataset import MAX_TOKEN_COUNT
+
+        # chunks are split to the token bound of the seed dataset with the tokenizer it counts with
+        return create_chunker(options["chunk_tokenizer"], MAX_TOKEN_COUNT) if options.get("chunk_tokenizer") else None
+
+    conversion_params = None
+    if options.get("reconvert_below") is not None:
+        conversion_params = {"reconvert_below": options["reconvert_below"],
+                             "fallback_pipeline": options.get("fallback_pipeline", "ocr")}
+    elif options.get("route_pages"):
+        conversion_params = {"route_pages": True}
+        if options.get("compare_ocr"):
+            conversion_params["compare_ocr"] = True
+
+    def conversion_outputs(file: Path, json_file: Path) -> List[Path]:
+        # reconverting or routing pages also writes which pipeline every page came from
+        return [json_file, conversion_dir / f"{file.stem}{PAGE_REPORT_SUFFIX}"] if conversion_params else [json_file]
+
+    streamed = False
+    if "conversion" in stages:
+        # drop the conversions of source documents that were removed so they are not chunked
+        current_keys = {f"{name}/conversion/{file.name}" for file in source_files}
+        for key in manifest.stage_keys(f"{name}/conversion/"):
+            if key not in current_keys:
+                for output in manifest.forget(key)["outputs"]:
+                    Path(manifest.workspace_dir / output).unlink(missing_ok=True)
+                logger.info(f"[{name}] 🗑️  removed outputs of {key}")
+
+        pending = [
+            (file, json_file) for file, json_file in zip(source_files, json_files)
+            if should_run("conversion", f"{name}/conversion/{file.name}", [file], conversion_outputs(file, json_file),
+                          conversion_params)
+        ]
+        if pending and options.get("stream") and "chunking" in stages:
+            from .streaming import convert_and_chunk
+
+            # chunking has to run again anyway, so it overlaps the conversions instead of reading their JSON back
+            logger.info(f"[{name}] ▶️  running {chunking_key} while converting")
+            pending_files = {file for file, _ in pending}
+            convert_and_chunk(source_files,
+                              chunking_dir,
+                              chunker=create_stage_chunker(),
+                              conversion_dir=conversion_dir,
+                              compact=options.get("compact", False),
+                              parquet=chunking_parquet,
+                              max_shard_bytes=max_shard_bytes,
+                              converted={file: json_file for file, json_file in zip(source_files, json_files)
+                                         if file not in pending_files},
+                              page_workers=options.get("page_workers", 1),
+                              checkpoint=options.get("checkpoint", False))
+            for file, json_file in pending:
+                manifest.record(f"{name}/conversion/{file.name}", [file], conversion_outputs(file, json_file),
+                                conversion_params)
+            manifest.record(chunking_key, json_files, chunk_files, chunking_params)
+            statuses["chunking"] = "ran"
+            streamed = True
+        elif len(pending) > 1 and options.get("conversion_workers", 1) > 1:
+            from .scheduler import ScheduledConversionError, schedule_conversions
+
+            # the most expensive PDFs start first, in worker processes that are replaced as they grow
+            try:
+                schedule_conversions([file for file, _ in pending],
+                                     conversion_dir,
+                                     workers=options["conversion_workers"],
+                                     compact=options.get("compact", False),
+                                     checkpoint=options.get("checkpoint", False),
+                                     **(conversion_params or {}))
+                converted = pending
+            except ScheduledConversionError as e:
+                # the documents that were converted are recorded, so a rerun only converts the failed ones
+                for file, json_file in pending:
+                    if file in e.json_files:
+                        manifest.record(f"{name}/conversion/{file.name}", [file], conversion_outputs(file, json_file),
+                                        conversion_params)
+                raise
+            for file, json_file in converted:
+                manifest.record(f"{name}/conversion/{file.name}", [file], conversion_outputs(file, json_file),
+                                conversion_params)
+        else:
+            doc_converter = None
+            for file, json_file in pending:
+                if not options.get("route_pages"):
+                    doc_converter = doc_converter or create_document_converter()
+                convert_document(file, conversion_dir, doc_converter, options.get("compact", False),
+                                 options.get("page_workers", 1), checkpoint=options.get("checkpoint", False),
+                                 converter_factory=create_document_converter, **(conversion_params or {}))
+                manifest.record(f"{name}/conversion/{file.name}", [file], conversion_outputs(file, json_file),
+                                conversion_params)
+
+    if not streamed and should_run("chunking", chunking_key, json_files, chunk_files, chunking_params):
+        from .chunking import chunk_documents
+
+        chunk_documents(conversion_dir, chunking_dir, create_stage_chunker(), chunking_parquet, max_shard_bytes)
+        manifest.record(chunking_key, json_files, chunk_files, chunking_params)
+
+    key = f"{name}/dedup"
+    params = {"threshold": options["dedup_threshold"]}
+    if max_shard_bytes:
+        params["max_shard_bytes"] = max_shard_bytes
+    if dedup and should_run("dedup", key, chunk_files, unique_chunk_files, params):
+        from .dedup import dedupe_chunks
+
+        report = dedupe_chunks(chunks_jsonl,
+                               dedup_dir,
+                               options["dedup_threshold"],
+                               options.get("parquet", False),
+                               max_shard_bytes)
+        logger.info(f"[{name}] 🧹 removed {report['removed']} of {report['chunks']} chunks "
+                    f"({report['exact_duplicates']} exact, {report['near_duplicates']} near duplicates)")
+        manifest.record(key, chunk_files, unique_chunk_files, params)
+
+    key = f"{name}/selection"
+    params = {"num_seed_examples": options["num_seed_examples"]}
+    if should_run("selection", key, seed_chunk_files, [selected_chunks_jsonl], params):
+        from .qna_gen import save_random_chunk_selection
+
+        authoring_dir.mkdir(parents=True, exist_ok=True)
+        save_random_chunk_selection(seed_chunks_jsonl, authoring_dir, options["num_seed_examples"])
+        manifest.record(key, seed_chunk_files, [selected_chunks_jsonl], params)
+
+    key = f"{name}/generation"
+    params = {
+        "domain": contribution.get("domain"),
+        "summary": contribution.get("summary"),
+        "customization": contribution.get("customization"),
+        "model_name": options["model_name"],
+    }
+    if should_run("generation", key, [selected_chunks_jsonl], [qna_yaml], params):
+        if not force and manifest.is_modified(key, qna_yaml):
+            # never overwrite seed examples that were authored or edited by hand
+            logger.warning(f"[{name}] ⚠️  {qna_yaml} was edited after it was generated, keeping it. Use --force to regenerate it")
+            statuses["generation"] = "skipped"
+        else:
+            from .qna_gen import generate_seed_examples
+
+            for field in ["domain", "summary"]:
+                if not contribution.get(field):
+                    raise ValueError(f"'{field}' must be set in {contribution_dir / CONTRIBUTION_FILE} to generate seed examples")
+            generate_seed_examples(name,
+                                   selected_chunks_jsonl,
+                                   authoring_dir,
+                                   options["api_key"],
+                                   options["endpoint_url"],
+                                   options["model_name"],
+                                   contribution["domain"],
+                                   contribution["summary"],
+                                   contribution.get("customization"))
+            manifest.record(key, [selected_chunks_jsonl], [qna_yaml], params)
+
+    key = f"{name}/dataset"
+    params = {"icls_per_chunk": options["icls_per_chunk"]} if options.get("icls_per_chunk") else {}
+    seed_data_files = [seed_data_jsonl]
+    export_dir = None
+    if options.get("export_format"):
+        from .create_seed_dataset import EXPORT_MANIFEST
+
+        params["export_format"] = options["export_format"]
+        export_dir = contribution_dir / f"seed_data-{name}"
+        seed_data_files.append(export_dir / EXPORT_MANIFEST)
+    params = params or None
+    if should_run("dataset", key, [*seed_chunk_files, qna_yaml], seed_data_files, params):
+        from .create_seed_dataset import get_seed_dataset
+
+        seed_data = get_seed_dataset(seed_chunks_dir, authoring_dir, options.get("icls_per_chunk"), export_dir=export_dir,
+                                     export_format=options.get("export_format") or "arrow")
+        if seed_data is None:
+            # not recorded, so the stage runs again once there are chunks, and older seed data is not concatenated
+            logger.warning(f"[{name}] ⚠️  No chunks are within the token bounds of the seed dataset, "
+                           f"no seed data was written")
+            seed_data_jsonl.unlink(missing_ok=True)
+            statuses["dataset"] = "skipped"
+        else:
+            seed_data.to_json(seed_data_jsonl, orient='records', lines=True)
+            manifest.record(key, [*seed_chunk_files, qna_yaml], seed_data_files, params)
+
+    return statuses
+
+
+def write_final_seed_data(workspace_dir: Path, contributions: List[dict], force: bool = False) -> Path | None:
+    """
+    Concatenates the seed data of every contribution into <workspace>/seed_data.jsonl. Contributions without seed
+    data are left out with a warning, and nothing is written when none has any
+    """
+    seed_data_files = [c["dir"] / f"seed_data-{c['name']}.jsonl" for c in contributions]
+    output_path = workspace_dir / "seed_data.jsonl"
+
+    missing = [c["name"] for c, seed_data_file in zip(contributions, seed_data_files) if not seed_data_file.exists()]
+    if missing:
+        logger.warning(f"⚠️  Contributions without seed data are left out of {output_path}: {', '.join(missing)}. "
+                       f"Run their dataset stage to include them")
+        seed_data_files = [seed_data_file for seed_data_file in seed_data_files if seed_data_file.exists()]
+    if not seed_data_files:
+        logger.error(f"❌ No contribution has seed data, {output_path} was not written")
+        return None
+
+    manifest = Manifest(workspace_dir)
+    if not force and manifest.is_up_to_date("seed_data", seed_data_files, [output_path]):
+        logger.info(f"⏭️  {output_path} is up to date")
+        return output_path
+
+    with open(output_path, "wb") as out:
+        for seed_data_file in seed_data_files:
+            with open(seed_data_file, "rb") as f:
+                for line in f:
+                    out.write(line if line.endswith(b"\n") else line + b"\n")
+    manifest.record("seed_data", seed_data_files, [output_path])
+    logger.info(f"📁 Final seed data for SDG saved to: {output_path}")
+    return output_path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the knowledge pre-processing pipeline over a workspace")
+    parser.add_argument("workspace", help="Workspace directory containing one directory per contribution")
+    parser.add_argument("-c", "--contributions", nargs="+", help="Only process these contributions")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="Stages to run")
+    parser.add_argument("-f", "--force", action="store_true", help="Run stages even when the manifest says they are up to date")
+    parser.add_argument("-j", "--workers", type=int, help="Number of contributions processed concurrently")
+    parser.add_argument("--compact", action="store_true",
+                        help="Store conversions as zstd-compressed Docling JSON (.json.zst)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Chunk every document while the next one is converted instead of after all conversions")
+    parser.add_argument("--conversion-workers", type=int, default=1,
+                        help="Convert the PDFs of a contribution in this many processes, the largest first, replacing "
+                             "workers after 20 documents or 8 GB of RSS")
+    parser.add_argument("--page-workers", type=int, default=1,
+                        help="Convert PDFs of more than 50 pages as page ranges in this many processes")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="Checkpoint the conversion of PDFs of more than 50 pages every 50 pages in conversion/, "
+                             "so a rerun after a crash resumes at the first unfinished page range")
+    parser.add_argument("--reconvert-below", type=float,
+                        help="Reconvert the pages with a Docling confidence score below this, e.g. 0.8, with "
+                             "--fallback-pipeline and record the pipeline of every page in conversion/<stem>.pages.jsonl")
+    parser.add_argument("--fallback-pipeline", choices=["ocr", "vlm"], default="ocr",
+                        help="Pipeline low-confidence pages are reconverted with: forced OCR or the SmolDocling VLM")
+    parser.add_argument("--route-pages", action="store_true",
+                        help="Convert every page with the cheapest adequate pipeline, from the text layer alone to "
+                             "forced OCR or the SmolDocling VLM for scans and drawings, and record the pipeline of every "
+                             "page in conversion/<stem>.pages.jsonl")
+    parser.add_argument("--compare-ocr", action="store_true",
+                        help="With --route-pages, also convert every PDF with forced OCR and record the time routing "
+                             "saved in the convert_document trace span")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Also write the chunks to chunks.parquet, read by seed selection and dataset creation")
+    parser.add_argument("--shard-mb", type=int,
+                        help="Write the chunks to shards of at most this many MB with a manifest instead of one chunks.jsonl")
+    parser.add_argument("--chunk-tokenizer",
+                        help="Hugging Face tokenizer the chunks are split to at most 1024 tokens with. With the seed dataset "
+                             "tokenizer, instructlab/granite-7b-lab, the dataset stage reuses the token counts of the chunks")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Run the dedup stage, which removes exact and near-duplicate chunks before seed selection. "
+                             "Off by default, so the chunks and seed data stay those of the notebook")
+    parser.add_argument("--dedup-threshold", type=float, default=0.8,
+                        help="Similarity of word shingles from which the dedup stage drops a chunk as a near duplicate")
+    parser.add_argument("--num-seed-examples", type=int, default=7, help="Number of chunks selected per contribution")
+    parser.add_argument("--seed", type=int, help="Random seed for chunk selection")
+    parser.add_argument("--icls-per-chunk", type=int,
+                        help="Pair every chunk with only this many of its most similar seed examples in the seed dataset "
+                             "instead of all of them")
+    parser.add_argument("--export-format", choices=["arrow", "parquet"],
+                        help="Also write the seed data of every contribution with the input_ids of its text columns to "
+                             "shards of this format in <contribution>/seed_data-<name>/")
+    parser.add_argument("--endpoint-url", default=os.getenv("MODEL_ENDPOINT_URL"),
+                        help="OpenAI compatible endpoint used for Q&A generation. Defaults to $MODEL_ENDPOINT_URL")
+    parser.add_argument("--api-key", default=os.getenv("MODEL_API_KEY"),
+                        help="API key for the endpoint. Defaults to $MODEL_API_KEY")
+    parser.add_argument("--model-name", default=os.getenv("MODEL_NAME") or "mistralai/Mixtral-8x7B-Instruct-v0.1",
+                        help="Model used for Q&A generation. Defaults to $MODEL_NAME")
+    args = parser.parse_args()
+    if args.reconvert_below is not None and (args.stream or args.checkpoint or args.page_workers > 1):
+        parser.error("--reconvert-below needs single conversions and is not combined with --stream, --checkpoint "
+                     "or --page-workers")
+    if args.route_pages and (args.reconvert_below is not None or args.stream or args.checkpoint
+                             or args.page_workers > 1):
+        parser.error("--route-pages needs single conversions and is not combined with --reconvert-below, --stream, "
+                     "--checkpoint or --page-workers")
+    if args.compare_ocr and not args.route_pages:
+        parser.error("--compare-ocr needs --route-pages")
+    if args.stream and args.conversion_workers > 1:
+        parser.error("--stream chunks every document as it is converted in this process and is not combined with "
+                     "--conversion-workers")
+    if args.icls_per_chunk is not None and args.icls_per_chunk < 1:
+        parser.error("--icls-per-chunk must be at least 1")
+    return args
+
+
+def _run_in_worker(contribution: dict, options: dict) -> Dict[str, str]:
+    if options["seed"] is not None:
+        random.seed(f"{options['seed']}-{contribution['name']}")
+    return run_contribution(contribution, options)
+
+
+def main() -> None:
+    args = parse_args()
+    options = vars(args)
+    workspace_dir = Path(args.workspace)
+    try:
+        contributions = load_contributions(workspace_dir, args.contributions)
+    except ValueError as e:
+        logger.error(f"❌ {e}")
+        sys.exit(1)
+    if not contributions:
+        logger.error(f"❌ No contributions with a {SOURCE_DOCUMENT_DIR} directory found in {workspace_dir}")
+        sys.exit(1)
+
+    if "generation" in args.stages and not (args.endpoint_url and args.api_key):
+        logger.error("❌ Q&A generation needs --endpoint-url and --api-key (or MODEL_ENDPOINT_URL and MODEL_API_KEY)")
+        sys.exit(1)
+
+    workers = args.workers or min(len(contributions), os.cpu_count() or 1)
+    failed = []
+
+    if workers == 1:
+        for contribution in contributions:
+            try:
+                _run_in_worker(contribution, options)
+            except Exception as e:
+                logger.error(f"[{contribution['name']}] ❌ Failed: {e}")
+                failed.append(contribution["name"])
+    else:
+        # spawn so every worker loads its own Docling models instead of forking a half-initialized torch
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+            futures = {executor.submit(_run_in_worker, c, options): c for c in contributions}
+            for future in as_completed(futures):
+                contribution = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"[{contribution['name']}] ❌ Failed: {e}")
+                    failed.append(contribution["name"])
+
+    if failed:
+        logger.error(f"❌ Pipeline failed for: {', '.join(failed)}")
+        sys.exit(1)
+
+    if "dataset" in args.stages:
+        # the final seed data always covers every contribution in the workspace
+        write_final_seed_data(workspace_dir, load_contributions(workspace_dir), args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,10 @@ import yaml
 import random
 
 from pathlib import Path
-
-from docling_sdg.qa.prompts.generation_prompts import QaPromptTemplate
-from pydantic import SecretStr
 from textwrap import wrap
 
-from docling_core.transforms.chunker.hierarchical_chunker import DocChunk, DocMeta
-from docling_sdg.qa.utils import get_qa_chunks
-from docling_sdg.qa.generate import Generator
-from docling_sdg.qa.base import GenerateOptions, LlmProvider
+from .chunk_store import chunks_exist, count_chunks, read_chunk_records
+from .instrumentation import instrumented, record_items
 
 CUSTOM_COMBINED_QUESTION_PROMPT =  (
     "I will provide you a text passage. I need you to generate three questions that "
@@ -51,36 +46,29 @@ def str_presenter(dumper, data):
     return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|')
   return dumper.represent_scalar('tag:yaml.org,2002:str', data)
 
-yaml.add_representer(str, str_presenter)
-
-# to use with safe_dump:
-yaml.representer.SafeRepresenter.add_representer(str, str_presenter)
-
 class IndentedDumper(yaml.Dumper):
     def increase_indent(self, flow=False, indentless=False):
         return super(IndentedDumper, self).increase_indent(flow, False)
 
+# registered on our dumper only, so importing this module does not change how other code dumps YAML
+IndentedDumper.add_representer(str, str_presenter)
+
 def save_random_chunk_selection(chunks_jsonl_path: Path, output_dir: Path, num_seed_examples: int) -> Path:
     """
     Creates a seed dataset from a path
     Args:
-        chunks_jsonl_path (Path):       Path to the chunks.jsonl file
+        chunks_jsonl_path (Path):       Path to the chunks.jsonl file. Shards or chunks.parquet next to it are used when present
         output_dir (Path):              Path to output dir for select_chunks.jsonl
         num_seed_examples (int):        Number of chunks user wishes to randomly select
     Returns:
         selected_chunks_file_path (pathlib.Path): Path to the generated seed example file
     """
-    if not chunks_jsonl_path.exists():
+    if not chunks_exist(chunks_jsonl_path):
         raise ValueError(f"chunks.jsonl does not exist but should at {chunks_jsonl_path}")
 
-    chunks = []
-
-    with open(chunks_jsonl_path, 'r') as file:  # khaled was here
-        for line in file:
-            chunk = json.loads(line)
-            chunks.append(chunk)
-
-    selected_chunks = random.sample(chunks, num_seed_examples)
+    # sampling positions picks the same chunks as sampling the records, but only the selected ones are read
+    num_chunks = count_chunks(chunks_jsonl_path)
+    selected_chunks = read_chunk_records(chunks_jsonl_path, random.sample(range(num_chunks), num_seed_examples))
 
     selected_chunks_file_path = output_dir / "selected_chunks.jsonl"
     with open(selected_chunks_file_path, "w", encoding="utf-8") as file:
@@ -90,6 +78,7 @@ def save_random_chunk_selection(chunks_jsonl_path: Path, output_dir: Path, num_s
 
     return selected_chunks_file_path
 
+@instrumented("generate_seed_examples")
 def generate_seed_examples(contribution_name: str, chunks_jsonl_path: Path, output_dir: Path, api_key: str, api_url: str, model_id: str, domain: str, summary: str, customization_str: str | None = None) -> Path:
     """
     Generates questions and answers per chunk via docling sdg. Saves them in an intermediate file
@@ -104,6 +93,14 @@ def generate_seed_examples(contribution_name: str, chunks_jsonl_path: Path, outp
     Returns:
         qna_output_path (pathlib.Path): Path to a json file for generated questions and answers
     """
+    # docling-sdg pulls in docling-core, pydantic and the LLM clients, so only import it when generating
+    from docling_core.transforms.chunker.hierarchical_chunker import DocChunk, DocMeta
+    from docling_sdg.qa.base import GenerateOptions, LlmProvider
+    from docling_sdg.qa.generate import Generator
+    from docling_sdg.qa.prompts.generation_prompts import QaPromptTemplate
+    from docling_sdg.qa.utils import get_qa_chunks
+    from pydantic import SecretStr
+
     dataset = {}
     dataset[contribution_name] = {}
     dataset[contribution_name]["chunks"] = []
@@ -172,6 +169,7 @@ def generate_seed_examples(contribution_name: str, chunks_jsonl_path: Path, outp
             if chunk_id not in qnas:
                 qnas[chunk_id] = []
             qnas[chunk_id].append({'question': entry['question'], 'answer': entry['answer']})
+            record_items(1)
 
     qna_output_path = output_dir / "qna.yaml"
     
@@ -271,7 +269,7 @@ def view_seed_example(qna_output_path: Path, seed_example_num: int) -> None:
             raise ValueError(f"seed_example_num must be less than number of seed examples {len(seed_examples)}")
         seed_example = seed_examples[seed_example_num]
         print("Context:")
-        print(f"{seed_example["context"]}\n")
+        print(f"{seed_example['context']}\n")
         for qna in seed_example["questions_and_answers"]:
-            print(f"Question: {qna["question"]}")
-            print(f"Answer: {qna["answer"]}\n")
+            print(f"Question: {qna['question']}")
+            print(f"Answer: {qna['answer']}\n")
@@ -0,0 +1,156 @@
+"""
+Selective reconversion of low-confidence pages.
+
+    standard pipeline ──▶ page confidence ──▶ pages below the threshold ──▶ OCR or VLM pipeline
+           └──────────────── pages above it ──▶ spliced back in page order ◀──┘
+
+Docling scores the conversion of every page. Rerunning a whole document with forced
+OCR or a VLM because a few pages scored poorly costs far more than those pages, so
+convert_with_reconversion() converts a document with the standard pipeline and only
+reconverts the pages whose mean score is below the threshold, one conversion per run
+of consecutive pages. A reconverted page replaces the original unless it scored lower.
+The pipeline and scores of every page are returned, and convert_document() writes them
+next to the Docling JSON as <file stem>.pages.jsonl.
+"""
+import json
+import math
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from .conversion import (
+    PAGE_REPORT_SUFFIX,
+    create_document_converter,
+    get_pipeline_converter,
+    merge_page_documents,
+    renumber_pages,
+)
+from .instrumentation import trace
+
+# type hints only, docling is imported by create_document_converter()
+if TYPE_CHECKING:
+    from docling.document_converter import DocumentConverter
+    from docling_core.types.doc import DoclingDocument
+
+# the conversion notebook suggests another pipeline below this score
+CONFIDENCE_THRESHOLD = 0.8
+FALLBACK_PIPELINE = "ocr"
+
+
+def page_scores(confidence) -> Dict[int, float | None]:
+    """
+    Returns the mean confidence score of every page of a ConversionResult.confidence by 1-based page number.
+    Scores Docling could not compute are None
+    """
+    return {
+        page_index + 1: None if math.isnan(page.mean_score) else page.mean_score
+        for page_index, page in sorted(confidence.pages.items())
+    }
+
+
+def page_runs(page_nos: List[int]) -> List[Tuple[int, int]]:
+    """
+    Groups sorted page numbers into (first, last) ranges of consecutive pages
+    """
+    runs = []
+    for page_no in page_nos:
+        if runs and runs[-1][1] == page_no - 1:
+            runs[-1] = (runs[-1][0], page_no)
+        else:
+            runs.append((page_no, page_no))
+    return runs
+
+
+def splice_pages(doc: "DoclingDocument", replacements: Dict[int, "DoclingDocument"]) -> "DoclingDocument":
+    """
+    Replaces pages of a document with the same pages of other conversions of its source
+    Args:
+        doc (DoclingDocument):                          Conversion of the whole source document
+        replacements (Dict[int, DoclingDocument]):      Conversion holding the replacement of a page, by page number
+    Returns:
+        doc (DoclingDocument): The document with the items of every replaced page taken from its replacement,
+            in page order, with the page numbers and origin of the source
+    """
+    runs = []
+    for page_no in sorted(doc.pages):
+        source = replacements.get(page_no, doc)
+        if runs and runs[-1][0] is source:
+            runs[-1][1].add(page_no)
+        else:
+            runs.append((source, {page_no}))
+
+    parts = []
+    for source, page_nos in runs:
+        part = source.filter(page_nrs=page_nos)
+        # filter() numbers the pages from 1 on when the source does not start at page 1, like a page range does
+        offset = min(source.pages) - 1
+        parts.append(renumber_pages(part, {page_no - offset: page_no for page_no in page_nos}) if offset else part)
+
+    spliced = merge_page_documents(parts)
+    spliced.name = doc.name
+    spliced.origin = doc.origin
+    return spliced
+
+
+def convert_with_reconversion(
+    file: Path,
+    doc_converter: "DocumentConverter | None" = None,
+    threshold: float = CONFIDENCE_THRESHOLD,
+    pipeline: str = FALLBACK_PIPELINE,
+) -> Tuple["DoclingDocument", List[dict]]:
+    """
+    Converts a source document and reconverts its low-confidence pages with a heavier pipeline
+    Args:
+        file (Path):                        Path to the source PDF
+        doc_converter (DocumentConverter):  Converter of the first pass. Defaults to the standard pipeline
+        threshold (float):                  Pages with a mean confidence score below this are reconverted
+        pipeline (str):                     Pipeline the pages are reconverted with, "ocr" or "vlm"
+    Returns:
+        doc (DoclingDocument):      The document with the reconverted pages spliced in
+        page_report (List[dict]):   "page_no", the "pipeline" the page was kept from and the "scores" of every
+            pipeline that converted it, per page
+    """
+    if doc_converter is None:
+        doc_converter = create_document_converter()
+
+    conversion_result = doc_converter.convert(source=file)
+    doc = conversion_result.document
+    scores = page_scores(conversion_result.confidence)
+    page_report = [{"page_no": page_no, "pipeline": "standard", "scores": {"standard": scores.get(page_no)}}
+                   for page_no in sorted(doc.pages)]
+    low_pages = [entry["page_no"] for entry in page_report
+                 if entry["scores"]["standard"] is not None and entry["scores"]["standard"] < threshold]
+    if not low_pages:
+        return doc, page_report
+
+    page_entries = {entry["page_no"]: entry for entry in page_report}
+    replacements = {}
+    with trace("reconvert_pages", file=str(file), pipeline=pipeline) as span:
+        for page_range in page_runs(low_pages):
+            reconversion = get_pipeline_converter(pipeline).convert(source=file, page_range=page_range)
+            new_scores = page_scores(reconversion.confidence)
+            span["items"] += page_range[1] - page_range[0] + 1
+            for page_no in range(page_range[0], page_range[1] + 1):
+                if page_no not in reconversion.document.pages:
+                    continue
+                entry = page_entries[page_no]
+                entry["scores"][pipeline] = new_scores.get(page_no)
+                # a page the heavier pipeline did worse on keeps its first conversion
+                if new_scores.get(page_no) is None or new_scores[page_no] >= entry["scores"]["standard"]:
+                    entry["pipeline"] = pipeline
+                    replacements[page_no] = reconversion.document
+
+    if replacements:
+        doc = splice_pages(doc, replacements)
+    return doc, page_report
+
+
+def save_page_report(page_report: List[dict], file: Path, output_dir: Path) -> Path:
+    """
+    Writes the page report of a conversion to <file stem>.pages.jsonl, one line per page
+    """
+    report_path = output_dir / f"{file.stem}{PAGE_REPORT_SUFFIX}"
+    with open(report_path, "w") as f:
+        for entry in page_report:
+            f.write(json.dumps(entry) + "\n")
+    return report_path
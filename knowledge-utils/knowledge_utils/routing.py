@@ -0,0 +1,181 @@
+"""
+Per-page routing between the conversion pipelines.
+
+    PDF ──▶ page features ──▶ cheapest adequate pipeline per page ──▶ runs of pages ──▶ merged
+             (text layer, images, drawings)   text │ standard │ ocr │ vlm
+
+The pipelines of the conversion notebook each convert a whole document, so a PDF with
+a few scanned pages either pays for OCR on every page or loses the text of the scans.
+route_pages() reads the text layer and the page objects of every page with pypdfium2,
+which takes milliseconds per page, and picks the cheapest pipeline that can convert
+it: the text layer alone, the standard pipeline when images cover part of the page,
+forced OCR when images cover the page and there is no text layer, and the VLM when a
+page without text is drawn with vector paths. convert_with_routing() converts every
+run of consecutive pages with the same pipeline as one page-range conversion and
+merges them in page order. The pipeline, features and conversion time of every page
+are returned, and convert_document() writes them next to the Docling JSON as
+<file stem>.pages.jsonl. The time routing saves is only reported when it is measured
+against a forced OCR conversion of the whole PDF, it is never estimated.
+"""
+import time
+
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Tuple
+
+from .conversion import get_pipeline_converter, merge_page_documents
+from .instrumentation import trace
+
+# type hints only, docling is imported by create_document_converter()
+if TYPE_CHECKING:
+    from docling_core.types.doc import DoclingDocument
+
+# share of the page area covered by the characters of the text layer from which the text layer is used
+MIN_TEXT_COVERAGE = 0.01
+# share of the page area covered by images from which the images are OCRed
+MIN_IMAGE_RATIO = 0.1
+# share of the page area covered by images from which a page without a text layer is a scan
+SCAN_IMAGE_RATIO = 0.5
+# vector paths from which a page without a text layer is a drawing, e.g. a chart with outlined labels
+MIN_DRAWING_PATHS = 200
+
+
+def page_features(file: Path) -> List[dict]:
+    """
+    Reads the text layer and page objects of every page of a PDF without converting it
+    Args:
+        file (Path): Path to the source PDF
+    Returns:
+        features (List[dict]): "page_no", the "chars" of the text layer, the "text_coverage" and "image_ratio",
+            the shares of the page area covered by characters and by images, and the vector "paths", per page
+    """
+    # pypdfium2 is the PDF backend docling installs
+    import pypdfium2
+    import pypdfium2.raw as pdfium_c
+
+    features = []
+    pdf = pypdfium2.PdfDocument(str(file))
+    try:
+        for page_index in range(len(pdf)):
+            page = pdf[page_index]
+            width, height = page.get_size()
+            page_area = width * height or 1
+            text_page = page.get_textpage()
+            text_area = 0.0
+            for rect_index in range(text_page.count_rects()):
+                left, bottom, right, top = text_page.get_rect(rect_index)
+                text_area += max(right - left, 0) * max(top - bottom, 0)
+
+            image_area = 0.0
+            paths = 0
+            for obj in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE, pdfium_c.FPDF_PAGEOBJ_PATH]):
+                if obj.type == pdfium_c.FPDF_PAGEOBJ_PATH:
+                    paths += 1
+                    continue
+                # get_pos() was renamed get_bounds() in pypdfium2 5
+                left, bottom, right, top = obj.get_bounds() if hasattr(obj, "get_bounds") else obj.get_pos()
+                image_area += (max(min(right, width) - max(left, 0), 0)
+                               * max(min(top, height) - max(bottom, 0), 0))
+
+            features.append({
+                "page_no": page_index + 1,
+                "chars": text_page.count_chars(),
+                "text_coverage": round(min(text_area / page_area, 1.0), 4),
+                # overlapping images can add up to more than the page
+                "image_ratio": round(min(image_area / page_area, 1.0), 4),
+                "paths": paths,
+            })
+            text_page.close()
+            page.close()
+    finally:
+        pdf.close()
+    return features
+
+
+def route_page(features: dict) -> str:
+    """
+    Returns the cheapest pipeline adequate for a page with these page_features(): "text", "standard", "ocr" or "vlm"
+    """
+    has_text_layer = features["text_coverage"] >= MIN_TEXT_COVERAGE
+    if features["image_ratio"] >= SCAN_IMAGE_RATIO and not has_text_layer:
+        return "ocr"
+    if features["image_ratio"] >= MIN_IMAGE_RATIO:
+        # the standard pipeline keeps the text layer and OCRs the images
+        return "standard"
+    if not has_text_layer and features["paths"] >= MIN_DRAWING_PATHS:
+        return "vlm"
+    # a blank page has nothing another pipeline would find
+    return "text"
+
+
+def route_pages(file: Path) -> List[dict]:
+    """
+    Routes every page of a PDF to the cheapest adequate pipeline
+    Returns:
+        page_report (List[dict]): The page_features() of every page with the "pipeline" it is routed to
+    """
+    with trace("route_pages", file=str(file)) as span:
+        page_report = [{**features, "pipeline": route_page(features)} for features in page_features(file)]
+        span["items"] += len(page_report)
+    return page_report
+
+
+def pipeline_runs(page_report: List[dict]) -> List[Tuple[str, Tuple[int, int]]]:
+    """
+    Groups routed pages into (pipeline, (first, last)) runs of consecutive pages with the same pipeline
+    """
+    runs = []
+    for entry in page_report:
+        if runs and runs[-1][0] == entry["pipeline"] and runs[-1][1][1] == entry["page_no"] - 1:
+            runs[-1] = (entry["pipeline"], (runs[-1][1][0], entry["page_no"]))
+        else:
+            runs.append((entry["pipeline"], (entry["page_no"], entry["page_no"])))
+    return runs
+
+
+def convert_with_routing(
+    file: Path,
+    page_report: List[dict] | None = None,
+    compare_ocr: bool = False,
+) -> Tuple["DoclingDocument", List[dict], dict]:
+    """
+    Converts a source PDF with the cheapest adequate pipeline per page
+    Args:
+        file (Path):                Path to the source PDF
+        page_report (List[dict]):   Routing of the pages, as returned by route_pages(). Routed here by default
+        compare_ocr (bool):         Also convert the whole PDF with forced OCR to measure the time routing saved.
+                                    Costs that full conversion
+    Returns:
+        doc (DoclingDocument):      The document merged from the conversions of every run of pages
+        page_report (List[dict]):   The routing of every page with the "seconds" its run took per page
+        timing (dict):              "routing_s" for the page features, "conversion_s" for the conversions and
+            "pages" per pipeline; with compare_ocr also the measured "full_ocr_s" and "saved_s", which
+            are left out otherwise rather than estimated
+    """
+    start = time.perf_counter()
+    if page_report is None:
+        page_report = route_pages(file)
+    timing = {"routing_s": time.perf_counter() - start, "conversion_s": 0.0, "pages": {}}
+    page_entries = {entry["page_no"]: entry for entry in page_report}
+
+    parts = []
+    with trace("convert_routed_pages", file=str(file)) as span:
+        for pipeline, page_range in pipeline_runs(page_report):
+            start = time.perf_counter()
+            parts.append(get_pipeline_converter(pipeline).convert(source=file, page_range=page_range).document)
+            elapsed = time.perf_counter() - start
+            num_pages = page_range[1] - page_range[0] + 1
+            for page_no in range(page_range[0], page_range[1] + 1):
+                page_entries[page_no]["seconds"] = round(elapsed / num_pages, 4)
+            timing["conversion_s"] += elapsed
+            timing["pages"][pipeline] = timing["pages"].get(pipeline, 0) + num_pages
+            span["items"] += num_pages
+        span["attributes"].update(timing["pages"])
+
+    doc = merge_page_documents(parts)
+    if compare_ocr:
+        with trace("convert_full_ocr", file=str(file)):
+            start = time.perf_counter()
+            get_pipeline_converter("ocr").convert(source=file)
+            timing["full_ocr_s"] = time.perf_counter() - start
+        timing["saved_s"] = timing["full_ocr_s"] - timing["routing_s"] - timing["conversion_s"]
+    return doc, page_report, timing
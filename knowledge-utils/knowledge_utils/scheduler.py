@@ -0,0 +1,194 @@
+"""
+Size-aware scheduling of document conversions.
+
+    estimate cost ──▶ longest first ──▶ worker processes ──▶ Docling JSON
+                                          └──▶ replaced after N documents or above an RSS
+
+schedule_conversions() estimates the cost of every source document from its page
+count and file size and starts the most expensive ones first, so the largest PDF of
+a folder no longer starts last and stretches the run. A document only starts while
+the pages of the documents being converted stay within max_pages_in_flight, which
+bounds the memory of page images and model predictions held at once; a document
+larger than that runs alone. Docling workers grow over time, so every worker process
+is replaced by a fresh one after max_documents_per_worker documents, or as soon as
+its RSS is above max_worker_rss after a document. A document that fails does not stop
+the others: its worker is replaced, and once every document ran the failures are raised
+as a ScheduledConversionError together with the documents that were converted.
+"""
+import os
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+
+from .conversion import PAGES_PER_JOB, convert_document, count_pdf_pages, create_document_converter
+from .instrumentation import current_rss_bytes, trace
+
+# type hints only, docling is imported by the converter factory in the worker processes
+if TYPE_CHECKING:
+    from docling.document_converter import DocumentConverter
+
+# file size that costs as much as converting one page, so scanned PDFs weigh more than their page count
+BYTES_PER_PAGE_COST = 256 * 1024
+MAX_PAGES_IN_FLIGHT = 1000
+MAX_DOCUMENTS_PER_WORKER = 20
+MAX_WORKER_RSS = 8 * 1024 ** 3
+
+
+class ScheduledConversionError(RuntimeError):
+    """
+    Raised by schedule_conversions() when documents failed to convert, after all the others were converted
+    Attributes:
+        failures (Dict[Path, BaseException]):   Error of every source document that failed
+        json_files (Dict[Path, Path]):          Docling JSON of every source document that was converted
+    """
+    def __init__(self, failures: Dict[Path, BaseException], json_files: Dict[Path, Path]):
+        super().__init__(f"{len(failures)} of {len(failures) + len(json_files)} documents failed to convert: "
+                         + ", ".join(f"{file.name} ({error!r})" for file, error in failures.items()))
+        self.failures = failures
+        self.json_files = json_files
+
+
+def estimate_cost(file: Path) -> dict:
+    """
+    Estimates the cost of converting a source document without converting it
+    Args:
+        file (Path): Path to the source document
+    Returns:
+        job (dict): "file", "pages", "bytes" and "cost", the number of pages plus one per BYTES_PER_PAGE_COST bytes
+    """
+    num_bytes = file.stat().st_size
+    num_pages = count_pdf_pages(file) if file.suffix.lower() == ".pdf" else 1
+    return {"file": file, "pages": num_pages, "bytes": num_bytes, "cost": num_pages + num_bytes / BYTES_PER_PAGE_COST}
+
+
+# converter of a conversion worker process, created once by _init_worker()
+_worker_converter = None
+
+
+def _init_worker(converter_factory: Callable[[], "DocumentConverter"] | None) -> None:
+    global _worker_converter
+    _worker_converter = converter_factory() if converter_factory is not None else None
+
+
+def _convert_in_worker(file: Path, output_dir: Path, options: dict) -> Tuple[Path, int]:
+    json_output_path = convert_document(file, output_dir, _worker_converter, **options)
+    return json_output_path, current_rss_bytes()
+
+
+def _start_worker(converter_factory: Callable[[], "DocumentConverter"] | None) -> dict:
+    executor = ProcessPoolExecutor(max_workers=1,
+                                   mp_context=get_context("spawn"),
+                                   initializer=_init_worker,
+                                   initargs=(converter_factory,))
+    return {"executor": executor, "documents": 0}
+
+
+def schedule_conversions(
+    source_files: List[Path],
+    output_dir: Path,
+    converter_factory: Callable[[], "DocumentConverter"] = create_document_converter,
+    workers: int | None = None,
+    compact: bool = False,
+    checkpoint: bool = False,
+    max_pages_in_flight: int | None = MAX_PAGES_IN_FLIGHT,
+    max_documents_per_worker: int | None = MAX_DOCUMENTS_PER_WORKER,
+    max_worker_rss: int | None = MAX_WORKER_RSS,
+    reconvert_below: float | None = None,
+    fallback_pipeline: str = "ocr",
+    route_pages: bool = False,
+    compare_ocr: bool = False,
+    page_workers: int = 1,
+    pages_per_job: int = PAGES_PER_JOB,
+) -> List[Path]:
+    """
+    Converts source documents to Docling JSON in worker processes, the most expensive first
+    Args:
+        source_files (List[Path]):      Source documents to convert
+        output_dir (Path):              Directory the Docling JSON files are written to
+        converter_factory (Callable):   Picklable function creating the converter of each worker process.
+                                        Defaults to the standard pipeline
+        workers (int):                  Worker processes. Defaults to one per document, up to the CPU count
+        compact (bool):                 Write zstd-compressed .json.zst files instead
+        checkpoint (bool):              Checkpoint long PDFs per page range, see convert_document()
+        max_pages_in_flight (int):      Pages of the documents converted at once at most. None for no limit
+        max_documents_per_worker (int): Documents a worker process converts before it is replaced. None to keep it
+        max_worker_rss (int):           RSS in bytes above which a worker process is replaced after a document.
+                                        None to keep it
+        reconvert_below (float):        Reconvert the pages with a confidence score below this with
+                                        fallback_pipeline, see convert_document()
+        fallback_pipeline (str):        Pipeline low-confidence pages are reconverted with, "ocr" or "vlm"
+        route_pages (bool):             Convert every page with the cheapest adequate pipeline, see convert_document()
+        compare_ocr (bool):             With route_pages, also time a forced OCR conversion, see convert_document()
+        page_workers (int):             Processes a worker converts the page ranges of a long PDF in, each with a
+                                        converter of converter_factory, see convert_document()
+        pages_per_job (int):            Pages converted by one page range job
+    Returns:
+        json_files (List[pathlib.Path]): Paths to the Docling JSON files, in the order of source_files
+    Raises:
+        ScheduledConversionError: When documents failed to convert. The other documents are converted first
+    """
+    with trace("schedule_conversions", recycled_workers=0, failed_documents=0) as span:
+        options = {"compact": compact, "checkpoint": checkpoint,
+                   "reconvert_below": reconvert_below, "fallback_pipeline": fallback_pipeline,
+                   "route_pages": route_pages, "compare_ocr": compare_ocr,
+                   "page_workers": page_workers, "pages_per_job": pages_per_job}
+        # routed conversions create the converter of every pipeline they use, the default one would only load models
+        if route_pages:
+            converter_factory = None
+        # the page workers of a worker create the same converter as the worker itself
+        options["converter_factory"] = converter_factory
+        # longest processing time first: the big documents start right away and the small ones fill the gaps
+        queue = sorted((estimate_cost(file) for file in source_files), key=lambda job: job["cost"], reverse=True)
+        workers = workers or min(len(queue), os.cpu_count() or 1)
+        idle = [_start_worker(converter_factory) for _ in range(min(workers, len(queue)))]
+        running: Dict = {}
+        json_files: Dict[Path, Path] = {}
+        failures: Dict[Path, BaseException] = {}
+        pages_in_flight = 0
+
+        def next_job() -> dict | None:
+            # the most expensive job that fits the page budget; anything fits when nothing else runs
+            for i, job in enumerate(queue):
+                if not running or max_pages_in_flight is None or pages_in_flight + job["pages"] <= max_pages_in_flight:
+                    return queue.pop(i)
+            return None
+
+        try:
+            while queue or running:
+                while idle and queue and (job := next_job()) is not None:
+                    worker = idle.pop()
+                    future = worker["executor"].submit(_convert_in_worker, job["file"], output_dir, options)
+                    running[future] = (worker, job)
+                    pages_in_flight += job["pages"]
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    worker, job = running.pop(future)
+                    pages_in_flight -= job["pages"]
+                    try:
+                        json_files[job["file"]], rss = future.result()
+                        span["items"] += 1
+                    except Exception as e:
+                        # the worker may have died with the document, so it is replaced either way
+                        failures[job["file"]] = e
+                        span["attributes"]["failed_documents"] += 1
+                        rss = None
+
+                    worker["documents"] += 1
+                    if (rss is None
+                            or (max_documents_per_worker is not None and worker["documents"] >= max_documents_per_worker)
+                            or (max_worker_rss is not None and rss > max_worker_rss)):
+                        worker["executor"].shutdown()
+                        worker = _start_worker(converter_factory) if queue else None
+                        span["attributes"]["recycled_workers"] += 1
+                    if worker is not None:
+                        idle.append(worker)
+        finally:
+            for worker in [*idle, *(worker for worker, _ in running.values())]:
+                worker["executor"].shutdown(cancel_futures=True)
+
+    if failures:
+        raise ScheduledConversionError(failures, json_files)
+    return [json_files[file] for file in source_files]
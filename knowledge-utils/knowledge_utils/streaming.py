@@ -0,0 +1,181 @@
+"""
+Overlapped conversion and chunking.
+
+    convert ──▶ bounded queue ──▶ chunk ──▶ chunks.jsonl
+       └──▶ Docling JSON, written behind (optional)
+
+stream_chunks() chunks documents in a background thread while the caller's iterable
+produces the next one, so chunking document N overlaps converting document N+1. The
+queue holds at most queue_size documents, which bounds memory when chunking falls
+behind. convert_and_chunk() feeds it straight from the converter: chunking never
+reads Docling JSON back, and the JSON is only written, by another background thread,
+when a conversion directory is given.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from queue import Full, Queue
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List
+
+from .chunk_store import CHUNKS_JSONL, write_chunks
+from .chunking import chunk_docling_document, create_chunker
+from .conversion import PAGES_PER_JOB, checkpoint_path, convert_source, create_document_converter, save_conversion
+from .document_io import CHUNKING_PARTS, load_docling_document
+from .instrumentation import trace
+
+# type hints only, docling is imported by create_document_converter() and create_chunker()
+if TYPE_CHECKING:
+    from docling.chunking import HybridChunker
+    from docling.document_converter import DocumentConverter
+    from docling_core.types.doc import DoclingDocument
+
+QUEUE_SIZE = 2
+# seconds between checks that the chunking thread is still alive while the queue is full
+PUT_TIMEOUT = 0.1
+
+_DONE = object()
+
+
+def stream_chunks(
+    documents: Iterable["DoclingDocument"],
+    output_dir: Path,
+    chunker: "HybridChunker | None" = None,
+    parquet: bool = False,
+    max_shard_bytes: int | None = None,
+    queue_size: int = QUEUE_SIZE,
+) -> Path:
+    """
+    Chunks documents into a single chunks.jsonl in a background thread while they are produced
+    Args:
+        documents (Iterable[DoclingDocument]):  Documents in the order their chunks are written, e.g. a generator
+                                                converting them one by one
+        output_dir (Path):                      Directory chunks.jsonl is written to
+        chunker (HybridChunker):                Chunker to use. Defaults to a HybridChunker with default settings
+        parquet (bool):                         Also write chunks.parquet
+        max_shard_bytes (int):                  Write shards of at most this size and chunks.manifest.json instead
+        queue_size (int):                       Documents produced ahead of chunking at most
+    Returns:
+        chunks_file_path (pathlib.Path): Path to chunks.jsonl. When producing or chunking a document fails,
+            neither chunks.jsonl nor a shard manifest is written
+    """
+    if chunker is None:
+        chunker = create_chunker()
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    chunks_file_path = output_dir / CHUNKS_JSONL
+    queue = Queue(maxsize=queue_size)
+
+    def queued_documents() -> Iterator["DoclingDocument"]:
+        while (item := queue.get()) is not _DONE:
+            # an error of the producer aborts the chunk writer, so no partial chunks.jsonl is left behind
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def chunk_queued_documents() -> int:
+        def chunks():
+            for doc in queued_documents():
+                with trace("chunk_document", file=doc.name) as span:
+                    doc_chunks = chunk_docling_document(doc, chunker)
+                    span["items"] += len(doc_chunks)
+                yield from doc_chunks
+
+        return write_chunks(chunks(), chunks_file_path, parquet, max_shard_bytes)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunking") as executor:
+        chunking = executor.submit(chunk_queued_documents)
+
+        def put(item) -> None:
+            # a chunking thread that failed takes nothing anymore, its error is raised below
+            while not chunking.done():
+                try:
+                    queue.put(item, timeout=PUT_TIMEOUT)
+                    return
+                except Full:
+                    pass
+
+        try:
+            for doc in documents:
+                put(doc)
+                if chunking.done():
+                    break
+        except BaseException as e:
+            put(e)
+            raise
+        put(_DONE)
+        chunking.result()
+
+    return chunks_file_path
+
+
+def convert_and_chunk(
+    source_files: List[Path],
+    output_dir: Path,
+    doc_converter: "DocumentConverter | None" = None,
+    chunker: "HybridChunker | None" = None,
+    conversion_dir: Path | None = None,
+    compact: bool = False,
+    parquet: bool = False,
+    max_shard_bytes: int | None = None,
+    queue_size: int = QUEUE_SIZE,
+    converted: Dict[Path, Path] | None = None,
+    page_workers: int = 1,
+    pages_per_job: int = PAGES_PER_JOB,
+    checkpoint: bool = False,
+    converter_factory: Callable[[], "DocumentConverter"] | None = None,
+) -> Path:
+    """
+    Converts source documents and chunks each one while the next is converted
+    Args:
+        source_files (List[Path]):          Source documents, chunked in this order
+        output_dir (Path):                  Directory chunks.jsonl is written to
+        doc_converter (DocumentConverter):  Converter to use. Defaults to the standard pipeline
+        chunker (HybridChunker):            Chunker to use. Defaults to a HybridChunker with default settings
+        conversion_dir (Path):              Also write the Docling JSON of every document here, behind the
+                                            conversion. Not written by default
+        compact (bool):                     Write zstd-compressed .json.zst files instead
+        parquet (bool):                     Also write chunks.parquet
+        max_shard_bytes (int):              Write shards of at most this size and chunks.manifest.json instead
+        queue_size (int):                   Converted documents waiting for chunking, or to be written, at most
+        converted (Dict[Path, Path]):       Docling JSON of source files that are already converted. Those are
+                                            loaded instead of converted again, and not written
+        page_workers (int):                 Processes converting the page ranges of a PDF of more than
+                                            pages_per_job pages. 1, the default, converts it in this process
+        pages_per_job (int):                Pages converted by one job
+        checkpoint (bool):                  Checkpoint the page ranges of a PDF of more than pages_per_job pages
+                                            in conversion_dir and resume from them after an interrupted run
+        converter_factory (Callable):       Picklable function creating doc_converter in the page_workers processes,
+                                            see convert_source()
+    Returns:
+        chunks_file_path (pathlib.Path): Path to chunks.jsonl
+    """
+    converted = converted or {}
+    if doc_converter is None and any(file not in converted for file in source_files):
+        doc_converter = create_document_converter()
+        converter_factory = converter_factory or create_document_converter
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversion-writer") as writer:
+        writes = []
+
+        def converted_documents() -> Iterator["DoclingDocument"]:
+            for file in source_files:
+                if file in converted:
+                    yield load_docling_document(converted[file], CHUNKING_PARTS)
+                    continue
+                with trace("convert_document", file=str(file)) as span:
+                    checkpoint_dir = (checkpoint_path(file, conversion_dir)
+                                      if checkpoint and conversion_dir is not None else None)
+                    doc = convert_source(file, doc_converter, page_workers, pages_per_job, checkpoint_dir,
+                                         converter_factory)
+                    span["items"] += len(doc.pages)
+                if conversion_dir is not None:
+                    # documents waiting to be written are held in memory too
+                    while sum(not write.done() for write in writes) >= queue_size:
+                        wait(writes, return_when=FIRST_COMPLETED)
+                    writes.append(writer.submit(save_conversion, doc, file, conversion_dir, compact))
+                yield doc
+
+        chunks_file_path = stream_chunks(converted_documents(), output_dir, chunker, parquet, max_shard_bytes, queue_size)
+        for write in writes:
+            write.result()
+
+    return chunks_file_path
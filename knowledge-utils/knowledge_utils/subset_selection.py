@@ -0,0 +1,279 @@
+"""
+CPU subset selection of chunks.
+
+Chunks are embedded with a small sentence embedding model and a subset that covers
+them is picked by maximizing the facility-location function
+
+    F(S) = sum over all chunks i of max over selected chunks j of sim(i, j)
+
+with stochastic greedy steps. The chunks are split into random folds of at most
+FOLD_SIZE chunks, so the similarity matrix of a fold fits in memory and the whole
+selection scales linearly with the number of chunks. Large budgets are shared out
+between the folds; for small ones every fold proposes a full budget and a last greedy
+pass picks among the proposals.
+
+Embeddings are cached per model under EMBEDDING_CACHE_DIR, so selecting again, with
+another budget or after adding chunks, only embeds the new chunks. The cache is sharded
+by text hash and keeps at most NUM_SHARDS * MAX_SHARD_EMBEDDINGS embeddings per model.
+"""
+import hashlib
+import math
+import os
+import tempfile
+
+from pathlib import Path
+from typing import TYPE_CHECKING, List
+
+from .chunk_store import read_chunk_columns
+from .instrumentation import instrumented
+
+# numpy, torch and transformers are imported inside the functions that use them
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_MODEL = "BAAI/bge-small-en-v1.5"
+BATCH_SIZE = 32
+MAX_LENGTH = 512
+FOLD_SIZE = 4096
+EPSILON = 0.01
+EMBEDDING_CACHE_DIR = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "knowledge-utils" / "embeddings"
+KEY_SIZE = 16
+# a model's cache is split by the first byte of the text keys, so a run only rewrites the shards it added to
+NUM_SHARDS = 64
+# oldest embeddings beyond this many per shard are evicted, which bounds a model's cache at NUM_SHARDS times it
+MAX_SHARD_EMBEDDINGS = 4096
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=KEY_SIZE).digest()
+
+
+class EmbeddingCache:
+    """
+    Embeddings of one model keyed by a hash of the embedded text, stored in NUM_SHARDS
+    shards <cache_dir>/<model>/<shard>.npz. Shards are loaded when a key in them is looked
+    up, and save() only rewrites the shards embeddings were added to, keeping the
+    max_shard_embeddings most recently added. Without a cache_dir it only lives in memory.
+    """
+    def __init__(self, model_name: str, cache_dir: Path | None = EMBEDDING_CACHE_DIR,
+                 max_shard_embeddings: int = MAX_SHARD_EMBEDDINGS):
+        self.dir = Path(cache_dir) / model_name.replace("/", "--") if cache_dir is not None else None
+        self.max_shard_embeddings = max_shard_embeddings
+        # shard -> {key: embedding}, in the order the embeddings were added
+        self._shards = {}
+        self._modified = set()
+
+    def _shard_path(self, shard: int) -> Path:
+        return self.dir / f"{shard:02x}.npz"
+
+    def _shard(self, shard: int) -> dict:
+        import numpy as np
+
+        if shard not in self._shards:
+            self._shards[shard] = {}
+            if self.dir is not None and self._shard_path(shard).exists():
+                with np.load(self._shard_path(shard)) as data:
+                    # stored as raw bytes, numpy's fixed-size byte strings would drop trailing zero bytes
+                    raw = data["keys"].tobytes()
+                    embeddings = data["embeddings"]
+                self._shards[shard] = {raw[i * KEY_SIZE:(i + 1) * KEY_SIZE]: embedding
+                                       for i, embedding in enumerate(embeddings)}
+        return self._shards[shard]
+
+    def lookup(self, keys: List[bytes]) -> List["np.ndarray | None"]:
+        return [self._shard(key[0] % NUM_SHARDS).get(key) for key in keys]
+
+    def add(self, keys: List[bytes], embeddings: "np.ndarray") -> None:
+        for key, embedding in zip(keys, embeddings):
+            shard = key[0] % NUM_SHARDS
+            self._shard(shard)[key] = embedding
+            self._modified.add(shard)
+
+    def save(self) -> None:
+        import numpy as np
+
+        if self.dir is None:
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        for shard in sorted(self._modified):
+            # only evicted on disk, the embeddings of this run stay available until it ends
+            entries = list(self._shards[shard].items())[-self.max_shard_embeddings:]
+            path = self._shard_path(shard)
+            fd, tmp_path = tempfile.mkstemp(dir=self.dir, prefix=f".{path.name}-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    keys = np.frombuffer(b"".join(key for key, _ in entries), dtype=np.uint8).reshape(-1, KEY_SIZE)
+                    np.savez(f, keys=keys, embeddings=np.stack([embedding for _, embedding in entries]))
+                os.replace(tmp_path, path)
+            except BaseException:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+        self._modified.clear()
+
+
+@instrumented("embed_texts", count=len)
+def embed_texts(
+    texts: List[str],
+    model_name: str = DEFAULT_MODEL,
+    batch_size: int = BATCH_SIZE,
+    cache_dir: Path | None = EMBEDDING_CACHE_DIR,
+) -> "np.ndarray":
+    """
+    Embeds texts on the CPU, reusing cached embeddings
+    Args:
+        texts (List[str]):      Texts to embed
+        model_name (str):       Hugging Face model producing the embeddings from its [CLS] token, like the BGE models
+        batch_size (int):       Number of texts per forward pass
+        cache_dir (Path):       Directory of the embedding cache. None disables it
+    Returns:
+        embeddings (np.ndarray): One L2-normalized float32 row per text
+    """
+    import numpy as np
+
+    keys = [_text_key(text) for text in texts]
+    cache = EmbeddingCache(model_name, cache_dir)
+
+    # every distinct text that is not cached yet is embedded once
+    missing = {}
+    for text, key, embedding in zip(texts, keys, cache.lookup(keys)):
+        if embedding is None:
+            missing.setdefault(key, text)
+
+    if missing:
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModel.from_pretrained(model_name).eval()
+
+        missing_keys = list(missing)
+        # batches of similar lengths waste little compute on padding
+        order = sorted(range(len(missing_keys)), key=lambda i: len(missing[missing_keys[i]]))
+        new_embeddings = np.empty((len(missing_keys), model.config.hidden_size), dtype=np.float32)
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                inputs = tokenizer([missing[missing_keys[i]] for i in batch], padding=True, truncation=True,
+                                   max_length=MAX_LENGTH, return_tensors="pt")
+                cls = model(**inputs).last_hidden_state[:, 0]
+                new_embeddings[batch] = torch.nn.functional.normalize(cls, dim=-1).numpy()
+
+        cache.add(missing_keys, new_embeddings)
+        cache.save()
+
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack(cache.lookup(keys))
+
+
+def facility_location_greedy(embeddings: "np.ndarray", budget: int, epsilon: float = EPSILON, seed: int | None = None) -> List[int]:
+    """
+    Picks rows maximizing the facility-location function over cosine similarities with stochastic greedy steps
+    Args:
+        embeddings (np.ndarray):    L2-normalized embeddings, one row per item
+        budget (int):               Number of rows to pick
+        epsilon (float):            Every step evaluates a random sample of (n / budget) * log(1 / epsilon) candidates.
+                                    Smaller is closer to the plain greedy result and slower
+        seed (int):                 Random seed of the candidate samples
+    Returns:
+        indices (List[int]): Picked rows in the order they were picked
+    """
+    import numpy as np
+
+    n = len(embeddings)
+    budget = min(budget, n)
+    if budget <= 0:
+        return []
+
+    rng = np.random.default_rng(seed)
+    # negative cosine similarities add nothing to the coverage of an item
+    similarity = np.maximum(embeddings @ embeddings.T, 0)
+    coverage = np.zeros(n, dtype=similarity.dtype)
+    available = np.ones(n, dtype=bool)
+    sample_size = min(n, max(1, math.ceil(n / budget * math.log(1 / epsilon))))
+
+    selected = []
+    for _ in range(budget):
+        candidates = np.flatnonzero(available)
+        if len(candidates) > sample_size:
+            candidates = rng.choice(candidates, sample_size, replace=False)
+        # the matrix is symmetric, and gathering rows is much faster than gathering columns
+        rows = similarity[candidates]
+        rows -= coverage
+        gains = np.maximum(rows, 0, out=rows).sum(axis=1)
+        best = int(candidates[np.argmax(gains)])
+        selected.append(best)
+        available[best] = False
+        coverage = np.maximum(coverage, similarity[:, best])
+    return selected
+
+
+def select_subset(
+    embeddings: "np.ndarray", budget: int, fold_size: int = FOLD_SIZE, epsilon: float = EPSILON, seed: int | None = None
+) -> List[int]:
+    """
+    Picks a subset covering the embedded items, running facility_location_greedy() on random folds
+    Args:
+        embeddings (np.ndarray):    L2-normalized embeddings, one row per item
+        budget (int):               Number of items to pick
+        fold_size (int):            Maximum number of items per fold; a fold's similarity matrix takes fold_size² floats
+        epsilon (float):            See facility_location_greedy()
+        seed (int):                 Random seed of the folds and the candidate samples
+    Returns:
+        indices (List[int]): Sorted positions of the picked items
+    """
+    import numpy as np
+
+    n = len(embeddings)
+    budget = min(budget, n)
+    rng = np.random.default_rng(seed)
+    folds = np.array_split(rng.permutation(n), max(1, math.ceil(n / fold_size)))
+    if len(folds) == 1:
+        return sorted(facility_location_greedy(embeddings, budget, epsilon, seed))
+
+    if budget * len(folds) <= fold_size:
+        # a share of a small budget would leave most folds without a pick, so every fold proposes
+        # a full budget and the proposals, which fit in one fold, are merged
+        proposals = np.concatenate([
+            fold[facility_location_greedy(embeddings[fold], budget, epsilon, int(rng.integers(2**32)))] for fold in folds
+        ])
+        picked = facility_location_greedy(embeddings[proposals], budget, epsilon, int(rng.integers(2**32)))
+        return sorted(int(proposals[i]) for i in picked)
+
+    # every fold gets its share of the budget, the remainder goes to the folds with the largest fractions
+    shares = [budget * len(fold) / n for fold in folds]
+    budgets = [math.floor(share) for share in shares]
+    for i in sorted(range(len(folds)), key=lambda i: shares[i] - budgets[i], reverse=True)[:budget - sum(budgets)]:
+        budgets[i] += 1
+
+    selected = []
+    for fold, fold_budget in zip(folds, budgets):
+        picked = facility_location_greedy(embeddings[fold], fold_budget, epsilon, int(rng.integers(2**32)))
+        selected.extend(int(fold[i]) for i in picked)
+    return sorted(selected)
+
+
+@instrumented("select_chunks", count=len)
+def select_chunks(
+    chunks_jsonl_path: Path,
+    budget: int,
+    model_name: str = DEFAULT_MODEL,
+    batch_size: int = BATCH_SIZE,
+    cache_dir: Path | None = EMBEDDING_CACHE_DIR,
+    seed: int | None = None,
+) -> List[int]:
+    """
+    Selects a subset of the chunks of a contribution that covers its content
+    Args:
+        chunks_jsonl_path (Path):   Path to chunks.jsonl. Shards or chunks.parquet next to it are used when present
+        budget (int):               Number of chunks to select
+        model_name (str):           Embedding model, see embed_texts()
+        batch_size (int):           Number of chunks per forward pass of the embedding model
+        cache_dir (Path):           Directory of the embedding cache. None disables it
+        seed (int):                 Random seed of the selection
+    Returns:
+        indices (List[int]): Sorted positions of the selected chunks, for chunk_store.read_chunk_records()
+    """
+    texts = read_chunk_columns(chunks_jsonl_path, ["chunk"])["chunk"]
+    embeddings = embed_texts(texts, model_name, batch_size, cache_dir)
+    return select_subset(embeddings, budget, seed=seed)
@@ -0,0 +1,103 @@
+"""
+Calibrated token count estimates.
+
+Seed dataset creation only compares token counts with bounds, 100 and 1024 tokens.
+The number of tokens of a text lies in a narrow range per word and per UTF-8 byte
+for a given tokenizer, so a TokenCountEstimator learns the smallest and largest
+number of tokens per word and per byte from texts counted with the tokenizer. Their
+intersection, widened by MARGIN, bounds the count of any other text:
+
+    max(words * low_per_word, bytes * low_per_byte) <= tokens
+    tokens <= min(words * high_per_word, bytes * high_per_byte)
+
+A text whose whole range falls between two bounds needs no tokenizer call; only the
+texts in the uncertainty band around a bound are tokenized, and every exact count
+widens the ranges when it falls outside them.
+
+The ratios are fitted on the texts seen so far, so a text unlike all of them, e.g. a
+table of numbers after pages of prose, can fall outside the fitted range. Two safety
+margins keep such a text from being kept or dropped on a wrong estimate: MARGIN widens
+the range of every estimate, and a text is only placed without tokenizing it when its
+whole widened range is also more than THRESHOLD_MARGIN away from every bound. With the
+defaults, a 100-token bound tokenizes every text whose range reaches from 80 to 120
+tokens, and the estimated range must be off by more than a third before a text is
+misplaced.
+"""
+from typing import Tuple
+
+# texts counted exactly before estimates are trusted
+CALIBRATION_SIZE = 16
+# relative widening of the fitted range of every estimate
+MARGIN = 0.1
+# share of a bound around it in which texts are always tokenized
+THRESHOLD_MARGIN = 0.2
+
+
+def text_features(text: str) -> Tuple[int, int]:
+    """
+    Returns the number of UTF-8 bytes and whitespace separated words of a text
+    """
+    return len(text.encode("utf-8")), len(text.split())
+
+
+class TokenCountEstimator:
+    """
+    Bounds on the token count of texts for one tokenizer, calibrated on exact counts.
+    """
+    def __init__(self, calibration_size: int = CALIBRATION_SIZE, margin: float = MARGIN,
+                 threshold_margin: float = THRESHOLD_MARGIN):
+        self.calibration_size = calibration_size
+        self.margin = margin
+        self.threshold_margin = threshold_margin
+        self.samples = 0
+        self.per_word = [float("inf"), 0.0]
+        self.per_byte = [float("inf"), 0.0]
+
+    @property
+    def calibrated(self) -> bool:
+        # texts without words say nothing about the ratios
+        return self.samples >= self.calibration_size and self.per_word[1] > 0
+
+    def add(self, text: str, num_tokens: int) -> None:
+        """
+        Calibrates the estimator with the exact token count of a text
+        """
+        num_bytes, num_words = text_features(text)
+        for ratios, size in ((self.per_word, num_words), (self.per_byte, num_bytes)):
+            if size:
+                ratios[0] = min(ratios[0], num_tokens / size)
+                ratios[1] = max(ratios[1], num_tokens / size)
+        self.samples += 1
+
+    def bounds(self, text: str) -> Tuple[float, float]:
+        """
+        Returns the lowest and highest token count the text can have
+        Args:
+            text (str): Text to estimate
+        Returns:
+            bounds (Tuple[float, float]): (0, inf) until the estimator is calibrated
+        """
+        if not self.calibrated:
+            return 0.0, float("inf")
+        num_bytes, num_words = text_features(text)
+        low = max(num_words * self.per_word[0], num_bytes * self.per_byte[0]) * (1 - self.margin)
+        high = min(num_words * self.per_word[1], num_bytes * self.per_byte[1]) * (1 + self.margin)
+        return low, high
+
+    def classify(self, text: str, thresholds: Tuple[int, ...]) -> int | None:
+        """
+        Places a text between thresholds without tokenizing it
+        Args:
+            text (str):                 Text to place
+            thresholds (Tuple[int]):    Sorted token count thresholds
+        Returns:
+            band (int): Number of thresholds the token count is certainly above, with the count at most the next one.
+                None when the count may be on either side of a threshold, or within threshold_margin of one
+        """
+        low, high = self.bounds(text)
+        below = [threshold * (1 - self.threshold_margin) for threshold in thresholds]
+        above = [threshold * (1 + self.threshold_margin) for threshold in thresholds]
+        for band in range(len(thresholds)):
+            if high <= below[band]:
+                return band if band == 0 or low > above[band - 1] else None
+        return len(thresholds) if low > above[-1] else None
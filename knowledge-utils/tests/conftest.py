@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pytest
+
+
+def page_document(page_nos, name="manual"):
+    """A document with one paragraph per page, like the conversion of a page range"""
+    from docling_core.types.doc import BoundingBox, DocItemLabel, DoclingDocument, ProvenanceItem, Size
+
+    doc = DoclingDocument(name=name)
+    for page_no in page_nos:
+        doc.add_page(page_no=page_no, size=Size(width=612, height=792))
+        doc.add_text(label=DocItemLabel.TEXT,
+                     text=f"page {page_no}",
+                     prov=ProvenanceItem(page_no=page_no, bbox=BoundingBox(l=0, t=10, r=100, b=0), charspan=(0, 6)))
+    return doc
+
+
+def text_pages(doc):
+    return [(item.text, item.prov[0].page_no) for item in doc.texts]
+
+
+def write_pdf(path: Path, num_pages: int) -> Path:
+    """A PDF of blank pages"""
+    pypdfium2 = pytest.importorskip("pypdfium2")
+
+    pdf = pypdfium2.PdfDocument.new()
+    for _ in range(num_pages):
+        pdf.new_page(612, 792)
+    pdf.save(str(path))
+    pdf.close()
+    return path
@@ -0,0 +1,140 @@
+import json
+import os
+
+import pytest
+
+import knowledge_utils.chunk_store as chunk_store
+from knowledge_utils.chunk_store import (
+    ChunkWriter,
+    count_chunks,
+    iter_chunk_records,
+    parquet_path,
+    read_chunk_columns,
+    read_chunk_records,
+    read_shard_manifest,
+    write_chunks,
+)
+
+
+def chunk(i: int, **metadata) -> dict:
+    return {"chunk": f"chunk {i}", "file": "manual", "metadata": metadata}
+
+
+def test_write_chunks_parquet_merges_the_columns_of_every_row_group(tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    monkeypatch.setattr(chunk_store, "ROW_GROUP_SIZE", 2)
+    chunks = [
+        chunk(0, doc_items=[]),
+        chunk(1, doc_items=[]),
+        # a column that only appears later, a list of objects and a hash that does not fit int64
+        chunk(2, doc_items=[{"ref": "#/texts/0"}], headings=["Intro"]),
+        chunk(3, doc_items=[], hash=2 ** 64 - 1),
+        chunk(4, hash=7),
+    ]
+    chunks_jsonl = tmp_path / "chunks.jsonl"
+
+    write_chunks(iter(chunks), chunks_jsonl, parquet=True)
+
+    assert pq.ParquetFile(parquet_path(chunks_jsonl)).num_row_groups == 3
+    assert chunk_store._chunk_source(chunks_jsonl) == "parquet"
+    # fields a record did not have are left out again
+    assert list(iter_chunk_records(chunks_jsonl)) == chunks
+    assert read_chunk_records(chunks_jsonl, [3, 2]) == [chunks[3], chunks[2]]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["chunks.jsonl", "chunks.parquet"]
+
+
+def test_write_chunks_leaves_no_parquet_parts_behind_when_it_fails(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(chunk_store, "ROW_GROUP_SIZE", 2)
+
+    def failing_chunks():
+        yield from (chunk(i) for i in range(3))
+        raise RuntimeError("chunking failed")
+
+    with pytest.raises(RuntimeError):
+        write_chunks(failing_chunks(), tmp_path / "chunks.jsonl", parquet=True)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_chunk_writer_rolls_over_to_a_new_shard_at_max_shard_bytes(tmp_path):
+    chunks_jsonl = tmp_path / "chunks.jsonl"
+    chunks = [chunk(i) for i in range(5)]
+    line_bytes = len((json.dumps(chunks[0]) + "\n").encode("utf-8"))
+
+    # two chunks fit in a shard, the third starts the next one
+    with ChunkWriter(chunks_jsonl, max_shard_bytes=2 * line_bytes + 1) as writer:
+        for record in chunks:
+            writer.write(record)
+
+    manifest = read_shard_manifest(chunks_jsonl)
+    assert manifest["count"] == 5
+    assert [(shard["file"], shard["start"], shard["count"]) for shard in manifest["shards"]] == [
+        ("chunks-00000.jsonl", 0, 2), ("chunks-00001.jsonl", 2, 2), ("chunks-00002.jsonl", 4, 1)
+    ]
+    assert all(shard["bytes"] <= 2 * line_bytes + 1 for shard in manifest["shards"])
+    assert not chunks_jsonl.exists()
+    assert list(iter_chunk_records(chunks_jsonl)) == chunks
+    assert count_chunks(chunks_jsonl) == 5
+
+
+def test_chunk_writer_puts_a_chunk_larger_than_max_shard_bytes_in_a_shard_of_its_own(tmp_path):
+    chunks_jsonl = tmp_path / "chunks.jsonl"
+    chunks = [chunk(0), {**chunk(1), "chunk": "x" * 1000}, chunk(2)]
+
+    write_chunks(iter(chunks), chunks_jsonl, max_shard_bytes=200)
+
+    assert [shard["count"] for shard in read_shard_manifest(chunks_jsonl)["shards"]] == [1, 1, 1]
+    assert list(iter_chunk_records(chunks_jsonl)) == chunks
+
+
+def test_read_chunk_records_seeks_to_the_recorded_offsets(tmp_path):
+    chunks_jsonl = tmp_path / "chunks.jsonl"
+    chunks = [chunk(i, headings=[f"heading {i}"]) for i in range(10)]
+    write_chunks(iter(chunks), chunks_jsonl, max_shard_bytes=300)
+
+    manifest = read_shard_manifest(chunks_jsonl)
+    for shard in manifest["shards"]:
+        with open(tmp_path / shard["file"], "rb") as f:
+            data = f.read()
+        assert shard["offsets"] == [0, *[i + 1 for i, byte in enumerate(data[:-1]) if byte == ord("\n")]]
+
+    # the shards that hold none of the requested chunks are not opened
+    first_shard = tmp_path / manifest["shards"][0]["file"]
+    first_shard.write_text("not json\n" * manifest["shards"][0]["count"])
+    assert read_chunk_records(chunks_jsonl, [9, manifest["shards"][1]["start"], 9]) == [
+        chunks[9], chunks[manifest["shards"][1]["start"]], chunks[9]
+    ]
+    with pytest.raises(IndexError):
+        read_chunk_records(chunks_jsonl, [10])
+
+
+def test_a_stale_chunks_parquet_is_ignored(tmp_path):
+    pytest.importorskip("pyarrow")
+    chunks_jsonl = tmp_path / "chunks.jsonl"
+    write_chunks(iter([chunk(0), chunk(1)]), chunks_jsonl, parquet=True)
+    assert chunk_store._chunk_source(chunks_jsonl) == "parquet"
+
+    # chunks.jsonl rewritten by something else after chunks.parquet
+    stale_mtime = parquet_path(chunks_jsonl).stat().st_mtime_ns
+    chunks_jsonl.write_text(json.dumps(chunk(2)) + "\n")
+    os.utime(chunks_jsonl, ns=(stale_mtime + 1, stale_mtime + 1))
+
+    assert chunk_store._chunk_source(chunks_jsonl) == "jsonl"
+    assert list(iter_chunk_records(chunks_jsonl)) == [chunk(2)]
+    assert read_chunk_columns(chunks_jsonl, ["chunk"]) == {"chunk": ["chunk 2"]}
+    assert count_chunks(chunks_jsonl) == 1
+
+
+def test_write_chunks_without_parquet_removes_an_earlier_chunks_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    chunks_jsonl = tmp_path / "chunks.jsonl"
+    write_chunks(iter([chunk(0)]), chunks_jsonl, parquet=True)
+
+    write_chunks(iter([chunk(1)]), chunks_jsonl, max_shard_bytes=1024)
+
+    assert not parquet_path(chunks_jsonl).exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["chunks-00000.jsonl", "chunks.manifest.json"]
+    assert chunk_store._chunk_source(chunks_jsonl) == "shards"
+    assert list(iter_chunk_records(chunks_jsonl)) == [chunk(1)]
@@ -0,0 +1,104 @@
+import pytest
+
+pytest.importorskip("docling_core")
+
+from conftest import page_document, text_pages, write_pdf
+from knowledge_utils.conversion import (
+    convert_pdf_pages,
+    convert_source,
+    merge_page_documents,
+    page_ranges,
+    page_worker_pool,
+    renumber_pages,
+)
+
+
+class RangeConverter:
+    """Converts a page range to page_document() of its pages and records the ranges it was given"""
+    def __init__(self):
+        self.page_ranges = []
+
+    def convert(self, source, page_range):
+        self.page_ranges.append(page_range)
+        doc = page_document(range(page_range[0], page_range[1] + 1))
+        return type("ConversionResult", (), {"document": doc})()
+
+
+class OcrRangeConverter(RangeConverter):
+    """A converter with another pipeline"""
+
+
+def range_converter_factory():
+    return RangeConverter()
+
+
+def test_page_ranges():
+    assert page_ranges(1, 120, 50) == [(1, 50), (51, 100), (101, 120)]
+    assert page_ranges(5, 12, 50) == [(5, 12)]
+    assert page_ranges(1, 100, 50) == [(1, 50), (51, 100)]
+
+
+def test_renumber_pages():
+    doc = renumber_pages(page_document([1, 2]), {1: 7, 2: 8})
+
+    assert sorted(doc.pages) == [7, 8]
+    assert [doc.pages[page_no].page_no for page_no in sorted(doc.pages)] == [7, 8]
+    assert text_pages(doc) == [("page 1", 7), ("page 2", 8)]
+
+
+def test_merge_page_documents_keeps_source_page_numbers():
+    doc = merge_page_documents([page_document([1, 2]), page_document([3, 4])])
+
+    assert sorted(doc.pages) == [1, 2, 3, 4]
+    assert text_pages(doc) == [("page 1", 1), ("page 2", 2), ("page 3", 3), ("page 4", 4)]
+    assert doc.name == "manual"
+
+
+def test_merge_page_documents_with_missing_pages():
+    # page 3 failed to convert and the first part starts after page 1
+    doc = merge_page_documents([page_document([2]), page_document([4, 5])])
+
+    assert sorted(doc.pages) == [2, 4, 5]
+    assert text_pages(doc) == [("page 2", 2), ("page 4", 4), ("page 5", 5)]
+
+
+def test_convert_pdf_pages_resumes_from_checkpoints(tmp_path):
+    pdf = write_pdf(tmp_path / "manual.pdf", 5)
+    checkpoint_dir = tmp_path / ".manual.checkpoint"
+
+    converter = RangeConverter()
+    first = convert_pdf_pages(pdf, workers=1, pages_per_job=2, checkpoint_dir=checkpoint_dir, doc_converter=converter)
+    assert converter.page_ranges == [(1, 2), (3, 4), (5, 5)]
+
+    # every page range is checkpointed, so nothing is converted again
+    converter = RangeConverter()
+    resumed = convert_pdf_pages(pdf, workers=2, pages_per_job=2, checkpoint_dir=checkpoint_dir, doc_converter=converter)
+    assert converter.page_ranges == []
+    assert text_pages(resumed) == text_pages(first)
+
+
+def test_convert_pdf_pages_discards_checkpoints_of_another_converter(tmp_path):
+    pdf = write_pdf(tmp_path / "manual.pdf", 5)
+    checkpoint_dir = tmp_path / ".manual.checkpoint"
+    convert_pdf_pages(pdf, workers=1, pages_per_job=2, checkpoint_dir=checkpoint_dir, doc_converter=RangeConverter())
+
+    converter = OcrRangeConverter()
+    convert_pdf_pages(pdf, workers=1, pages_per_job=2, checkpoint_dir=checkpoint_dir, doc_converter=converter)
+    assert converter.page_ranges == [(1, 2), (3, 4), (5, 5)]
+
+
+def test_convert_source_needs_factory_of_custom_converter_for_page_workers(tmp_path):
+    pdf = write_pdf(tmp_path / "manual.pdf", 5)
+
+    with pytest.raises(ValueError):
+        convert_source(pdf, RangeConverter(), page_workers=2, pages_per_job=2)
+
+
+def test_convert_pdf_pages_reuses_a_page_worker_pool(tmp_path):
+    pdfs = [write_pdf(tmp_path / "manual.pdf", 5), write_pdf(tmp_path / "guide.pdf", 3)]
+
+    with page_worker_pool(range_converter_factory, 2) as pool:
+        docs = [convert_pdf_pages(pdf, range_converter_factory, pages_per_job=2, executor=pool) for pdf in pdfs]
+
+    assert text_pages(docs[0]) == [(f"page {page_no}", page_no) for page_no in range(1, 6)]
+    assert text_pages(docs[1]) == [(f"page {page_no}", page_no) for page_no in range(1, 4)]
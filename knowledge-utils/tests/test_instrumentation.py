@@ -0,0 +1,38 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from knowledge_utils import instrumentation
+from knowledge_utils.instrumentation import configure, parse_prometheus, trace
+
+
+def traced_stage(prometheus_file: str, stage: str, items: int) -> None:
+    configure(prometheus_file=prometheus_file)
+    for _ in range(2):
+        with trace(stage) as span:
+            span["items"] += items
+
+
+def test_prometheus_file_keeps_the_metrics_of_every_process(tmp_path):
+    prometheus_file = str(tmp_path / "metrics.prom")
+
+    with ProcessPoolExecutor(max_workers=2, mp_context=get_context("spawn")) as executor:
+        futures = [executor.submit(traced_stage, prometheus_file, "convert", 3),
+                   executor.submit(traced_stage, prometheus_file, "convert", 4),
+                   executor.submit(traced_stage, prometheus_file, "chunk", 5)]
+        for future in futures:
+            future.result()
+
+    with open(prometheus_file) as f:
+        metrics = parse_prometheus(f.read())
+    assert metrics["convert"]["calls_total"] == 4
+    assert metrics["convert"]["items_total"] == 14
+    assert metrics["chunk"]["calls_total"] == 2
+    assert metrics["chunk"]["items_total"] == 10
+    assert metrics["convert"]["peak_rss_bytes"] > 0
+
+
+def test_parse_prometheus_reads_format_prometheus_back():
+    metrics = {"convert": {"calls_total": 2, "errors_total": 0, "wall_seconds_total": 1.5, "cpu_seconds_total": 1e-05,
+                           "items_total": 7, "peak_rss_bytes": 1024}}
+
+    assert parse_prometheus(instrumentation.format_prometheus(metrics)) == metrics
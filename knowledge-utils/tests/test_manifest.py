@@ -0,0 +1,113 @@
+import json
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+from knowledge_utils.manifest import MANIFEST_FILE, Manifest
+
+
+def write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def record_stages(workspace_dir: str, keys: list) -> None:
+    manifest = Manifest(Path(workspace_dir))
+    for key in keys:
+        output = write(Path(workspace_dir) / f"{key.replace('/', '-')}.out", key)
+        manifest.record(key, [], [output])
+
+
+def test_stage_is_up_to_date_until_an_input_output_or_parameter_changes(tmp_path):
+    source = write(tmp_path / "docs" / "manual.pdf", "v1")
+    output = write(tmp_path / "docs" / "manual.json", "{}")
+    manifest = Manifest(tmp_path)
+
+    assert not manifest.is_up_to_date("docs/conversion", [source], [output])
+    manifest.record("docs/conversion", [source], [output], {"compact": False})
+
+    assert manifest.is_up_to_date("docs/conversion", [source], [output], {"compact": False})
+    assert Manifest(tmp_path).is_up_to_date("docs/conversion", [source], [output], {"compact": False})
+    assert not manifest.is_up_to_date("docs/conversion", [source], [output], {"compact": True})
+    assert not manifest.is_up_to_date("docs/conversion", [source], [output])
+
+    write(source, "v2")
+    assert not manifest.is_up_to_date("docs/conversion", [source], [output], {"compact": False})
+    manifest.record("docs/conversion", [source], [output], {"compact": False})
+    assert manifest.is_up_to_date("docs/conversion", [source], [output], {"compact": False})
+
+    output.unlink()
+    assert not manifest.is_up_to_date("docs/conversion", [source], [output], {"compact": False})
+
+
+def test_stages_are_rebuilt_only_downstream_of_a_changed_input(tmp_path):
+    first = write(tmp_path / "docs" / "first.pdf", "first")
+    second = write(tmp_path / "docs" / "second.pdf", "second")
+    first_json = write(tmp_path / "docs" / "first.json", "{}")
+    second_json = write(tmp_path / "docs" / "second.json", "{}")
+    manifest = Manifest(tmp_path)
+    manifest.record("docs/conversion/first.pdf", [first], [first_json])
+    manifest.record("docs/conversion/second.pdf", [second], [second_json])
+
+    write(second, "second, edited")
+
+    assert manifest.is_up_to_date("docs/conversion/first.pdf", [first], [first_json])
+    assert not manifest.is_up_to_date("docs/conversion/second.pdf", [second], [second_json])
+
+
+def test_is_modified_detects_outputs_edited_after_the_stage_wrote_them(tmp_path):
+    selected = write(tmp_path / "docs" / "selected_chunks.jsonl", "{}\n")
+    qna = tmp_path / "docs" / "qna.yaml"
+    manifest = Manifest(tmp_path)
+
+    assert not manifest.is_modified("docs/generation", qna)
+    write(qna, "seed_examples: []\n")
+    assert manifest.is_modified("docs/generation", qna)
+
+    manifest.record("docs/generation", [selected], [qna])
+    assert not manifest.is_modified("docs/generation", qna)
+
+    write(qna, "seed_examples: [edited]\n")
+    assert manifest.is_modified("docs/generation", qna)
+
+
+def test_forget_removes_a_stage(tmp_path):
+    output = write(tmp_path / "docs" / "manual.json", "{}")
+    manifest = Manifest(tmp_path)
+    manifest.record("docs/conversion/manual.pdf", [], [output])
+    manifest.record("docs/chunking", [output], [])
+
+    entry = manifest.forget("docs/conversion/manual.pdf")
+
+    assert entry["outputs"] == ["docs/manual.json"]
+    assert manifest.stage_keys("docs/") == ["docs/chunking"]
+    assert Manifest(tmp_path).stage_keys("docs/") == ["docs/chunking"]
+
+
+def test_save_merges_the_stages_of_manifests_loaded_before_it(tmp_path):
+    first = Manifest(tmp_path)
+    second = Manifest(tmp_path)
+    record_stages(str(tmp_path), ["docs/selection"])
+
+    first.record("nfl/chunking", [], [])
+    second.record("docs/chunking", [], [])
+    second.forget("docs/selection")
+
+    stages = json.loads((tmp_path / MANIFEST_FILE).read_text())["stages"]
+    assert sorted(stages) == ["docs/chunking", "nfl/chunking"]
+    assert sorted(second.data["stages"]) == ["docs/chunking", "nfl/chunking"]
+
+
+def test_processes_sharing_a_manifest_keep_each_others_stages(tmp_path):
+    keys = {name: [f"{name}/conversion/{i}.pdf" for i in range(10)] for name in ["docs", "nfl", "manual"]}
+
+    with ProcessPoolExecutor(max_workers=3, mp_context=get_context("spawn")) as executor:
+        futures = [executor.submit(record_stages, str(tmp_path), stage_keys) for stage_keys in keys.values()]
+        for future in futures:
+            future.result()
+
+    manifest = Manifest(tmp_path)
+    assert sorted(manifest.data["stages"]) == sorted(key for stage_keys in keys.values() for key in stage_keys)
+    assert len(manifest.data["files"]) == 30
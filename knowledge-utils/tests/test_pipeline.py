@@ -0,0 +1,150 @@
+import hashlib
+import json
+
+import pytest
+
+from conftest import write_pdf
+from knowledge_utils import chunking, create_seed_dataset, pipeline, qna_gen
+from knowledge_utils.pipeline import STAGES, run_contribution
+
+
+class FakeSeedData:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def to_json(self, path, orient, lines):
+        with open(path, "w") as f:
+            for row in self.rows:
+                f.write(json.dumps(row) + "\n")
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    """Replaces conversion, chunking, generation and dataset creation with fakes that log what they ran on"""
+    calls = []
+
+    def convert_document(file, output_dir, *args, **kwargs):
+        calls.append(("conversion", file.name))
+        output_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256(file.read_bytes()).hexdigest()
+        (output_dir / f"{file.stem}.json").write_text(json.dumps({"name": file.stem, "sha256": digest}))
+
+    def chunk_documents(conversion_dir, output_dir, *args, **kwargs):
+        calls.append(("chunking", None))
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with open(output_dir / "chunks.jsonl", "w") as f:
+            for json_file in sorted(conversion_dir.glob("*.json")):
+                for i in range(3):
+                    f.write(json.dumps({"chunk": f"chunk {i} of {json_file.read_text()}", "file": json_file.stem}) + "\n")
+
+    def generate_seed_examples(name, selected_chunks_jsonl, output_dir, *args, **kwargs):
+        calls.append(("generation", None))
+        (output_dir / "qna.yaml").write_text(f"seed_examples: {selected_chunks_jsonl.read_text().count(chr(10))}\n")
+
+    def get_seed_dataset(chunks_dir, authoring_dir, *args, **kwargs):
+        calls.append(("dataset", None))
+        return FakeSeedData([{"qna": (authoring_dir / "qna.yaml").read_text()}])
+
+    monkeypatch.setattr(pipeline, "convert_document", convert_document)
+    monkeypatch.setattr(pipeline, "create_document_converter", lambda: None)
+    monkeypatch.setattr(chunking, "chunk_documents", chunk_documents)
+    monkeypatch.setattr(qna_gen, "generate_seed_examples", generate_seed_examples)
+    monkeypatch.setattr(create_seed_dataset, "get_seed_dataset", get_seed_dataset)
+    return calls
+
+
+@pytest.fixture
+def contribution(tmp_path):
+    contribution_dir = tmp_path / "workspace" / "docs"
+    source_dir = contribution_dir / pipeline.SOURCE_DOCUMENT_DIR
+    source_dir.mkdir(parents=True)
+    write_pdf(source_dir / "first.pdf", 1)
+    write_pdf(source_dir / "second.pdf", 2)
+    return {"name": "docs", "dir": contribution_dir, "domain": "manuals", "summary": "Two manuals"}
+
+
+def pipeline_options(**overrides):
+    options = {"stages": STAGES, "force": False, "dedup": False, "dedup_threshold": 0.8, "num_seed_examples": 2,
+               "icls_per_chunk": None, "model_name": "mock", "api_key": "none", "endpoint_url": "http://localhost"}
+    options.update(overrides)
+    return options
+
+
+def test_second_run_skips_every_stage(stages, contribution):
+    statuses = run_contribution(contribution, pipeline_options())
+
+    assert statuses == {"conversion": "ran", "chunking": "ran", "selection": "ran", "generation": "ran",
+                        "dataset": "ran"}
+    assert stages == [("conversion", "first.pdf"), ("conversion", "second.pdf"), ("chunking", None),
+                      ("generation", None), ("dataset", None)]
+    assert (contribution["dir"] / "seed_data-docs.jsonl").exists()
+
+    stages.clear()
+    statuses = run_contribution(contribution, pipeline_options())
+
+    assert set(statuses.values()) == {"skipped"}
+    assert stages == []
+
+
+def test_changed_pdf_is_reconverted_alone_and_rebuilds_the_later_stages(stages, contribution):
+    run_contribution(contribution, pipeline_options())
+    stages.clear()
+
+    write_pdf(contribution["dir"] / pipeline.SOURCE_DOCUMENT_DIR / "second.pdf", 3)
+    statuses = run_contribution(contribution, pipeline_options())
+
+    assert stages == [("conversion", "second.pdf"), ("chunking", None), ("generation", None), ("dataset", None)]
+    assert statuses["conversion"] == "ran"
+
+
+def test_removed_pdf_drops_its_conversion(stages, contribution):
+    run_contribution(contribution, pipeline_options())
+    conversion_dir = contribution["dir"] / pipeline.CONVERSION_DIR
+
+    (contribution["dir"] / pipeline.SOURCE_DOCUMENT_DIR / "second.pdf").unlink()
+    run_contribution(contribution, pipeline_options())
+
+    assert sorted(p.name for p in conversion_dir.iterdir()) == ["first.json"]
+    chunks = (contribution["dir"] / pipeline.CHUNKING_DIR / "chunks.jsonl").read_text()
+    assert "second" not in chunks
+
+
+def test_edited_qna_yaml_is_kept_and_the_dataset_rebuilt(stages, contribution):
+    run_contribution(contribution, pipeline_options())
+    qna_yaml = contribution["dir"] / pipeline.AUTHORING_DIR / "qna.yaml"
+    qna_yaml.write_text("seed_examples: edited\n")
+    stages.clear()
+
+    statuses = run_contribution(dict(contribution, summary="Two edited manuals"), pipeline_options())
+
+    assert statuses["generation"] == "skipped"
+    assert qna_yaml.read_text() == "seed_examples: edited\n"
+    assert stages == [("dataset", None)]
+    assert "edited" in (contribution["dir"] / "seed_data-docs.jsonl").read_text()
+
+    stages.clear()
+    run_contribution(dict(contribution, summary="Two edited manuals"), pipeline_options(force=True))
+    assert ("generation", None) in stages
+    assert qna_yaml.read_text() != "seed_examples: edited\n"
+
+
+def test_dataset_without_seed_data_is_skipped_and_not_recorded(stages, contribution, monkeypatch):
+    run_contribution(contribution, pipeline_options())
+    seed_data_jsonl = contribution["dir"] / "seed_data-docs.jsonl"
+    manifest = pipeline.Manifest(contribution["dir"].parent)
+    manifest.forget("docs/dataset")
+
+    # no chunk is within the token bounds of the seed dataset
+    monkeypatch.setattr(create_seed_dataset, "get_seed_dataset", lambda *args, **kwargs: None)
+    statuses = run_contribution(contribution, pipeline_options(stages=["dataset"]))
+
+    assert statuses == {"dataset": "skipped"}
+    assert not seed_data_jsonl.exists()
+    assert pipeline.Manifest(contribution["dir"].parent).stage_keys("docs/dataset") == []
+
+
+def test_only_the_requested_stages_run(stages, contribution):
+    statuses = run_contribution(contribution, pipeline_options(stages=["conversion", "chunking"]))
+
+    assert statuses == {"conversion": "ran", "chunking": "ran"}
+    assert not (contribution["dir"] / pipeline.AUTHORING_DIR).exists()
@@ -0,0 +1,147 @@
+import ctypes
+
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import page_document, text_pages
+from knowledge_utils import routing
+from knowledge_utils.routing import convert_with_routing, pipeline_runs, route_page, route_pages
+
+pypdfium2 = pytest.importorskip("pypdfium2")
+pdfium_c = pytest.importorskip("pypdfium2.raw")
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+
+
+def add_text(pdf, page, lines: int = 20) -> None:
+    for line in range(lines):
+        obj = pdfium_c.FPDFPageObj_NewTextObj(pdf, b"Helvetica", 12)
+        text = ("The quick brown fox jumps over the lazy dog. " * 2 + "\0").encode("utf-16-le")
+        pdfium_c.FPDFText_SetText(obj, ctypes.cast(ctypes.c_char_p(text), ctypes.POINTER(pdfium_c.FPDF_WCHAR)))
+        pdfium_c.FPDFPageObj_Transform(obj, 1, 0, 0, 1, 50, PAGE_HEIGHT - 80 - line * 20)
+        pdfium_c.FPDFPage_InsertObject(page, obj)
+
+
+def add_image(pdf, page, width: float, height: float) -> None:
+    """A grey image of width x height points in the lower left corner, like a scan when it covers the page"""
+    bitmap = pypdfium2.PdfBitmap.new_native(100, 100, pdfium_c.FPDFBitmap_BGR)
+    bitmap.fill_rect((128, 128, 128, 255), 0, 0, 100, 100)
+    image = pypdfium2.PdfImage.new(pdf)
+    image.set_bitmap(bitmap)
+    image.set_matrix(pypdfium2.PdfMatrix().scale(width, height))
+    page.insert_obj(image)
+
+
+def add_paths(page, paths: int) -> None:
+    for i in range(paths):
+        path = pdfium_c.FPDFPageObj_CreateNewPath(10 + i, 10)
+        pdfium_c.FPDFPath_LineTo(path, 10 + i, 500)
+        pdfium_c.FPDFPath_SetDrawMode(path, 0, 1)
+        pdfium_c.FPDFPage_InsertObject(page, path)
+
+
+def write_routing_pdf(path):
+    """A text page, a text page with a figure, a scan, a drawing with outlined labels and a blank page"""
+    pdf = pypdfium2.PdfDocument.new()
+
+    page = pdf.new_page(PAGE_WIDTH, PAGE_HEIGHT)
+    add_text(pdf, page)
+    page.gen_content()
+
+    page = pdf.new_page(PAGE_WIDTH, PAGE_HEIGHT)
+    add_text(pdf, page, lines=10)
+    add_image(pdf, page, PAGE_WIDTH, PAGE_HEIGHT / 2)
+    page.gen_content()
+
+    page = pdf.new_page(PAGE_WIDTH, PAGE_HEIGHT)
+    add_image(pdf, page, PAGE_WIDTH, PAGE_HEIGHT)
+    page.gen_content()
+
+    page = pdf.new_page(PAGE_WIDTH, PAGE_HEIGHT)
+    add_paths(page, routing.MIN_DRAWING_PATHS + 50)
+    page.gen_content()
+
+    pdf.new_page(PAGE_WIDTH, PAGE_HEIGHT)
+    pdf.save(str(path))
+    pdf.close()
+    return path
+
+
+def test_pages_are_routed_on_their_text_layer_images_and_paths(tmp_path):
+    page_report = route_pages(write_routing_pdf(tmp_path / "mixed.pdf"))
+
+    assert [entry["pipeline"] for entry in page_report] == ["text", "standard", "ocr", "vlm", "text"]
+    text_page, figure_page, scan_page, drawing_page, blank_page = page_report
+    assert text_page["chars"] > 0 and text_page["image_ratio"] == 0
+    assert figure_page["chars"] > 0 and figure_page["image_ratio"] == pytest.approx(0.5)
+    assert scan_page["chars"] == 0 and scan_page["image_ratio"] == 1.0
+    assert drawing_page["chars"] == 0 and drawing_page["paths"] == routing.MIN_DRAWING_PATHS + 50
+    assert blank_page == {"page_no": 5, "chars": 0, "text_coverage": 0.0, "image_ratio": 0.0, "paths": 0,
+                          "pipeline": "text"}
+
+
+def test_route_page_thresholds():
+    features = {"text_coverage": 0.2, "image_ratio": 0.0, "paths": 0}
+
+    assert route_page(features) == "text"
+    assert route_page(dict(features, image_ratio=routing.MIN_IMAGE_RATIO)) == "standard"
+    # a scan with an OCRed text layer keeps it
+    assert route_page(dict(features, image_ratio=1.0)) == "standard"
+    assert route_page(dict(features, text_coverage=0.0, image_ratio=routing.SCAN_IMAGE_RATIO)) == "ocr"
+    assert route_page(dict(features, text_coverage=0.0, image_ratio=0.2)) == "standard"
+    assert route_page(dict(features, text_coverage=0.0, paths=routing.MIN_DRAWING_PATHS)) == "vlm"
+    # vector paths around a text layer are tables and rules, not a drawing
+    assert route_page(dict(features, paths=routing.MIN_DRAWING_PATHS)) == "text"
+
+
+def test_pipeline_runs():
+    page_report = [{"page_no": page_no, "pipeline": pipeline}
+                   for page_no, pipeline in enumerate(["text", "text", "ocr", "text", "vlm", "vlm"], start=1)]
+
+    assert pipeline_runs(page_report) == [("text", (1, 2)), ("ocr", (3, 3)), ("text", (4, 4)), ("vlm", (5, 6))]
+
+
+class PipelineConverter:
+    """Converts a page range to page_document() of its pages and records the conversions of its pipeline"""
+    def __init__(self, pipeline, conversions):
+        self.pipeline = pipeline
+        self.conversions = conversions
+
+    def convert(self, source, page_range=None):
+        self.conversions.append((self.pipeline, page_range))
+        return SimpleNamespace(document=page_document(range(page_range[0], page_range[1] + 1) if page_range else [1]))
+
+
+@pytest.fixture
+def conversions(monkeypatch):
+    pytest.importorskip("docling_core")
+    conversions = []
+    monkeypatch.setattr(routing, "get_pipeline_converter", lambda pipeline: PipelineConverter(pipeline, conversions))
+    return conversions
+
+
+def routed_report(pipelines):
+    return [{"page_no": page_no, "pipeline": pipeline} for page_no, pipeline in enumerate(pipelines, start=1)]
+
+
+def test_runs_are_converted_with_their_pipeline_and_merged(conversions):
+    doc, page_report, timing = convert_with_routing("manual.pdf", routed_report(["text", "text", "ocr", "text"]))
+
+    assert conversions == [("text", (1, 2)), ("ocr", (3, 3)), ("text", (4, 4))]
+    assert text_pages(doc) == [("page 1", 1), ("page 2", 2), ("page 3", 3), ("page 4", 4)]
+    assert timing["pages"] == {"text": 3, "ocr": 1}
+    assert all("seconds" in entry for entry in page_report)
+
+
+def test_time_saved_is_only_reported_when_measured(conversions):
+    _, _, timing = convert_with_routing("manual.pdf", routed_report(["text", "ocr"]))
+
+    assert "full_ocr_s" not in timing and "saved_s" not in timing
+    assert ("ocr", None) not in conversions
+
+    _, _, timing = convert_with_routing("manual.pdf", routed_report(["text", "ocr"]), compare_ocr=True)
+
+    assert conversions[-1] == ("ocr", None)
+    assert timing["saved_s"] == pytest.approx(timing["full_ocr_s"] - timing["routing_s"] - timing["conversion_s"])
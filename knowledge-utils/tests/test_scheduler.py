@@ -0,0 +1,120 @@
+import json
+import os
+import time
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("docling_core")
+
+from conftest import page_document, write_pdf
+from knowledge_utils.conversion import convert_documents, count_pdf_pages
+from knowledge_utils.scheduler import ScheduledConversionError, schedule_conversions
+
+# seconds a conversion takes, so conversions in flight at once overlap
+CONVERSION_TIME = 0.3
+
+
+class LoggingConverter:
+    """Converts a PDF to page_document() of its pages and logs when every conversion starts and ends"""
+    def convert(self, source):
+        source = Path(source)
+        log_path = source.parent / "conversions.log"
+        with open(log_path, "a") as log:
+            log.write(f"start {source.stem}\n")
+        if source.stem.startswith("broken"):
+            raise ValueError(f"cannot convert {source.name}")
+        time.sleep(CONVERSION_TIME)
+        doc = page_document(range(1, count_pdf_pages(source) + 1), source.stem)
+        with open(log_path, "a") as log:
+            log.write(f"end {source.stem}\n")
+        return SimpleNamespace(document=doc)
+
+
+def logging_converter_factory():
+    return LoggingConverter()
+
+
+class PidConverter:
+    """Converts a PDF or page range to page_document() of its pages named after the process that converted it"""
+    def convert(self, source, page_range=None):
+        page_range = page_range or (1, count_pdf_pages(source))
+        doc = page_document(range(page_range[0], page_range[1] + 1), f"pid-{os.getpid()}")
+        return SimpleNamespace(document=doc)
+
+
+def pid_converter_factory():
+    return PidConverter()
+
+
+def source_pdfs(source_dir: Path, pages: dict):
+    source_dir.mkdir()
+    return [write_pdf(source_dir / f"{name}.pdf", num_pages) for name, num_pages in pages.items()]
+
+
+def conversion_log(source_dir: Path):
+    return (source_dir / "conversions.log").read_text().splitlines()
+
+
+def test_schedule_conversions_starts_longest_first(tmp_path):
+    source_files = source_pdfs(tmp_path / "sources", {"short": 2, "long": 6, "medium": 4})
+
+    json_files = schedule_conversions(source_files, tmp_path / "conversion", logging_converter_factory, workers=1)
+
+    assert [line for line in conversion_log(tmp_path / "sources") if line.startswith("start")] == [
+        "start long", "start medium", "start short"
+    ]
+    assert json_files == [tmp_path / "conversion" / f"{file.stem}.json" for file in source_files]
+    assert all(json_file.exists() for json_file in json_files)
+
+
+def test_schedule_conversions_bounds_pages_in_flight(tmp_path):
+    source_files = source_pdfs(tmp_path / "sources", {"long": 6, "medium": 4, "short": 2})
+
+    schedule_conversions(source_files, tmp_path / "conversion", logging_converter_factory, workers=2,
+                         max_pages_in_flight=8)
+
+    # medium does not fit next to long, short does
+    log = conversion_log(tmp_path / "sources")
+    assert log.index("start medium") > log.index("end long")
+
+
+def test_schedule_conversions_converts_the_others_when_one_fails(tmp_path):
+    source_files = source_pdfs(tmp_path / "sources", {"broken": 6, "medium": 4, "short": 2})
+
+    with pytest.raises(ScheduledConversionError) as error:
+        schedule_conversions(source_files, tmp_path / "conversion", logging_converter_factory, workers=1)
+
+    assert list(error.value.failures) == [source_files[0]]
+    assert sorted(error.value.json_files) == sorted(source_files[1:])
+    assert all(json_file.exists() for json_file in error.value.json_files.values())
+
+
+def test_convert_documents_uses_the_converter_factory_in_the_worker_processes(tmp_path):
+    source_pdfs(tmp_path / "sources", {"long": 6, "short": 2})
+
+    json_files = convert_documents(tmp_path / "sources", tmp_path / "conversion", workers=2,
+                                   converter_factory=pid_converter_factory, page_workers=2, pages_per_job=2)
+
+    names = {json.loads(json_file.read_text())["name"] for json_file in json_files}
+    assert len(names) == 2 and all(name.startswith("pid-") for name in names)
+    assert f"pid-{os.getpid()}" not in names
+
+
+def test_convert_documents_rejects_an_unpicklable_converter_for_workers(tmp_path):
+    source_pdfs(tmp_path / "sources", {"short": 2})
+    converter = PidConverter()
+    converter.callback = lambda: None
+
+    with pytest.raises(ValueError):
+        convert_documents(tmp_path / "sources", tmp_path / "conversion", converter, workers=2)
+
+
+def test_convert_documents_sends_a_picklable_converter_to_the_worker_processes(tmp_path):
+    source_pdfs(tmp_path / "sources", {"short": 2})
+
+    [json_file] = convert_documents(tmp_path / "sources", tmp_path / "conversion", PidConverter(), workers=2)
+
+    assert json.loads(json_file.read_text())["name"] != f"pid-{os.getpid()}"
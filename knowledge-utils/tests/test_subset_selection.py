@@ -0,0 +1,56 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from knowledge_utils.subset_selection import NUM_SHARDS, EmbeddingCache, _text_key, embed_texts
+
+
+def shard_keys(shard: int, count: int):
+    """Text keys of the first count texts "text <i>" falling into one shard"""
+    keys = []
+    i = 0
+    while len(keys) < count:
+        key = _text_key(f"text {i}")
+        if key[0] % NUM_SHARDS == shard:
+            keys.append(key)
+        i += 1
+    return keys
+
+
+def test_embedding_cache_only_rewrites_the_shards_it_added_to(tmp_path):
+    cache = EmbeddingCache("org/model", tmp_path)
+    cache.add(shard_keys(0, 2) + shard_keys(1, 1), np.eye(3, dtype=np.float32))
+    cache.save()
+    assert sorted(path.name for path in (tmp_path / "org--model").iterdir()) == ["00.npz", "01.npz"]
+    shard_1_mtime = (tmp_path / "org--model" / "01.npz").stat().st_mtime_ns
+
+    cache = EmbeddingCache("org/model", tmp_path)
+    [first, second] = cache.lookup(shard_keys(0, 2))
+    assert first.tolist() == [1, 0, 0] and second.tolist() == [0, 1, 0]
+    cache.add(shard_keys(0, 3)[2:], np.ones((1, 3), dtype=np.float32))
+    cache.save()
+    assert (tmp_path / "org--model" / "01.npz").stat().st_mtime_ns == shard_1_mtime
+    assert EmbeddingCache("org/model", tmp_path).lookup(shard_keys(1, 1))[0].tolist() == [0, 0, 1]
+
+
+def test_embedding_cache_evicts_the_oldest_embeddings_of_a_full_shard(tmp_path):
+    keys = shard_keys(5, 3)
+    cache = EmbeddingCache("model", tmp_path, max_shard_embeddings=2)
+    cache.add(keys, np.arange(9, dtype=np.float32).reshape(3, 3))
+    # evicted on disk only, the embeddings added in this run are kept until it ends
+    cache.save()
+    assert all(embedding is not None for embedding in cache.lookup(keys))
+
+    [oldest, *newest] = EmbeddingCache("model", tmp_path).lookup(keys)
+    assert oldest is None
+    assert [embedding.tolist() for embedding in newest] == [[3, 4, 5], [6, 7, 8]]
+
+
+def test_embed_texts_returns_cached_embeddings_without_loading_the_model(tmp_path):
+    cache = EmbeddingCache("no/such-model", tmp_path)
+    cache.add([_text_key("a"), _text_key("b")], np.array([[1, 0], [0, 1]], dtype=np.float32))
+    cache.save()
+
+    embeddings = embed_texts(["b", "a", "b"], "no/such-model", cache_dir=tmp_path)
+
+    assert embeddings.tolist() == [[0, 1], [1, 0], [0, 1]]
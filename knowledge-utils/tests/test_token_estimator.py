@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+from knowledge_utils.token_estimator import TokenCountEstimator
+
+SAMPLE_CHUNKS = sorted((Path(__file__).resolve().parents[2] / "model-customization").glob("**/chunks.jsonl"))
+THRESHOLDS = (100, 1024)
+
+
+def calibrated_estimator(**kwargs) -> TokenCountEstimator:
+    # 1 to 2 tokens per word of 5 bytes
+    estimator = TokenCountEstimator(calibration_size=2, margin=0.0, **kwargs)
+    estimator.add("abcd " * 10, 10)
+    estimator.add("abcd " * 10, 20)
+    return estimator
+
+
+def test_classify_places_texts_far_from_the_thresholds():
+    estimator = calibrated_estimator(threshold_margin=0.2)
+
+    assert estimator.classify("abcd " * 30, THRESHOLDS) == 0  # 30 to 60 tokens
+    assert estimator.classify("abcd " * 200, THRESHOLDS) == 1  # 200 to 400 tokens
+    assert estimator.classify("abcd " * 700, THRESHOLDS) is None  # 700 to 1400 tokens straddles 1024
+    assert estimator.classify("abcd " * 1300, THRESHOLDS) == 2  # 1300 to 2600 tokens
+    assert estimator.classify("abcd " * 70, THRESHOLDS) is None  # 70 to 140 tokens straddles 100
+
+
+def test_classify_tokenizes_texts_within_the_threshold_margin():
+    estimator = calibrated_estimator(threshold_margin=0.2)
+
+    # 45 to 90 tokens is below 100, but within 20% of it
+    assert calibrated_estimator(threshold_margin=0.0).classify("abcd " * 45, THRESHOLDS) == 0
+    assert estimator.classify("abcd " * 45, THRESHOLDS) is None
+    # 115 to 230 tokens is above 100, but within 20% of it
+    assert calibrated_estimator(threshold_margin=0.0).classify("abcd " * 115, THRESHOLDS) == 1
+    assert estimator.classify("abcd " * 115, THRESHOLDS) is None
+
+
+def test_uncalibrated_estimator_places_nothing():
+    assert TokenCountEstimator().classify("abcd " * 30, THRESHOLDS) is None
+
+
+@pytest.mark.parametrize("chunks_jsonl", SAMPLE_CHUNKS, ids=lambda path: path.parent.name)
+def test_estimates_match_the_seed_tokenizer_on_the_sample_chunks(chunks_jsonl):
+    pytest.importorskip("transformers")
+    from knowledge_utils.chunk_store import read_chunk_columns
+    from knowledge_utils.create_seed_dataset import SEED_TOKENIZER, count_tokens, get_token_count, load_tokenizer
+
+    try:
+        tokenizer = load_tokenizer(SEED_TOKENIZER)
+    except OSError:
+        pytest.skip(f"{SEED_TOKENIZER} cannot be downloaded")
+    chunks = read_chunk_columns(chunks_jsonl, ["chunk"])["chunk"]
+    exact = [get_token_count(chunk, tokenizer) for chunk in chunks]
+
+    # a fresh estimator calibrated on this file only, the way seed dataset creation sees a contribution
+    estimator = TokenCountEstimator()
+    step = max(1, len(chunks) // estimator.calibration_size)
+    for i in range(0, len(chunks), step):
+        estimator.add(chunks[i], exact[i])
+    for chunk, count in zip(chunks, exact):
+        band = estimator.classify(chunk, THRESHOLDS)
+        # the bounds are fitted and a count can fall outside them, but never across a threshold
+        if band is not None:
+            assert band == sum(count > threshold for threshold in THRESHOLDS)
+
+    # and the counts seed dataset creation compares with the bounds
+    load_tokenizer.cache_clear()
+    estimated = count_tokens(chunks, tokenizer_name=SEED_TOKENIZER)
+    for count, estimate in zip(exact, estimated):
+        assert (estimate > THRESHOLDS[0], estimate > THRESHOLDS[1]) == (count > THRESHOLDS[0], count > THRESHOLDS[1])
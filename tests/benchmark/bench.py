@@ -0,0 +1,273 @@
+"""
+End-to-end benchmark of the knowledge pre-processing pipeline.
+
+Runs conversion -> chunking -> seed selection -> Q&A generation -> seed dataset
+over the sample contributions bundled with the quick-start notebook and records
+wall time, peak RSS and throughput for every stage in a JSON report.
+
+Q&A generation talks to an OpenAI compatible endpoint, by default the inference
+mock in tests/inference-mock, so the numbers are comparable across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from knowledge_utils.instrumentation import PeakRssSampler
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SAMPLE_PDF_DIR = REPO_ROOT / "quick-starts" / "instructlab-knowledge" / "sample-pdfs"
+
+STAGES = ["conversion", "chunking", "selection", "generation", "dataset"]
+
+CONTRIBUTIONS = [
+    {
+        "name": "inference-time-scaling",
+        "domain": "Artificial Intelligence Research",
+        "summary": "A Probabilistic Inference Approach to Inference-Time Scaling of Large Language Models (LLMs)",
+        "files": ["inference-time-scaling.pdf"],
+    },
+    {
+        "name": "nfl",
+        "domain": "sports rules",
+        "summary": "Official playing rules of the National Football League 2022, 2023",
+        "files": ["2022-nfl-rulebook.pdf", "2023-nfl-rulebook.pdf"],
+    },
+]
+
+SOURCE_DOCUMENT_DIR = "source_documents"
+CONVERSION_DIR = "conversion"
+CHUNKING_DIR = "chunking"
+AUTHORING_DIR = "authoring"
+
+
+@contextmanager
+def measure(report: dict, stage: str, unit: str):
+    """
+    Measures wall time and peak RSS of the enclosed block and records it under
+    `stage` in the report. The block receives a dict and sets "items" on it to
+    the number of `unit`s it processed so throughput can be computed.
+    """
+    counter = {"items": 0}
+    print(f"⏱️  Running stage '{stage}'...")
+    with PeakRssSampler() as sampler:
+        start = time.perf_counter()
+        yield counter
+        wall_time = time.perf_counter() - start
+
+    items = counter["items"]
+    report["stages"][stage] = {
+        "wall_time_s": round(wall_time, 4),
+        "peak_rss_mb": round(sampler.peak / (1024 * 1024), 1),
+        "items": items,
+        "unit": unit,
+        "throughput_per_s": round(items / wall_time, 4) if wall_time > 0 else None,
+    }
+    print(f"   {stage}: {wall_time:.2f}s, {items} {unit}, peak RSS {sampler.peak / (1024 * 1024):.1f} MB")
+
+
+def prepare_workspace(workspace_dir: Path) -> list:
+    """
+    Lays out the quick-start workspace structure for every sample contribution
+    and copies the sample PDFs into its source_documents directory.
+    """
+    contributions = []
+    for sample in CONTRIBUTIONS:
+        contribution = dict(sample)
+        contribution["dir"] = workspace_dir / sample["name"]
+        for subdir in [SOURCE_DOCUMENT_DIR, CONVERSION_DIR, CHUNKING_DIR, AUTHORING_DIR]:
+            (contribution["dir"] / subdir).mkdir(parents=True, exist_ok=True)
+        for file_name in sample["files"]:
+            shutil.copy(SAMPLE_PDF_DIR / file_name, contribution["dir"] / SOURCE_DOCUMENT_DIR)
+        contributions.append(contribution)
+    return contributions
+
+
+def run_conversion(contributions: list, counter: dict) -> None:
+    from knowledge_utils.conversion import convert_documents, create_document_converter
+
+    doc_converter = create_document_converter()
+
+    for contribution in contributions:
+        json_files = convert_documents(
+            contribution["dir"] / SOURCE_DOCUMENT_DIR,
+            contribution["dir"] / CONVERSION_DIR,
+            doc_converter,
+        )
+        for json_file in json_files:
+            with open(json_file, "r") as f:
+                counter["items"] += len(json.load(f)["pages"])
+
+
+def run_chunking(contributions: list, counter: dict) -> None:
+    from docling.chunking import HybridChunker
+    from knowledge_utils.chunking import chunk_documents
+
+    chunker = HybridChunker()
+
+    for contribution in contributions:
+        chunks_file_path = chunk_documents(
+            contribution["dir"] / CONVERSION_DIR,
+            contribution["dir"] / CHUNKING_DIR,
+            chunker,
+        )
+        with open(chunks_file_path, "r") as f:
+            counter["items"] += sum(1 for _ in f)
+
+
+def run_selection(contributions: list, counter: dict, num_seed_examples: int) -> None:
+    from knowledge_utils.qna_gen import save_random_chunk_selection
+
+    for contribution in contributions:
+        save_random_chunk_selection(
+            contribution["dir"] / CHUNKING_DIR / "chunks.jsonl",
+            contribution["dir"] / AUTHORING_DIR,
+            num_seed_examples,
+        )
+        counter["items"] += num_seed_examples
+
+
+def run_generation(contributions: list, counter: dict, api_key: str, api_url: str, model_id: str) -> None:
+    from knowledge_utils.qna_gen import generate_seed_examples
+
+    for contribution in contributions:
+        authoring_path = contribution["dir"] / AUTHORING_DIR
+        generate_seed_examples(
+            contribution["name"],
+            authoring_path / "selected_chunks.jsonl",
+            authoring_path,
+            api_key,
+            api_url,
+            model_id,
+            contribution["domain"],
+            contribution["summary"],
+        )
+        with open(authoring_path / f"qagen-{contribution['name']}.json", "r") as f:
+            counter["items"] += sum(1 for _ in f)
+
+
+def run_dataset(contributions: list, counter: dict, workspace_dir: Path) -> None:
+    from knowledge_utils.create_seed_dataset import get_seed_dataset, safe_concatenate_datasets
+
+    contribution_datasets = []
+    for contribution in contributions:
+        seed_data = get_seed_dataset(contribution["dir"] / CHUNKING_DIR, contribution["dir"] / AUTHORING_DIR)
+        seed_data.to_json(contribution["dir"] / f"seed_data-{contribution['name']}.jsonl", orient="records", lines=True)
+        contribution_datasets.append(seed_data)
+
+    final_seed_data = safe_concatenate_datasets(contribution_datasets)
+    final_seed_data.to_json(workspace_dir / "seed_data.jsonl", orient="records", lines=True)
+    counter["items"] += final_seed_data.num_rows
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_reports(report: dict, baseline: dict) -> None:
+    """
+    Prints the wall time and peak RSS of each stage relative to a baseline report.
+    """
+    print(f"\n📊 Comparison against baseline {baseline['meta'].get('git_revision')}")
+    print("=" * 72)
+    print(f"{'stage':<12}{'wall (s)':>12}{'baseline':>12}{'ratio':>9}{'RSS (MB)':>12}{'baseline':>12}")
+    for stage, result in report["stages"].items():
+        base = baseline["stages"].get(stage)
+        if base is None:
+            print(f"{stage:<12}{result['wall_time_s']:>12.2f}{'-':>12}")
+            continue
+        ratio = result["wall_time_s"] / base["wall_time_s"] if base["wall_time_s"] else float("nan")
+        print(
+            f"{stage:<12}{result['wall_time_s']:>12.2f}{base['wall_time_s']:>12.2f}{ratio:>8.2f}x"
+            f"{result['peak_rss_mb']:>12.1f}{base['peak_rss_mb']:>12.1f}"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the knowledge pre-processing pipeline")
+    parser.add_argument("-o", "--output", default="benchmark-report.json", help="Path to write the JSON report")
+    parser.add_argument("-w", "--workspace", help="Workspace directory to use. Defaults to a temporary directory")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES,
+                        help="Stages to run. Later stages reuse the outputs already present in the workspace")
+    parser.add_argument("--baseline", help="Optional report from a previous run to compare against")
+    parser.add_argument("--num-seed-examples", type=int, default=7, help="Number of chunks selected per contribution")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for chunk selection")
+    parser.add_argument("--endpoint-url", default=os.getenv("MODEL_ENDPOINT_URL") or "http://127.0.0.1:11434/v1")
+    parser.add_argument("--api-key", default=os.getenv("MODEL_API_KEY") or "none")
+    parser.add_argument("--model-name", default=os.getenv("MODEL_NAME") or "Mixtral-8x7B")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    random.seed(args.seed)
+
+    if args.workspace:
+        workspace_dir = Path(args.workspace)
+        workspace_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        workspace_dir = Path(tempfile.mkdtemp(prefix="knowledge-bench-"))
+
+    report = {
+        "meta": {
+            "git_revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "workspace": str(workspace_dir.resolve()),
+            "model_name": args.model_name,
+            "num_seed_examples": args.num_seed_examples,
+            "seed": args.seed,
+        },
+        "stages": {},
+    }
+
+    contributions = prepare_workspace(workspace_dir)
+
+    start = time.perf_counter()
+    for stage in STAGES:
+        if stage not in args.stages:
+            continue
+        if stage == "conversion":
+            with measure(report, stage, "pages") as counter:
+                run_conversion(contributions, counter)
+        elif stage == "chunking":
+            with measure(report, stage, "chunks") as counter:
+                run_chunking(contributions, counter)
+        elif stage == "selection":
+            with measure(report, stage, "chunks") as counter:
+                run_selection(contributions, counter, args.num_seed_examples)
+        elif stage == "generation":
+            with measure(report, stage, "qa_pairs") as counter:
+                run_generation(contributions, counter, args.api_key, args.endpoint_url, args.model_name)
+        elif stage == "dataset":
+            with measure(report, stage, "rows") as counter:
+                run_dataset(contributions, counter, workspace_dir)
+    report["total_wall_time_s"] = round(time.perf_counter() - start, 4)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"📁 Benchmark report saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            compare_reports(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Round-trip and size check of the compact conversion format.
+
+Writes every sample conversion as plain (.json) and compact (.json.zst) Docling
+JSON with knowledge_utils.document_io, reads both back in full and partially,
+and checks that the documents are identical to the original. Reports the size
+ratio and load times, and exits non-zero when a round trip differs or the
+compact file is less than --min-ratio times smaller.
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+from docling_core.types.doc import DoclingDocument
+
+from knowledge_utils.document_io import (
+    CHUNKING_PARTS,
+    COMPACT_SUFFIX,
+    TABLE_PARTS,
+    load_docling_document,
+    save_docling_document,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SAMPLE_JSON_DIR = REPO_ROOT / "model-customization" / "data-processing" / "chunking" / "data" / "sample-docling-json"
+
+
+def median_load_time(path: Path, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load_docling_document(path)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def check_document(json_file: Path, tmp_dir: Path, repeat: int) -> dict:
+    original = DoclingDocument.load_from_json(json_file)
+    plain = save_docling_document(original, tmp_dir / f"{json_file.stem}.json")
+    compact = save_docling_document(original, tmp_dir / f"{json_file.stem}{COMPACT_SUFFIX}")
+
+    failures = []
+    for path in [plain, compact]:
+        if load_docling_document(path) != original:
+            failures.append(f"{path.name}: full load differs")
+        if load_docling_document(path, TABLE_PARTS).tables != original.tables:
+            failures.append(f"{path.name}: tables differ")
+        if load_docling_document(path, CHUNKING_PARTS).export_to_markdown() != original.export_to_markdown():
+            failures.append(f"{path.name}: chunking parts differ")
+
+    return {
+        "plain_bytes": plain.stat().st_size,
+        "compact_bytes": compact.stat().st_size,
+        "ratio": round(plain.stat().st_size / compact.stat().st_size, 2),
+        "plain_load_s": round(median_load_time(plain, repeat), 4),
+        "compact_load_s": round(median_load_time(compact, repeat), 4),
+        "failures": failures,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check the round trip and size of compact Docling JSON")
+    parser.add_argument("files", nargs="*", type=Path,
+                        help="Docling JSON files. Defaults to the sample conversions in the chunking example")
+    parser.add_argument("--min-ratio", type=float, default=3.0, help="Minimum plain to compact size ratio")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Number of loads timed per file")
+    parser.add_argument("-o", "--output", default="compact-format-report.json", help="Path to write the JSON report")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    files = args.files or sorted(SAMPLE_JSON_DIR.glob("*.json"))
+    report = {}
+    failed = False
+
+    print(f"{'document':<32}{'plain':>12}{'compact':>12}{'ratio':>8}{'plain load':>12}{'compact load':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for json_file in files:
+            result = check_document(json_file, Path(tmp_dir), args.repeat)
+            report[json_file.name] = result
+            print(f"{json_file.name:<32}{result['plain_bytes']:>12}{result['compact_bytes']:>12}{result['ratio']:>7.1f}x"
+                  f"{result['plain_load_s']:>11.3f}s{result['compact_load_s']:>13.3f}s")
+            for failure in result["failures"]:
+                print(f"❌ {failure}")
+            if result["ratio"] < args.min_ratio:
+                print(f"❌ {json_file.name}: compact file is only {result['ratio']}x smaller")
+            failed = failed or bool(result["failures"]) or result["ratio"] < args.min_ratio
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"📁 Compact format report saved to {args.output}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
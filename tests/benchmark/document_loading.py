@@ -0,0 +1,149 @@
+"""
+Peak memory of loading Docling JSON conversions.
+
+Compares the way the notebooks used to load a conversion, json.load followed
+by DoclingDocument(**doc_dict), with knowledge_utils.document_io building only
+the tables (illuminator) or everything but the pages (chunking). Every load runs
+in a fresh interpreter so the peaks do not influence each other.
+
+The sample conversions are small, so --scale repeats their content to build a
+larger document with the same structure.
+"""
+import argparse
+import copy
+import json
+import subprocess
+import sys
+import tempfile
+
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SAMPLE_JSON_DIR = REPO_ROOT / "model-customization" / "data-processing" / "chunking" / "data" / "sample-docling-json"
+
+ITEM_PARTS = ["groups", "texts", "pictures", "tables", "key_value_items", "form_items"]
+
+APPROACHES = {
+    "json.load + DoclingDocument": """
+with open(path, "r") as f:
+    doc_dict = json.load(f)
+doc = DoclingDocument(**doc_dict)
+""",
+    "document_io (TABLE_PARTS)": """
+doc = load_docling_document(path, TABLE_PARTS)
+""",
+    "document_io (CHUNKING_PARTS)": """
+doc = load_docling_document(path, CHUNKING_PARTS)
+""",
+}
+
+PROBE = """
+import json, sys, time
+from docling_core.types.doc import DoclingDocument
+from knowledge_utils.document_io import CHUNKING_PARTS, TABLE_PARTS, load_docling_document
+
+def status(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+
+path = sys.argv[1]
+# reset the peak RSS so only the load is measured
+with open("/proc/self/clear_refs", "w") as f:
+    f.write("5")
+before = status("VmRSS")
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "load_time_s": elapsed,
+    "peak_rss_delta_bytes": status("VmHWM") - before,
+    "tables": len(doc.tables),
+    "texts": len(doc.texts),
+}}))
+"""
+
+
+def scale_document(doc_dict: dict, copies: int) -> dict:
+    """
+    Returns a document with the body content and items repeated `copies` times.
+    References in every copy are shifted to point at that copy's items.
+    """
+    def shift(value, offsets):
+        if isinstance(value, dict):
+            if set(value) == {"$ref"}:
+                _, part, *index = value["$ref"].split("/")
+                if index and part in offsets:
+                    return {"$ref": f"#/{part}/{int(index[0]) + offsets[part]}"}
+                return value
+            return {key: shift(item, offsets) for key, item in value.items()}
+        if isinstance(value, list):
+            return [shift(item, offsets) for item in value]
+        return value
+
+    scaled = copy.deepcopy(doc_dict)
+    sizes = {part: len(doc_dict.get(part, [])) for part in ITEM_PARTS}
+    for n in range(1, copies):
+        offsets = {part: size * n for part, size in sizes.items()}
+        for part in ITEM_PARTS:
+            for item in doc_dict.get(part, []):
+                shifted = shift(item, offsets)
+                _, _, index = item["self_ref"].split("/")
+                shifted["self_ref"] = f"#/{part}/{int(index) + offsets[part]}"
+                scaled[part].append(shifted)
+        scaled["body"]["children"].extend(shift(doc_dict["body"]["children"], offsets))
+    return scaled
+
+
+def measure(code: str, path: Path) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(code=code), str(path)], capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Loading {path} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare the peak memory of loading Docling JSON conversions")
+    parser.add_argument("files", nargs="*", type=Path,
+                        help="Docling JSON files. Defaults to the sample conversions in the chunking example")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="Repeat the content of each document this many times before loading it")
+    parser.add_argument("-o", "--output", default="document-loading-report.json", help="Path to write the JSON report")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    files = args.files or sorted(SAMPLE_JSON_DIR.glob("*.json"))
+    report = {"scale": args.scale, "documents": {}}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for json_file in files:
+            path = json_file
+            if args.scale > 1:
+                with open(json_file, "r") as f:
+                    doc_dict = json.load(f)
+                path = Path(tmp_dir) / json_file.name
+                with open(path, "w") as f:
+                    json.dump(scale_document(doc_dict, args.scale), f)
+
+            size_mb = path.stat().st_size / (1024 * 1024)
+            print(f"\n📄 {json_file.name} ({size_mb:.1f} MB)")
+            results = {}
+            for name, code in APPROACHES.items():
+                result = measure(code, path)
+                results[name] = result
+                print(f"   {name:<32}{result['peak_rss_delta_bytes'] / (1024 * 1024):>10.1f} MB"
+                      f"{result['load_time_s']:>10.2f}s")
+            report["documents"][json_file.name] = {"size_bytes": path.stat().st_size, "results": results}
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"📁 Document loading report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
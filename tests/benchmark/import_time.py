@@ -0,0 +1,114 @@
+"""
+Import-time benchmark of the knowledge-utils entry points.
+
+Imports every module in a fresh interpreter a few times, records the median
+wall time and lists the heavy third party packages (docling, datasets,
+transformers, ...) that were loaded as a side effect. With --check the script
+exits non-zero when importing an entry point pulls in one of them, so a stray
+top-level import cannot silently bring back multi-second startup times.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = [
+    "knowledge_utils",
+    "knowledge_utils.illuminator.illuminator",
+    "knowledge_utils.illuminator.utils",
+    "knowledge_utils.conversion",
+    "knowledge_utils.chunking",
+    "knowledge_utils.chunk_store",
+    "knowledge_utils.streaming",
+    "knowledge_utils.scheduler",
+    "knowledge_utils.reconversion",
+    "knowledge_utils.routing",
+    "knowledge_utils.dedup",
+    "knowledge_utils.subset_selection",
+    "knowledge_utils.document_io",
+    "knowledge_utils.qna_gen",
+    "knowledge_utils.create_seed_dataset",
+    "knowledge_utils.token_estimator",
+    "knowledge_utils.pipeline",
+]
+
+HEAVY_MODULES = [
+    "docling",
+    "docling_core",
+    "docling_sdg",
+    "pydantic",
+    "datasets",
+    "transformers",
+    "torch",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy!r}))
+print(json.dumps({{"import_time_s": elapsed, "heavy_modules": heavy}}))
+"""
+
+
+def probe(module: str) -> dict:
+    """
+    Imports `module` in a fresh interpreter and returns the import time and the
+    heavy modules it loaded.
+    """
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def time_command(command: list) -> float:
+    start = time.perf_counter()
+    subprocess.run(command, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the import time of the knowledge-utils entry points")
+    parser.add_argument("-o", "--output", default="import-time-report.json", help="Path to write the JSON report")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Number of fresh interpreters per entry point")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with an error if an entry point imports one of the heavy modules")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    report = {"python": sys.version.split()[0], "repeat": args.repeat, "modules": {}}
+
+    print(f"{'module':<44}{'median (ms)':>14}  heavy modules")
+    for module in ENTRY_POINTS:
+        runs = [probe(module) for _ in range(args.repeat)]
+        median = statistics.median(run["import_time_s"] for run in runs)
+        heavy = runs[0]["heavy_modules"]
+        report["modules"][module] = {"median_import_time_s": round(median, 4), "heavy_modules": heavy}
+        print(f"{module:<44}{median * 1000:>14.1f}  {', '.join(heavy) or '-'}")
+
+    # the console script goes through the same imports plus argparse, time it end to end
+    command = [sys.executable, "-m", "knowledge_utils.illuminator", "--help"]
+    median = statistics.median(time_command(command) for _ in range(args.repeat))
+    report["commands"] = {"illuminator --help": {"median_wall_time_s": round(median, 4)}}
+    print(f"{'illuminator --help':<44}{median * 1000:>14.1f}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"📁 Import time report saved to {args.output}")
+
+    offenders = {module: result["heavy_modules"] for module, result in report["modules"].items() if result["heavy_modules"]}
+    if args.check and offenders:
+        for module, heavy in offenders.items():
+            print(f"❌ {module} imports {', '.join(heavy)} at module level")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Per-page routing report of the sample PDFs.
+
+Routes every page of the sample PDFs with knowledge_utils.routing and reports the
+pipeline of every page and the time the routing pre-pass took. With --convert every
+PDF is also converted routed and with forced OCR on every page, and the time routing
+saved is reported. Converting needs docling and its models.
+"""
+import argparse
+import json
+import time
+
+from pathlib import Path
+
+from knowledge_utils.routing import convert_with_routing, pipeline_runs, route_pages
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SAMPLE_PDF_DIR = REPO_ROOT / "quick-starts" / "instructlab-knowledge" / "sample-pdfs"
+
+
+def route_file(file: Path, convert: bool) -> dict:
+    start = time.perf_counter()
+    page_report = route_pages(file)
+    result = {
+        "pages": len(page_report),
+        "routing_s": round(time.perf_counter() - start, 4),
+        "runs": [[pipeline, *page_range] for pipeline, page_range in pipeline_runs(page_report)],
+        "page_report": page_report,
+    }
+    if convert:
+        _, page_report, timing = convert_with_routing(file, page_report, compare_ocr=True)
+        result["routed_s"] = round(timing["routing_s"] + timing["conversion_s"], 2)
+        result["full_ocr_s"] = round(timing["full_ocr_s"], 2)
+        result["saved_s"] = round(timing["saved_s"], 2)
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Report the per-page pipeline routing of PDFs")
+    parser.add_argument("files", nargs="*", type=Path, help="PDFs to route. Defaults to the quick-start sample PDFs")
+    parser.add_argument("--convert", action="store_true",
+                        help="Also convert every PDF routed and with forced OCR and report the time saved")
+    parser.add_argument("-o", "--output", default="page-routing-report.json", help="Path to write the JSON report")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    files = args.files or sorted(SAMPLE_PDF_DIR.glob("*.pdf"))
+    report = {}
+
+    print(f"{'document':<32}{'pages':>7}{'routing':>10}  runs")
+    for file in files:
+        result = route_file(file, args.convert)
+        report[file.name] = result
+        runs = ", ".join(f"{pipeline} {first}-{last}" for pipeline, first, last in result["runs"])
+        print(f"{file.name:<32}{result['pages']:>7}{result['routing_s']:>9.3f}s  {runs}")
+        if args.convert:
+            print(f"{'':<32}routed {result['routed_s']:.1f}s, full OCR {result['full_ocr_s']:.1f}s, "
+                  f"saved {result['saved_s']:.1f}s")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"📁 Page routing report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
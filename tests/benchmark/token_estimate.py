@@ -0,0 +1,103 @@
+"""
+Tokenizer calls avoided by the calibrated token count estimates.
+
+Counts the tokens of the chunks of every sample contribution twice: exactly, with
+the tokenizer, and the way seed dataset creation does, where the exact tokenizer
+only runs for chunks an uncalibrated or uncertain TokenCountEstimator cannot place
+between the 100 and 1024 token bounds. Reports the share of tokenizer calls avoided,
+the time of both, and the chunks whose side of a bound differs from the exact count.
+With --check the script exits non-zero when there is one.
+"""
+import argparse
+import json
+import sys
+import time
+
+from collections import Counter
+from pathlib import Path
+
+from knowledge_utils.chunk_store import read_chunk_columns
+from knowledge_utils.create_seed_dataset import (
+    MAX_TOKEN_COUNT,
+    MIN_TOKEN_COUNT,
+    SEED_TOKENIZER,
+    count_tokens,
+    get_token_count,
+    load_tokenizer,
+    token_count_estimator,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SAMPLE_CHUNK_FILES = sorted((REPO_ROOT / "model-customization").rglob("chunks.jsonl"))
+
+
+def check_chunks(chunks_jsonl: Path, tokenizer_name: str) -> dict:
+    chunks = read_chunk_columns(chunks_jsonl, ["chunk"])["chunk"]
+    tokenizer = load_tokenizer(tokenizer_name)
+
+    start = time.perf_counter()
+    exact = [get_token_count(chunk, tokenizer) for chunk in chunks]
+    exact_time = time.perf_counter() - start
+
+    # every file starts from an uncalibrated estimator, like the first contribution of a run
+    token_count_estimator.cache_clear()
+    stats = Counter()
+    start = time.perf_counter()
+    estimated = count_tokens(chunks, tokenizer_name=tokenizer_name, stats=stats)
+    estimated_time = time.perf_counter() - start
+
+    mismatches = [
+        i for i, (estimate, count) in enumerate(zip(estimated, exact))
+        if (estimate > MIN_TOKEN_COUNT) != (count > MIN_TOKEN_COUNT) or (estimate > MAX_TOKEN_COUNT) != (count > MAX_TOKEN_COUNT)
+    ]
+    return {
+        "chunks": len(chunks),
+        "tokenized": stats["tokenized"],
+        "estimated": stats["estimated"],
+        "calls_avoided": round(1 - stats["tokenized"] / len(chunks), 4) if chunks else 0.0,
+        "exact_s": round(exact_time, 4),
+        "estimated_s": round(estimated_time, 4),
+        "mismatches": mismatches,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure the tokenizer calls avoided by the token count estimates")
+    parser.add_argument("files", nargs="*", type=Path,
+                        help="chunks.jsonl files. Defaults to the sample chunks in model-customization")
+    parser.add_argument("-t", "--tokenizer", default=SEED_TOKENIZER, help="Hugging Face tokenizer to count with")
+    parser.add_argument("-o", "--output", default="token-estimate-report.json", help="Path to write the JSON report")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with an error if an estimate puts a chunk on the wrong side of a bound")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    files = args.files or SAMPLE_CHUNK_FILES
+    report = {"tokenizer": args.tokenizer, "files": {}}
+
+    print(f"{'chunks file':<64}{'chunks':>8}{'avoided':>9}{'exact (s)':>11}{'est. (s)':>10}{'wrong':>7}")
+    for chunks_jsonl in files:
+        result = check_chunks(chunks_jsonl, args.tokenizer)
+        name = str(chunks_jsonl.relative_to(REPO_ROOT)) if chunks_jsonl.is_relative_to(REPO_ROOT) else str(chunks_jsonl)
+        report["files"][name] = result
+        print(f"{name[-63:]:<64}{result['chunks']:>8}{result['calls_avoided']:>9.0%}"
+              f"{result['exact_s']:>11.3f}{result['estimated_s']:>10.3f}{len(result['mismatches']):>7}")
+
+    total = sum(result["chunks"] for result in report["files"].values())
+    tokenized = sum(result["tokenized"] for result in report["files"].values())
+    report["calls_avoided"] = round(1 - tokenized / total, 4) if total else 0.0
+    print(f"{tokenized} of {total} chunks tokenized, {report['calls_avoided']:.0%} of tokenizer calls avoided")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"📁 Token estimate report saved to {args.output}")
+
+    if args.check and any(result["mismatches"] for result in report["files"].values()):
+        print("❌ Some estimates put a chunk on the wrong side of a token bound")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()